@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Enrichment pipeline benchmark.
+
+For each knowledge base size, generates a synthetic knowledge base (see
+synthetic_kb.py) and times, over the prompt corpus (see prompt_corpus.py):
+
+- detect_coding_request (and condensing of large prompts), once
+- load_knowledge_base
+- extract_relevant_entities, extract_relevant_workflows and
+  extract_applicable_constraints, per coding prompt
+- build_context_blocks and generate_enriched_context
+- the hook's main() end to end, in-process (enrich-context.py loaded as a
+  module, stdin and stdout redirected) and as a subprocess through
+  enrich-context.sh, interpreter startup included
+
+The prompt cache, session deduplication, logging and latency metrics are
+turned off so every run does the full work. Results are emitted as JSON
+(see harness.py) to compare runs over time.
+
+Usage:
+    python3 bench_enrichment.py [--sizes 100,1k,10k,50k,200k] [--repeat N]
+                                [--subprocess-runs N] [--no-subprocess] [--no-deadline]
+                                [--seed N] [--storage MODE] [--workdir DIR] [--output FILE]
+"""
+
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from harness import (
+    HOOKS_DIR,
+    measure,
+    parse_sizes,
+    pop_option,
+    progress,
+    summarize,
+    time_call,
+    write_results
+)
+from prompt_corpus import build_prompt_corpus
+from synthetic_kb import generate_knowledge_base
+
+from kb_format import STORAGE_MODES
+
+DEFAULT_SIZES = '100,1k,10k,50k,200k'
+DEFAULT_REPEAT = 5
+DEFAULT_SUBPROCESS_RUNS = 3
+
+HOOK_SCRIPT = HOOKS_DIR / 'enrich-context.py'
+HOOK_WRAPPER = HOOKS_DIR / 'enrich-context.sh'
+
+
+def load_hook_module():
+    """Load enrich-context.py as a module (its file name isn't importable)."""
+    spec = importlib.util.spec_from_file_location('enrich_context', HOOK_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def configure_settings(no_deadline: bool):
+    """Turn off the hook's caches and bookkeeping for this process."""
+    from fellow.config import load_settings
+
+    settings = load_settings()
+    settings.prompt_cache = False
+    settings.session_dedup = False
+    settings.logging_enabled = False
+    settings.metrics_enabled = False
+    if no_deadline:
+        settings.deadline_ms = 0
+    return settings
+
+
+def run_hook_in_process(hook, prompt: str) -> tuple:
+    """
+    Run the hook's main() on a prompt in this process.
+
+    Returns:
+        (duration in milliseconds, hook output)
+    """
+    saved = sys.argv, sys.stdin, sys.stdout
+    sys.argv = [str(HOOK_SCRIPT)]
+    sys.stdin = io.StringIO(prompt)
+    sys.stdout = io.StringIO()
+    started = time.perf_counter_ns()
+    # Total hook time counts from hook start, which is module load time otherwise
+    hook.HOOK_STARTED_NS = started
+    hook.HOOK_STARTED = started / 1e9
+    try:
+        hook.main()
+    except SystemExit:
+        pass
+    finally:
+        duration_ms = (time.perf_counter_ns() - started) / 1e6
+        output = sys.stdout.getvalue()
+        sys.argv, sys.stdin, sys.stdout = saved
+    return duration_ms, output
+
+
+def run_hook_subprocess(project_dir: Path, prompt: str, env: Dict[str, str]) -> float:
+    """
+    Run the hook wrapper on a prompt, as Claude Code does.
+
+    Returns:
+        Duration in milliseconds
+    """
+    # Cold run: no cached selection, no static blocks already sent
+    for state_dir in ('cache', 'sessions'):
+        shutil.rmtree(project_dir / '.fellow-data' / state_dir, ignore_errors=True)
+    started = time.perf_counter_ns()
+    subprocess.run(
+        ['bash', str(HOOK_WRAPPER)],
+        input=prompt, cwd=project_dir, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return (time.perf_counter_ns() - started) / 1e6
+
+
+def bench_detection(corpus: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    """Time detection (and condensing of large prompts) for every corpus prompt."""
+    from fellow import PLUGIN_DIR
+    from fellow.enrich.detection import LARGE_PROMPT_CHARS, detect_coding_request, load_detector
+    from fellow.enrich.large_prompt import condense_prompt
+
+    detector = load_detector(PLUGIN_DIR)
+    results = {}
+    for entry in corpus:
+        prompt = entry['prompt']
+        result = {'kind': entry['kind'], 'chars': len(prompt)}
+        scoring_prompt = prompt
+        if len(prompt) > LARGE_PROMPT_CHARS:
+            result['condense_prompt'] = measure(lambda: condense_prompt(prompt), repeat)
+            scoring_prompt = condense_prompt(prompt)
+        result['detect_coding_request'] = measure(
+            lambda: detect_coding_request(scoring_prompt, detector), repeat
+        )
+        is_coding, intent, confidence = detect_coding_request(scoring_prompt, detector)
+        result.update(is_coding=is_coding, intent=intent, confidence=round(confidence, 3))
+        entry.update(scoring_prompt=scoring_prompt, is_coding=is_coding, intent=intent)
+        results[entry['name']] = result
+    return results
+
+
+def bench_pipeline(kb_dir: Path, corpus: List[Dict[str, Any]], repeat: int, max_tokens: int) -> Dict[str, Any]:
+    """Time knowledge base loading and each retrieval stage on one knowledge base."""
+    from fellow.enrich.pipeline import (
+        build_context_blocks,
+        extract_applicable_constraints,
+        extract_relevant_entities,
+        extract_relevant_workflows,
+        generate_enriched_context,
+        load_knowledge_base
+    )
+
+    results = {'load_knowledge_base': measure(lambda: load_knowledge_base(kb_dir), repeat)}
+
+    # The first query of a freshly loaded KB decodes the entity graph and constraint index
+    kb = load_knowledge_base(kb_dir)
+    coding = [entry for entry in corpus if entry['is_coding']]
+    if coding:
+        first = coding[0]
+        results['first_query_ms'] = round(time_call(
+            lambda: (extract_relevant_entities(first['scoring_prompt'], kb),
+                     extract_applicable_constraints(first['scoring_prompt'], first['intent'], kb))
+        )[0], 4)
+
+    samples = {stage: [] for stage in (
+        'extract_relevant_entities', 'extract_relevant_workflows', 'extract_applicable_constraints',
+        'build_context_blocks', 'generate_enriched_context'
+    )}
+    selected = {}
+    for entry in coding:
+        prompt, scoring_prompt, intent = entry['prompt'], entry['scoring_prompt'], entry['intent']
+        for _ in range(repeat):
+            ms, entities = time_call(extract_relevant_entities, scoring_prompt, kb)
+            samples['extract_relevant_entities'].append(ms)
+            ms, workflows = time_call(extract_relevant_workflows, scoring_prompt, kb)
+            samples['extract_relevant_workflows'].append(ms)
+            ms, constraints = time_call(extract_applicable_constraints, scoring_prompt, intent, kb)
+            samples['extract_applicable_constraints'].append(ms)
+            ms, blocks = time_call(build_context_blocks, intent, entities, workflows, constraints, kb)
+            samples['build_context_blocks'].append(ms)
+            ms, (_, stats) = time_call(generate_enriched_context, prompt, blocks, max_tokens)
+            samples['generate_enriched_context'].append(ms)
+        selected[entry['name']] = {
+            'entities': len(entities),
+            'workflows': len(workflows),
+            'constraints': len(constraints),
+            'context_tokens': stats['context_tokens'],
+        }
+
+    for stage, stage_samples in samples.items():
+        results[stage] = summarize(stage_samples)
+    results['selected'] = selected
+    return results
+
+
+def hook_path(entry: Dict[str, Any]) -> str:
+    """Group prompts by the hook path they take: 'coding', 'paste' (enriched) or 'pass_through'."""
+    return entry['kind'] if entry['is_coding'] else 'pass_through'
+
+
+def bench_end_to_end(hook, project_dir: Path, corpus: List[Dict[str, Any]], repeat: int,
+                     subprocess_runs: int, env: Dict[str, str]) -> Dict[str, Any]:
+    """Time the hook's main() in-process and as a subprocess, by hook path."""
+    in_process = {}
+    enriched = 0
+    previous_dir = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        for entry in corpus:
+            run_hook_in_process(hook, entry['prompt'])  # Warm-up
+            for _ in range(repeat):
+                ms, output = run_hook_in_process(hook, entry['prompt'])
+                in_process.setdefault(hook_path(entry), []).append(ms)
+            enriched += output.strip() != entry['prompt'].strip()
+    finally:
+        os.chdir(previous_dir)
+
+    results = {
+        'main_in_process': {kind: summarize(samples) for kind, samples in in_process.items()},
+        'prompts_enriched': enriched,
+    }
+    if subprocess_runs:
+        runs = {}
+        for entry in corpus:
+            for _ in range(subprocess_runs):
+                runs.setdefault(hook_path(entry), []).append(run_hook_subprocess(project_dir, entry['prompt'], env))
+        results['main_subprocess'] = {kind: summarize(samples) for kind, samples in runs.items()}
+    return results
+
+
+def main():
+    """Main entry point for the enrichment benchmark."""
+    args = sys.argv[1:]
+    try:
+        sizes = parse_sizes(pop_option(args, '--sizes', DEFAULT_SIZES))
+        repeat = int(pop_option(args, '--repeat', str(DEFAULT_REPEAT)))
+        subprocess_runs = int(pop_option(args, '--subprocess-runs', str(DEFAULT_SUBPROCESS_RUNS)))
+        seed = int(pop_option(args, '--seed', '0'))
+    except ValueError as e:
+        print(f"❌ Error: Invalid number: {e}", file=sys.stderr)
+        sys.exit(1)
+    storage = pop_option(args, '--storage')
+    workdir = pop_option(args, '--workdir')
+    output = pop_option(args, '--output')
+    if '--no-subprocess' in args:
+        subprocess_runs = 0
+    no_deadline = '--no-deadline' in args
+    if storage and storage not in STORAGE_MODES:
+        print(f"❌ Error: Unknown storage mode: {storage} (available: {', '.join(STORAGE_MODES)})",
+              file=sys.stderr)
+        sys.exit(1)
+
+    keep_workdir = workdir is not None
+    workdir = Path(workdir or tempfile.mkdtemp(prefix='fellow-bench-')).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # Keep the project resolver cache out of ~/.cache, and logging off in
+    # the hook subprocesses too
+    os.environ['FELLOW_PATHS_CACHE'] = str(workdir / 'project_paths.cache')
+    os.environ['FELLOW_LOGGING'] = '0'
+    env = dict(os.environ)
+
+    settings = configure_settings(no_deadline)
+    hook = load_hook_module()
+    corpus = build_prompt_corpus(seed)
+
+    results = {}
+    try:
+        progress(f"⏱️  Detection ({len(corpus)} prompts)")
+        results['detection'] = bench_detection(corpus, repeat)
+
+        results['sizes'] = {}
+        for size in sizes:
+            project_dir = workdir / f'kb-{size}'
+            progress(f"🏗️  Generating a knowledge base with {size} entities")
+            generation = generate_knowledge_base(project_dir, size, seed, storage)
+            kb_dir = project_dir / '.fellow-data' / 'semantic'
+
+            progress(f"⏱️  Pipeline stages ({size} entities)")
+            size_results = {'knowledge_base': generation}
+            size_results.update(bench_pipeline(kb_dir, corpus, repeat, settings.max_context_tokens))
+
+            progress(f"⏱️  End to end ({size} entities)")
+            size_results.update(bench_end_to_end(hook, project_dir, corpus, repeat, subprocess_runs, env))
+            results['sizes'][str(size)] = size_results
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    parameters = {
+        'sizes': sizes,
+        'repeat': repeat,
+        'subprocess_runs': subprocess_runs,
+        'seed': seed,
+        'storage': storage,
+        'max_context_tokens': settings.max_context_tokens,
+        'deadline_ms': settings.deadline_ms,
+    }
+    write_results('enrichment', parameters, results, output)
+
+
+if __name__ == "__main__":
+    main()
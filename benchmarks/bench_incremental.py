@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Incremental update benchmark.
+
+For each repository size, creates a local git repository (see
+synthetic_repo.py) extracted at its first commit, applies churn (a commit
+of modified, renamed, deleted and added files, uncommitted and staged
+changes, untracked files), copies it without .git/, and times:
+
+- hashing the file registry (calculate_file_hash over every registered file)
+- detect_changes on the git repository (git diff and ls-files)
+- detect_changes on the non-git copy (file comparison fallback: hashes the
+  registry and walks the tree)
+- collect_git_info
+- merge_knowledge_bases of a delta for the changed files into a knowledge
+  base grounded in the repository's files (see synthetic_kb.py), from a
+  pristine copy every run
+
+Detected changes are checked against the churn applied. Throughput is
+reported in files/s and entities merged/s. Everything is local: no network
+access and no git configuration beyond the generated repositories.
+
+Usage:
+    python3 bench_incremental.py [--sizes 10k,100k,500k] [--repeat N] [--entities-per-file F]
+                                 [--churn F] [--renames F] [--deletes F] [--new F]
+                                 [--untracked F] [--dirty F] [--seed N] [--storage MODE]
+                                 [--workdir DIR] [--output FILE]
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from harness import (
+    measure,
+    parse_sizes,
+    pop_option,
+    progress,
+    summarize,
+    throughput,
+    time_call,
+    write_results
+)
+from synthetic_kb import generate_entities, generate_knowledge_base, generate_relationships, generate_workflows
+from synthetic_repo import DEFAULT_CHURN, apply_churn, copy_without_git, create_repo
+
+from detect_changes import calculate_file_hash, detect_changes, load_metadata
+from git_info import collect_git_info
+from kb_format import STORAGE_MODES, write_kb_file
+from merge_knowledge import merge_knowledge_bases
+
+DEFAULT_SIZES = '10k,100k,500k'
+DEFAULT_REPEAT = 3
+DEFAULT_ENTITIES_PER_FILE = 1.0
+
+
+def quietly(func, *args):
+    """Call a tool function with its progress output discarded and the working directory kept."""
+    previous_dir = os.getcwd()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return func(*args)
+    finally:
+        os.chdir(previous_dir)
+
+
+def bench_hashing(project_dir: Path, registry: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Time hashing every file of the registry."""
+    paths = [project_dir / path for path in registry]
+    size = sum(entry['size'] for entry in registry.values())
+    summary = measure(lambda: [calculate_file_hash(path) for path in paths], repeat)
+    return {
+        'files': len(paths),
+        'bytes': size,
+        'calculate_file_hash': summary,
+        'files_per_s': throughput(len(paths), summary['median']),
+        'mb_per_s': round(throughput(size, summary['median']) / 1e6, 1) if summary['median'] else None,
+    }
+
+
+def bench_detection(project_dir: Path, files: int, expected: Dict[str, int], repeat: int) -> Dict[str, Any]:
+    """Time detect_changes on one project and check its result against the churn applied."""
+    summary = measure(lambda: quietly(detect_changes, project_dir), repeat)
+    changes = quietly(detect_changes, project_dir)
+    detected = {kind: len(changes[kind]) for kind in ('modified', 'new', 'deleted')}
+    if detected != expected:
+        progress(f"⚠️  {changes['detection_method']} detection found {detected}, expected {expected}")
+    return {
+        'detection_method': changes['detection_method'],
+        'detect_changes': summary,
+        'files_per_s': throughput(files, summary['median']),
+        'detected': detected,
+        'matches_churn': detected == expected,
+    }
+
+
+def write_delta(kb_dir: Path, changed: List[str], entities_per_file: float, seed: int):
+    """Write factual and procedural deltas, as the extraction agents would for the changed files."""
+    rng = random.Random(seed + 2)
+    entities = generate_entities(max(1, int(len(changed) * entities_per_file)), rng, changed) if changed else []
+    write_kb_file(kb_dir / 'factual_knowledge_delta.json', {
+        'entities': entities,
+        'entity_relationships': generate_relationships(entities, rng),
+    })
+    write_kb_file(kb_dir / 'procedural_knowledge_delta.json', {
+        'workflows': generate_workflows(max(1, len(entities) // 20), entities, rng) if entities else [],
+    })
+    return len(entities)
+
+
+def bench_merge(kb_project: Path, kb_entities: int, changes: Dict[str, Any], entities_per_file: float,
+                repeat: int, seed: int, storage: str) -> Dict[str, Any]:
+    """Time merging a delta for the changed files into a pristine copy of the knowledge base, once per run."""
+    kb_dir = kb_project / '.fellow-data' / 'semantic'
+    pristine = kb_project / 'semantic-pristine'
+    shutil.copytree(kb_dir, pristine)
+
+    analyzed = changes['modified'] + changes['new']
+    changed_files = analyzed + changes['deleted']
+    samples = []
+    try:
+        for _ in range(repeat):
+            shutil.rmtree(kb_dir)
+            shutil.copytree(pristine, kb_dir)
+            delta_entities = write_delta(kb_dir, analyzed, entities_per_file, seed)
+            ms, stats = time_call(quietly, merge_knowledge_bases, kb_dir, changed_files, storage)
+            samples.append(ms)
+    finally:
+        shutil.rmtree(pristine, ignore_errors=True)
+
+    summary = summarize(samples)
+    merged_entities = kb_entities - stats['factual']['entities_removed'] + stats['factual']['entities_added']
+    return {
+        'changed_files': len(changed_files),
+        'delta_entities': delta_entities,
+        'merged_entities': merged_entities,
+        'stats': stats,
+        'merge_knowledge_bases': summary,
+        # The whole knowledge base is rewritten and reindexed, not just the delta
+        'entities_merged_per_s': throughput(merged_entities, summary['median']),
+        'delta_entities_per_s': throughput(delta_entities, summary['median']),
+    }
+
+
+def bench_size(workdir: Path, files: int, shares: Dict[str, float], entities_per_file: float,
+               repeat: int, seed: int, storage: str) -> Dict[str, Any]:
+    """Create, churn and benchmark one repository size."""
+    size_dir = workdir / f'repo-{files}'
+    repo_dir, copy_dir, kb_project = size_dir / 'repo', size_dir / 'copy', size_dir / 'kb'
+
+    progress(f"🏗️  Creating a git repository with {files} files")
+    repo = create_repo(repo_dir, files, seed)
+    churn = apply_churn(repo_dir, repo['paths'], seed, **shares)
+    copy_without_git(repo_dir, copy_dir)
+    registry = load_metadata(repo_dir / '.fellow-data' / 'semantic')['file_registry']
+    results = {
+        'repository': {key: value for key, value in repo.items() if key != 'paths'},
+        'churn': {key: value for key, value in churn.items() if key not in ('shares', 'changed_paths')},
+    }
+
+    progress(f"⏱️  Registry hashing ({len(registry)} files)")
+    results['registry_hashing'] = bench_hashing(repo_dir, registry, repeat)
+
+    progress(f"⏱️  Change detection ({files} files, git and fallback)")
+    results['detect_git'] = bench_detection(repo_dir, files, churn['expected'], repeat)
+    results['detect_fallback'] = bench_detection(copy_dir, files, churn['expected'], repeat)
+    results['collect_git_info'] = measure(lambda: quietly(collect_git_info, repo_dir, True), repeat)
+
+    kb_entities = max(1, int(len(registry) * entities_per_file))
+    progress(f"🏗️  Generating a knowledge base with {kb_entities} entities")
+    results['knowledge_base'] = generate_knowledge_base(kb_project, kb_entities, seed, storage, list(registry))
+
+    changes = quietly(detect_changes, repo_dir)
+    progress(f"⏱️  Merge ({changes['total']} changed files into {kb_entities} entities)")
+    results['merge'] = bench_merge(kb_project, kb_entities, changes, entities_per_file, repeat, seed, storage)
+    return results
+
+
+def main():
+    """Main entry point for the incremental update benchmark."""
+    args = sys.argv[1:]
+    try:
+        sizes = parse_sizes(pop_option(args, '--sizes', DEFAULT_SIZES))
+        repeat = int(pop_option(args, '--repeat', str(DEFAULT_REPEAT)))
+        entities_per_file = float(pop_option(args, '--entities-per-file', str(DEFAULT_ENTITIES_PER_FILE)))
+        seed = int(pop_option(args, '--seed', '0'))
+        shares = {kind: float(pop_option(args, f'--{kind}', str(default)))
+                  for kind, default in DEFAULT_CHURN.items()}
+    except ValueError as e:
+        print(f"❌ Error: Invalid number: {e}", file=sys.stderr)
+        sys.exit(1)
+    storage = pop_option(args, '--storage')
+    workdir = pop_option(args, '--workdir')
+    output = pop_option(args, '--output')
+    if repeat < 1:
+        print("❌ Error: --repeat must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    if storage and storage not in STORAGE_MODES:
+        print(f"❌ Error: Unknown storage mode: {storage} (available: {', '.join(STORAGE_MODES)})",
+              file=sys.stderr)
+        sys.exit(1)
+    if not shutil.which('git'):
+        print("❌ Error: git is not installed", file=sys.stderr)
+        sys.exit(1)
+
+    keep_workdir = workdir is not None
+    workdir = Path(workdir or tempfile.mkdtemp(prefix='fellow-bench-incremental-')).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    try:
+        for size in sizes:
+            results[str(size)] = bench_size(workdir, size, shares, entities_per_file, repeat, seed, storage)
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    parameters = {
+        'sizes': sizes,
+        'repeat': repeat,
+        'entities_per_file': entities_per_file,
+        'churn': shares,
+        'seed': seed,
+        'storage': storage,
+    }
+    write_results('incremental', parameters, results, output)
+
+
+if __name__ == "__main__":
+    main()
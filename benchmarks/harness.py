@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the Fellow benchmarks.
+
+Timing, summary statistics, environment capture and JSON result output,
+so every benchmark reports in the same shape and runs can be compared
+over time:
+
+    {
+      "benchmark": "enrichment",
+      "environment": {"python": "3.11.7", "commit": "94ebe7b", ...},
+      "parameters": {...},
+      "results": {...}
+    }
+
+Durations are in milliseconds and summarized as runs, min, median, mean,
+p95 and max.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCHMARKS_DIR = Path(__file__).parent.resolve()
+PLUGIN_DIR = BENCHMARKS_DIR.parent
+TOOLS_DIR = PLUGIN_DIR / 'tools'
+HOOKS_DIR = PLUGIN_DIR / 'hooks'
+
+for import_dir in (TOOLS_DIR, HOOKS_DIR, PLUGIN_DIR):
+    if str(import_dir) not in sys.path:
+        sys.path.insert(0, str(import_dir))
+
+# Size suffixes accepted in size lists ("100,10k,200k")
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, Any]:
+    """
+    Summarize duration samples.
+
+    Args:
+        samples_ms: Durations in milliseconds
+
+    Returns:
+        Dictionary with runs, min, median, mean, p95 and max (ms)
+    """
+    if not samples_ms:
+        return {'runs': 0}
+    ordered = sorted(samples_ms)
+    count = len(ordered)
+    return {
+        'runs': count,
+        'min': round(ordered[0], 4),
+        'median': round(ordered[count // 2], 4),
+        'mean': round(sum(ordered) / count, 4),
+        'p95': round(ordered[min(count - 1, int(0.95 * count))], 4),
+        'max': round(ordered[-1], 4),
+    }
+
+
+def time_call(func: Callable, *args, **kwargs) -> tuple:
+    """
+    Time one call.
+
+    Returns:
+        (duration in milliseconds, return value)
+    """
+    started = time.perf_counter_ns()
+    value = func(*args, **kwargs)
+    return (time.perf_counter_ns() - started) / 1e6, value
+
+
+def measure(func: Callable, repeat: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time repeated calls of a function without arguments.
+
+    Args:
+        func: Function to time
+        repeat: Timed calls
+        warmup: Untimed calls made first (caches, lazy indexes)
+
+    Returns:
+        Summary of the timed calls (see summarize)
+    """
+    for _ in range(warmup):
+        func()
+    return summarize([time_call(func)[0] for _ in range(repeat)])
+
+
+def throughput(count: int, duration_ms: float) -> Optional[float]:
+    """Items per second, or None for a zero duration."""
+    return round(count / (duration_ms / 1000), 1) if duration_ms > 0 else None
+
+
+def git_commit() -> Optional[str]:
+    """Get the plugin's current commit (None outside a git checkout)."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=PLUGIN_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and checkout the benchmark ran on."""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def parse_sizes(text: str) -> List[int]:
+    """
+    Parse a comma-separated size list such as "100,10k,200k".
+
+    Raises:
+        ValueError: If a size isn't a positive number
+    """
+    sizes = []
+    for part in text.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        factor = SIZE_SUFFIXES.get(part[-1], 1)
+        number = part[:-1] if factor != 1 else part
+        size = int(float(number) * factor)
+        if size <= 0:
+            raise ValueError(f"size must be positive: {part}")
+        sizes.append(size)
+    return sizes
+
+
+def pop_option(args: List[str], name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Remove `name VALUE` from the arguments and return VALUE.
+
+    Exits with an error if the option has no value.
+    """
+    if name not in args:
+        return default
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f"❌ Error: {name} needs a value", file=sys.stderr)
+        sys.exit(1)
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+
+def progress(message: str):
+    """Report progress on stderr (stdout may carry the JSON results)."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def write_results(benchmark: str, parameters: Dict[str, Any], results: Any, output: Optional[str] = None):
+    """
+    Emit benchmark results as JSON.
+
+    Args:
+        benchmark: Benchmark name
+        parameters: Parameters the benchmark ran with
+        results: Benchmark results
+        output: File to write (stdout when None or '-')
+    """
+    document = {
+        'benchmark': benchmark,
+        'environment': environment(),
+        'parameters': parameters,
+        'results': results,
+    }
+    text = json.dumps(document, indent=2) + '\n'
+    if output and output != '-':
+        Path(output).write_text(text, encoding='utf-8')
+        progress(f"✓ Results written to {output}")
+    else:
+        sys.stdout.write(text)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Prompt corpus for the enrichment benchmarks.
+
+A fixed, deterministic mix of the prompts the hook sees: short coding
+requests naming entities from the synthetic knowledge base vocabulary
+(see synthetic_kb.py), vaguer coding requests, non-coding questions that
+pass through, and long pastes (stack traces, log dumps, source files)
+well past the large-prompt threshold.
+
+Each prompt is a dictionary with a name, a kind ('coding', 'chat' or
+'paste') and the prompt text.
+
+Usage:
+    python3 prompt_corpus.py            # List the corpus with prompt sizes
+"""
+
+import random
+from typing import Any, Dict, List
+
+from synthetic_kb import DOMAIN_NOUNS, MODULES
+
+CODING_PROMPTS = (
+    ('create_endpoint', "Add a refund endpoint to OrderPaymentService that validates the refund amount"),
+    ('fix_bug', "Fix the bug where InvoiceTaxCalculator rounds totals twice in the billing module"),
+    ('refactor', "Refactor the CustomerAccountRepository to batch lookups instead of querying in a loop"),
+    ('test', "Write tests for the SubscriptionPlanValidator covering expired coupons"),
+    ('delete', "Remove the deprecated webhook retry worker from the integrations module"),
+    ('file_mention', "Update src/checkout/cart_product_service.py so the cart total includes discounts"),
+    ('polite', "Could you implement a search handler for catalog products filtered by inventory?"),
+    ('vague', "Make the notification emails faster"),
+)
+
+CHAT_PROMPTS = (
+    ('question', "What does the ledger module do, in two sentences?"),
+    ('greeting', "thanks, that looks good"),
+    ('explain', "Explain the difference between the warehouse and shipment models"),
+)
+
+# Sizes of the generated pastes, in characters
+PASTE_SIZES = {
+    'stack_trace': 24 * 1024,
+    'log_dump': 120 * 1024,
+    'source_file': 60 * 1024,
+}
+
+
+def stack_trace_paste(rng: random.Random, size: int) -> str:
+    """A failing request's traceback, repeated frames and all."""
+    lines = ["Fix this error from the refund job:", "", "Traceback (most recent call last):"]
+    while sum(len(line) + 1 for line in lines) < size:
+        module, noun = rng.choice(MODULES), rng.choice(DOMAIN_NOUNS)
+        lines.append(f'  File "/srv/app/src/{module}/{noun}_service.py", line {rng.randint(10, 900)}, '
+                     f'in {rng.choice(("handle", "process", "apply", "commit"))}_{noun}')
+        lines.append(f"    result = self.{noun}_repository.get({noun}_id=request.{noun}_id)")
+    lines.append("KeyError: 'refund_amount'")
+    return '\n'.join(lines)
+
+
+def log_dump_paste(rng: random.Random, size: int) -> str:
+    """Application log lines around an incident."""
+    lines = ["Why does the payment webhook handler keep timing out? Logs:", ""]
+    levels = ('INFO', 'INFO', 'INFO', 'WARNING', 'ERROR')
+    while sum(len(line) + 1 for line in lines) < size:
+        module, noun = rng.choice(MODULES), rng.choice(DOMAIN_NOUNS)
+        lines.append(f"2026-03-0{rng.randint(1, 9)}T12:{rng.randint(10, 59)}:{rng.randint(10, 59)}Z "
+                     f"{rng.choice(levels):<7} [{module}] {noun} request {rng.getrandbits(32):08x} "
+                     f"took {rng.randint(5, 4000)}ms status={rng.choice((200, 200, 201, 409, 500, 504))}")
+    return '\n'.join(lines)
+
+
+def source_file_paste(rng: random.Random, size: int) -> str:
+    """A pasted module with a request to change it."""
+    lines = ["Refactor this class to use the repository pattern:", "", "```python"]
+    while sum(len(line) + 1 for line in lines) < size:
+        noun = rng.choice(DOMAIN_NOUNS)
+        lines.extend([
+            f"    def load_{noun}(self, {noun}_id: str) -> dict:",
+            f'        """Load a {noun} by id."""',
+            f"        row = self.db.execute('SELECT * FROM {noun}s WHERE id = ?', ({noun}_id,)).fetchone()",
+            f"        return dict(row) if row else None",
+            "",
+        ])
+    lines.append("```")
+    return '\n'.join(lines)
+
+
+def build_prompt_corpus(seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build the benchmark prompt corpus.
+
+    Args:
+        seed: Random seed for the generated pastes
+
+    Returns:
+        List of {'name', 'kind', 'prompt'} dictionaries
+    """
+    rng = random.Random(seed)
+    corpus = [{'name': name, 'kind': 'coding', 'prompt': prompt} for name, prompt in CODING_PROMPTS]
+    corpus.extend({'name': name, 'kind': 'chat', 'prompt': prompt} for name, prompt in CHAT_PROMPTS)
+    pastes = {
+        'stack_trace': stack_trace_paste,
+        'log_dump': log_dump_paste,
+        'source_file': source_file_paste,
+    }
+    for name, make_paste in pastes.items():
+        corpus.append({'name': name, 'kind': 'paste', 'prompt': make_paste(rng, PASTE_SIZES[name])})
+    return corpus
+
+
+def main():
+    """List the corpus."""
+    for entry in build_prompt_corpus():
+        preview = entry['prompt'].splitlines()[0][:60]
+        print(f"{entry['name']:<16} {entry['kind']:<7} {len(entry['prompt']):>8} chars  {preview}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Synthetic knowledge base generator for benchmarks.
+
+Writes factual, procedural and conceptual knowledge files shaped like the
+extraction agents' output, at any size from a handful to hundreds of
+thousands of entities, then indexes them with index_knowledge.py exactly as
+a full build does (entity IDs, relationship tuples, entity graph,
+importance, constraint index, rendered context).
+
+Entities are named and described from a shared domain vocabulary
+("OrderRefundService: Validates refund requests for orders in the billing
+module"), grouped into modules with mostly module-local relationships, so
+prompts built from the same vocabulary match a realistic share of the
+knowledge base. Generation is deterministic for a given size and seed.
+
+Usage:
+    python3 synthetic_kb.py <target-project-path> [--entities N] [--seed N] [--storage MODE]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# harness puts tools/ on sys.path
+from harness import parse_sizes, pop_option
+
+from index_knowledge import index_knowledge_base
+from kb_format import STORAGE_MODES, write_kb_file
+
+DOMAIN_NOUNS = (
+    'order', 'payment', 'refund', 'invoice', 'customer', 'account', 'user', 'session',
+    'token', 'cart', 'product', 'catalog', 'inventory', 'warehouse', 'shipment', 'carrier',
+    'subscription', 'plan', 'coupon', 'discount', 'tax', 'ledger', 'report', 'notification',
+    'email', 'webhook', 'audit', 'permission', 'role', 'tenant', 'review', 'search',
+)
+
+MODULES = (
+    'billing', 'checkout', 'catalog', 'fulfillment', 'identity', 'notifications',
+    'reporting', 'admin', 'search', 'integrations', 'analytics', 'support',
+)
+
+ENTITY_KINDS = (
+    # (name suffix, entity type, category)
+    ('Service', 'class', 'technical_entity'),
+    ('Repository', 'class', 'technical_entity'),
+    ('Controller', 'class', 'technical_entity'),
+    ('Handler', 'class', 'technical_entity'),
+    ('Validator', 'class', 'technical_entity'),
+    ('Client', 'class', 'technical_entity'),
+    ('Serializer', 'class', 'technical_entity'),
+    ('Worker', 'class', 'technical_entity'),
+    ('', 'class', 'domain_entity'),
+    ('Event', 'class', 'domain_entity'),
+)
+
+PURPOSE_VERBS = (
+    'Validates', 'Creates', 'Persists', 'Loads', 'Calculates', 'Schedules', 'Publishes',
+    'Reconciles', 'Caches', 'Authorizes', 'Exports', 'Imports', 'Archives', 'Notifies about',
+)
+
+PURPOSE_OBJECTS = (
+    'requests', 'records', 'totals', 'updates', 'events', 'batches', 'lookups', 'changes',
+)
+
+RELATIONSHIP_KINDS = ('uses', 'depends-on', 'calls', 'creates', 'extends')
+
+WORKFLOW_TYPES = ('request_handler', 'background_job', 'event_consumer', 'cli_command')
+WORKFLOW_VERBS = ('create', 'update', 'cancel', 'sync', 'export', 'approve', 'retry', 'import')
+
+CONSTRAINT_TEMPLATES = (
+    ('security', "Never log {noun} data or credentials in plain text",
+     "Logs are shipped to third-party storage"),
+    ('security', "Authorize every {noun} mutation through the permission service",
+     "Direct role checks drift from the policy"),
+    ('architectural', "Controllers in {module} must call services, never repositories",
+     "Keeps persistence behind the service layer"),
+    ('architectural', "The {module} module may not import from admin",
+     "Admin depends on every module, not the reverse"),
+    ('performance', "Batch {noun} queries instead of querying inside loops",
+     "N+1 queries dominated checkout latency"),
+    ('data validation', "Validate {noun} payloads with the shared schema before persisting",
+     "Partial records broke downstream reports"),
+    ('testing', "Cover new {noun} handlers with contract tests",
+     "Integrations rely on the response shape"),
+)
+
+DESIGN_PATTERNS = ('Repository', 'Service Layer', 'Unit of Work', 'Observer', 'Strategy', 'Factory')
+
+
+def _camel(*words: str) -> str:
+    return ''.join(word.capitalize() for word in words)
+
+
+def generate_entities(count: int, rng: random.Random, files: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Generate `count` uniquely named entities grounded in module files.
+
+    Args:
+        count: Number of entities
+        rng: Random generator
+        files: Files to ground the entities in, round robin (default:
+               generated module file names)
+    """
+    entities = []
+    uses = {}
+    for position in range(count):
+        module = MODULES[position % len(MODULES)]
+        noun, qualifier = rng.choice(DOMAIN_NOUNS), rng.choice(DOMAIN_NOUNS)
+        suffix, entity_type, category = rng.choice(ENTITY_KINDS)
+        base = _camel(noun, qualifier) + suffix if noun != qualifier else _camel(noun) + suffix
+        # Repeated names are numbered (no base name ends in a digit)
+        uses[base] = uses.get(base, 0) + 1
+        name = base if uses[base] == 1 else f"{base}{uses[base]}"
+        entities.append({
+            'name': name,
+            'type': entity_type,
+            'category': category,
+            'purpose': (f"{rng.choice(PURPOSE_VERBS)} {noun} {rng.choice(PURPOSE_OBJECTS)} "
+                        f"for {qualifier} workflows in the {module} module"),
+            'grounding': {
+                'file': files[position % len(files)] if files else
+                        f"src/{module}/{noun}_{qualifier}{('_' + suffix.lower()) if suffix else ''}.py",
+                'line_start': rng.randint(1, 400),
+            },
+        })
+    return entities
+
+
+def generate_relationships(entities: List[Dict[str, Any]], rng: random.Random,
+                           per_entity: float = 2.5) -> List[Dict[str, Any]]:
+    """Generate agent-style relationships, mostly between entities of one module."""
+    relationships = []
+    count = len(entities)
+    if count < 2:
+        return relationships
+    stride = len(MODULES)
+    for position, entity in enumerate(entities):
+        for _ in range(int(per_entity) + (rng.random() < per_entity % 1)):
+            if rng.random() < 0.8:
+                # Same module: entities sharing position modulo the module count
+                target = (position + stride * rng.randint(1, 50)) % count
+            else:
+                target = rng.randrange(count)
+            if target == position:
+                continue
+            relationships.append({
+                'source_entity': entity['name'],
+                'target_entity': entities[target]['name'],
+                'relationship_type': rng.choice(RELATIONSHIP_KINDS),
+            })
+    return relationships
+
+
+def generate_workflows(count: int, entities: List[Dict[str, Any]], rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate workflows whose steps call generated entities."""
+    workflows = []
+    for position in range(count):
+        module = MODULES[position % len(MODULES)]
+        verb, noun = rng.choice(WORKFLOW_VERBS), rng.choice(DOMAIN_NOUNS)
+        steps = []
+        for order in range(1, rng.randint(3, 6) + 1):
+            entity = rng.choice(entities)
+            steps.append({
+                'order': order,
+                'action': f"{rng.choice(PURPOSE_VERBS).split()[0].lower()} {noun}",
+                'functions': [f"{entity['name']}.{verb}"],
+                'file_references': [f"{entity['grounding']['file']}:{entity['grounding']['line_start']}"],
+            })
+        workflows.append({
+            'name': f"{verb}_{noun}_{position}",
+            'type': rng.choice(WORKFLOW_TYPES),
+            'purpose': f"{verb.capitalize()} a {noun} and propagate the change through {module}",
+            'entry_point': {'file': f"src/{module}/api/{noun}.py", 'function': f"{verb}_{noun}"},
+            'steps': steps,
+        })
+    return workflows
+
+
+def generate_constraints(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate constraints of every type, about a third of them scoped to a module."""
+    constraints = []
+    for position in range(count):
+        constraint_type, text, rationale = CONSTRAINT_TEMPLATES[position % len(CONSTRAINT_TEMPLATES)]
+        module = rng.choice(MODULES)
+        constraint = {
+            'type': constraint_type,
+            'constraint': text.format(noun=rng.choice(DOMAIN_NOUNS), module=module),
+            'rationale': rationale,
+        }
+        if rng.random() < 0.35:
+            constraint['scope'] = f"src/{module}/**"
+        constraints.append(constraint)
+    return constraints
+
+
+def generate_knowledge_base(project_dir: Path, entities: int, seed: int = 0,
+                            storage: str = None, files: List[str] = None) -> Dict[str, Any]:
+    """
+    Write and index a synthetic knowledge base in a project directory.
+
+    Workflows scale with a twentieth and constraints with a fiftieth of the
+    entity count (within sensible bounds).
+
+    Args:
+        project_dir: Project directory (the KB goes to .fellow-data/semantic/)
+        entities: Number of entities
+        seed: Random seed
+        storage: Storage mode of the indexed files (default: kb_format's default)
+        files: Project files to ground the entities in (see generate_entities)
+
+    Returns:
+        Generation statistics (counts, durations in ms, file sizes)
+    """
+    rng = random.Random(seed)
+    kb_dir = Path(project_dir) / '.fellow-data' / 'semantic'
+    kb_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    entity_list = generate_entities(entities, rng, files)
+    relationships = generate_relationships(entity_list, rng)
+    workflows = generate_workflows(max(5, min(5000, entities // 20)), entity_list, rng)
+    constraints = generate_constraints(max(10, min(2000, entities // 50)), rng)
+
+    metadata = {'generator': 'benchmarks/synthetic_kb.py', 'seed': seed}
+    write_kb_file(kb_dir / 'factual_knowledge.json', {
+        'metadata': metadata,
+        'entities': entity_list,
+        'entity_relationships': relationships,
+    }, storage)
+    write_kb_file(kb_dir / 'procedural_knowledge.json', {
+        'metadata': metadata,
+        'workflows': workflows,
+    }, storage)
+    write_kb_file(kb_dir / 'conceptual_knowledge.json', {
+        'metadata': metadata,
+        'architecture_style': {'primary_style': 'Layered', 'evidence': ['src/*/api', 'src/*/services']},
+        'design_patterns': [{'pattern': pattern} for pattern in DESIGN_PATTERNS],
+        'constraints': constraints,
+    }, storage)
+    generated = time.perf_counter()
+
+    index_knowledge_base(kb_dir, storage)
+    indexed = time.perf_counter()
+
+    return {
+        'entities': len(entity_list),
+        'relationships': len(relationships),
+        'workflows': len(workflows),
+        'constraints': len(constraints),
+        'generate_ms': round((generated - started) * 1000, 1),
+        'index_ms': round((indexed - generated) * 1000, 1),
+        'kb_bytes': sum(path.stat().st_size for path in kb_dir.iterdir() if path.is_file()),
+    }
+
+
+def main():
+    """Main entry point for the synthetic KB generator."""
+    args = sys.argv[1:]
+    try:
+        entities = parse_sizes(pop_option(args, '--entities', '1000'))[0]
+        seed = int(pop_option(args, '--seed', '0'))
+    except (ValueError, IndexError) as e:
+        print(f"❌ Error: Invalid number: {e}", file=sys.stderr)
+        sys.exit(1)
+    storage = pop_option(args, '--storage')
+    if not args or (storage and storage not in STORAGE_MODES):
+        print("Usage: synthetic_kb.py <target-project-path> [--entities N] [--seed N] "
+              f"[--storage {'|'.join(STORAGE_MODES)}]", file=sys.stderr)
+        sys.exit(1)
+
+    stats = generate_knowledge_base(Path(args[0]), entities, seed, storage)
+    print(f"✅ Synthetic knowledge base written to {Path(args[0]) / '.fellow-data' / 'semantic'}")
+    for key, value in stats.items():
+        print(f"   • {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Synthetic git repository generator for the incremental update benchmarks.
+
+Creates a local git repository with any number of small, unique source
+files (Python, TypeScript and Go, plus docs, configs and test files the
+extraction skips) under src/<module>/<package>/, and a gitignored
+node_modules/. The base commit gets an extraction_metadata.json whose file
+registry hashes every analyzable file, as a full build records it, so
+detect_changes.py sees a project extracted at that commit.
+
+Churn is then applied the ways a project changes between builds:
+
+- committed: modified, renamed, deleted and added files in a second commit
+- uncommitted: modified files, half of them staged
+- untracked: new files never added
+
+A non-git copy of the result (no .git/, same metadata) exercises the
+file-comparison fallback. Everything runs offline: git is invoked with no
+system or global configuration and a fixed identity. Generation is
+deterministic for a given size and seed.
+
+Usage:
+    python3 synthetic_repo.py <target-path> [--files N] [--seed N] [--churn F]
+                              [--renames F] [--deletes F] [--new F] [--untracked F]
+                              [--dirty F] [--no-copy]
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+# harness puts tools/ on sys.path
+from harness import parse_sizes, pop_option
+from synthetic_kb import DOMAIN_NOUNS, MODULES
+
+from detect_changes import calculate_file_hash
+from file_filters import should_analyze_file
+
+# Share of tracked files per kind (the rest are source files)
+SOURCE_EXTENSIONS_WEIGHTS = (('.py', 0.55), ('.ts', 0.3), ('.go', 0.15))
+DOC_SHARE = 0.05
+TEST_SHARE = 0.05
+
+FILES_PER_PACKAGE = 100
+
+# Default churn, as shares of the tracked files
+DEFAULT_CHURN = {
+    'churn': 0.01,       # Modified in the second commit
+    'renames': 0.002,    # Renamed in the second commit
+    'deletes': 0.001,    # Deleted in the second commit
+    'new': 0.002,        # Added in the second commit
+    'untracked': 0.001,  # Created, never added
+    'dirty': 0.002,      # Modified after the second commit, half of them staged
+}
+
+GIT_IDENTITY = (
+    '-c', 'user.name=Fellow Bench', '-c', 'user.email=bench@example.invalid',
+    '-c', 'commit.gpgsign=false', '-c', 'init.defaultBranch=main', '-c', 'gc.auto=0',
+)
+
+
+def git_env() -> Dict[str, str]:
+    """Environment for git runs that ignores the user's and system configuration."""
+    env = dict(os.environ)
+    env.update(GIT_CONFIG_NOSYSTEM='1', GIT_CONFIG_GLOBAL=os.devnull, GIT_TERMINAL_PROMPT='0')
+    return env
+
+
+def git(repo_dir: Path, *args: str, stdin: str = None) -> str:
+    """Run a git command in a repository and return its output."""
+    result = subprocess.run(
+        ['git', *GIT_IDENTITY, *args],
+        cwd=repo_dir, env=git_env(), input=stdin,
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def source_text(path: str, serial: int, rng: random.Random) -> str:
+    """A small, unique source file in the language of its extension."""
+    noun, verb = rng.choice(DOMAIN_NOUNS), rng.choice(('load', 'save', 'sync', 'apply', 'check'))
+    name = f"{verb}_{noun}_{serial}"
+    if path.endswith('.py'):
+        return (f'"""{noun.capitalize()} helpers ({serial})."""\n\n\n'
+                f"def {name}({noun}_id: str) -> dict:\n"
+                f"    return {{'id': {noun}_id, 'serial': {serial}, 'weight': {rng.randint(1, 9999)}}}\n")
+    if path.endswith('.ts'):
+        return (f"// {noun} helpers ({serial})\n"
+                f"export function {name}(id: string): Record<string, number | string> {{\n"
+                f"  return {{ id, serial: {serial}, weight: {rng.randint(1, 9999)} }};\n}}\n")
+    if path.endswith('.go'):
+        return (f"package {noun}\n\n// {name} is generated ({serial}).\n"
+                f"func {name.title().replace('_', '')}(id string) int {{\n"
+                f"\treturn len(id) + {rng.randint(1, 9999)}\n}}\n")
+    if path.endswith('.json'):
+        return json.dumps({'name': name, 'serial': serial, 'weight': rng.randint(1, 9999)}) + '\n'
+    return f"# {noun.capitalize()} notes ({serial})\n\nHow {verb} works for {noun} records.\n"
+
+
+def plan_files(count: int, rng: random.Random) -> List[str]:
+    """Lay out `count` tracked file paths over modules and packages."""
+    extensions = [extension for extension, _ in SOURCE_EXTENSIONS_WEIGHTS]
+    weights = [weight for _, weight in SOURCE_EXTENSIONS_WEIGHTS]
+    paths = []
+    for serial in range(count):
+        module = MODULES[serial % len(MODULES)]
+        package = f"pkg{serial // (FILES_PER_PACKAGE * len(MODULES)):04d}"
+        noun = rng.choice(DOMAIN_NOUNS)
+        roll = rng.random()
+        if roll < TEST_SHARE:
+            paths.append(f"src/{module}/tests/{package}/test_{noun}_{serial}.py")
+        elif roll < TEST_SHARE + DOC_SHARE:
+            extension = '.md' if serial % 2 else '.json'
+            paths.append(f"src/{module}/{package}/{noun}_{serial}{extension}")
+        else:
+            extension = rng.choices(extensions, weights)[0]
+            paths.append(f"src/{module}/{package}/{noun}_{serial}{extension}")
+    return paths
+
+
+def write_files(repo_dir: Path, paths: List[str], rng: random.Random, first_serial: int = 0):
+    """Write generated content to relative paths, creating directories as needed."""
+    made = set()
+    for offset, path in enumerate(paths):
+        full_path = repo_dir / path
+        if full_path.parent not in made:
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            made.add(full_path.parent)
+        full_path.write_text(source_text(path, first_serial + offset, rng), encoding='utf-8')
+
+
+def build_registry(repo_dir: Path, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Build an extraction file registry of the analyzable files, as a full build records it."""
+    analyzed_at = datetime.utcnow().isoformat() + "Z"
+    registry = {}
+    for path in paths:
+        if should_analyze_file(path):
+            full_path = repo_dir / path
+            registry[path] = {
+                'last_analyzed': analyzed_at,
+                'hash': calculate_file_hash(full_path),
+                'size': full_path.stat().st_size,
+                'status': 'analyzed',
+            }
+    return registry
+
+
+def write_extraction_metadata(repo_dir: Path, commit: str, registry: Dict[str, Dict[str, Any]]):
+    """Write .fellow-data/semantic/extraction_metadata.json for an extraction at `commit`."""
+    kb_dir = repo_dir / '.fellow-data' / 'semantic'
+    kb_dir.mkdir(parents=True, exist_ok=True)
+    now = datetime.utcnow().isoformat() + "Z"
+    metadata = {
+        'version': '2.0.0',
+        'project_path': str(repo_dir),
+        'last_full_extraction': now,
+        'last_update': now,
+        'extraction_method': 'full',
+        'git_info': {'commit_hash': commit, 'branch': 'main', 'has_uncommitted_changes': False},
+        'file_registry': registry,
+        'statistics': {'total_files_analyzed': len(registry)},
+    }
+    (kb_dir / 'extraction_metadata.json').write_text(json.dumps(metadata), encoding='utf-8')
+
+
+def create_repo(repo_dir: Path, files: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Create a git repository with `files` tracked files in one commit, and
+    extraction metadata recorded at that commit.
+
+    Args:
+        repo_dir: Directory to create (must not exist or be empty)
+        files: Number of tracked files
+        seed: Random seed
+
+    Returns:
+        Repository description: base commit, tracked paths, registry size,
+        durations in ms
+    """
+    rng = random.Random(seed)
+    repo_dir = Path(repo_dir)
+    repo_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    paths = plan_files(files, rng)
+    write_files(repo_dir, paths, rng)
+    (repo_dir / '.gitignore').write_text("node_modules/\n.fellow-data/\n", encoding='utf-8')
+    dependencies = [f"node_modules/{rng.choice(DOMAIN_NOUNS)}-lib-{serial}/index.js"
+                    for serial in range(max(10, min(2000, files // 50)))]
+    write_files(repo_dir, dependencies, rng, files)
+    written = time.perf_counter()
+
+    git(repo_dir, 'init', '-q')
+    git(repo_dir, 'add', '-A')
+    git(repo_dir, 'commit', '-q', '-m', 'Initial commit')
+    commit = git(repo_dir, 'rev-parse', 'HEAD')
+    committed = time.perf_counter()
+
+    registry = build_registry(repo_dir, paths)
+    write_extraction_metadata(repo_dir, commit, registry)
+    registered = time.perf_counter()
+
+    return {
+        'base_commit': commit,
+        'paths': paths,
+        'files': len(paths),
+        'ignored_files': len(dependencies),
+        'registry_files': len(registry),
+        'registry_bytes': sum(entry['size'] for entry in registry.values()),
+        'write_ms': round((written - started) * 1000, 1),
+        'git_ms': round((committed - written) * 1000, 1),
+        'registry_ms': round((registered - committed) * 1000, 1),
+    }
+
+
+def _share(total: int, fraction: float) -> int:
+    return int(round(total * fraction))
+
+
+def apply_churn(repo_dir: Path, paths: List[str], seed: int = 0, **shares: float) -> Dict[str, Any]:
+    """
+    Change a repository created by create_repo since its extraction.
+
+    Args:
+        repo_dir: Repository directory
+        paths: Tracked paths (create_repo's 'paths')
+        seed: Random seed
+        **shares: Overrides of DEFAULT_CHURN (shares of the tracked files)
+
+    Returns:
+        Counts of each kind of change, and the analyzable files an
+        incremental build should re-analyze ('expected': modified, new and
+        deleted counts)
+    """
+    settings = dict(DEFAULT_CHURN, **shares)
+    rng = random.Random(seed + 1)
+    repo_dir = Path(repo_dir)
+    total = len(paths)
+    serial = total + 100_000
+
+    counts = {kind: _share(total, settings[kind]) for kind in ('churn', 'renames', 'deletes', 'dirty')}
+    picked = rng.sample(paths, min(total, sum(counts.values())))
+    groups = {}
+    for kind in ('churn', 'renames', 'deletes', 'dirty'):
+        groups[kind], picked = picked[:counts[kind]], picked[counts[kind]:]
+
+    # Second commit: modifications, renames, deletions, additions
+    for path in groups['churn']:
+        with open(repo_dir / path, 'a', encoding='utf-8') as f:
+            f.write(f"\n// churn {rng.getrandbits(32):08x}\n" if not path.endswith('.py')
+                    else f"\n# churn {rng.getrandbits(32):08x}\n")
+    renamed = []
+    for path in groups['renames']:
+        stem, _, extension = path.rpartition('.')
+        target = f"{stem}_moved.{extension}"
+        os.rename(repo_dir / path, repo_dir / target)
+        renamed.append(target)
+    for path in groups['deletes']:
+        os.remove(repo_dir / path)
+    added = [f"src/{MODULES[index % len(MODULES)]}/added/{rng.choice(DOMAIN_NOUNS)}_{serial + index}.py"
+             for index in range(_share(total, settings['new']))]
+    write_files(repo_dir, added, rng, serial)
+    serial += len(added)
+    git(repo_dir, 'add', '-A')
+    git(repo_dir, 'commit', '-q', '-m', 'Churn')
+
+    # Working tree: modifications (every other one staged), untracked files
+    for path in groups['dirty']:
+        with open(repo_dir / path, 'a', encoding='utf-8') as f:
+            f.write("\n// wip\n" if not path.endswith('.py') else "\n# wip\n")
+    staged = groups['dirty'][::2]
+    if staged:
+        git(repo_dir, 'add', '--pathspec-from-file=-', stdin='\n'.join(staged) + '\n')
+    untracked = [f"src/{MODULES[index % len(MODULES)]}/wip/{rng.choice(DOMAIN_NOUNS)}_{serial + index}.py"
+                 for index in range(_share(total, settings['untracked']))]
+    write_files(repo_dir, untracked, rng, serial)
+
+    analyzable = should_analyze_file
+    return {
+        'shares': settings,
+        'modified': len(groups['churn']),
+        'renamed': len(renamed),
+        'deleted': len(groups['deletes']),
+        'added': len(added),
+        'uncommitted': len(groups['dirty']),
+        'staged': len(staged),
+        'untracked': len(untracked),
+        'expected': {
+            'modified': sum(map(analyzable, groups['churn'] + groups['dirty'])),
+            'new': sum(map(analyzable, renamed + added + untracked)),
+            'deleted': sum(map(analyzable, groups['renames'] + groups['deletes'])),
+        },
+        'changed_paths': [path for path in groups['churn'] + groups['dirty'] + renamed + added + untracked
+                          if analyzable(path)],
+    }
+
+
+def copy_without_git(repo_dir: Path, copy_dir: Path):
+    """Copy a repository's working tree (and .fellow-data) without .git, for the fallback path."""
+    shutil.copytree(repo_dir, copy_dir, ignore=shutil.ignore_patterns('.git'), symlinks=True)
+
+
+def main():
+    """Main entry point for the synthetic repository generator."""
+    args = sys.argv[1:]
+    try:
+        files = parse_sizes(pop_option(args, '--files', '10k'))[0]
+        seed = int(pop_option(args, '--seed', '0'))
+        shares = {kind: float(pop_option(args, f'--{kind}', str(default)))
+                  for kind, default in DEFAULT_CHURN.items()}
+    except (ValueError, IndexError) as e:
+        print(f"❌ Error: Invalid number: {e}", file=sys.stderr)
+        sys.exit(1)
+    no_copy = '--no-copy' in args
+    args = [arg for arg in args if arg != '--no-copy']
+    if not args:
+        print("Usage: synthetic_repo.py <target-path> [--files N] [--seed N] [--churn F] [--renames F] "
+              "[--deletes F] [--new F] [--untracked F] [--dirty F] [--no-copy]", file=sys.stderr)
+        sys.exit(1)
+
+    target = Path(args[0]).resolve()
+    if target.exists() and any(target.iterdir()):
+        print(f"❌ Error: Target path is not empty: {target}", file=sys.stderr)
+        sys.exit(1)
+
+    repo_dir = target / 'repo'
+    repo = create_repo(repo_dir, files, seed)
+    churn = apply_churn(repo_dir, repo['paths'], seed, **shares)
+    if not no_copy:
+        copy_without_git(repo_dir, target / 'copy')
+
+    print(f"✅ Synthetic repository written to {repo_dir}")
+    for key in ('base_commit', 'files', 'ignored_files', 'registry_files', 'write_ms', 'git_ms', 'registry_ms'):
+        print(f"   • {key}: {repo[key]}")
+    for key in ('modified', 'renamed', 'deleted', 'added', 'uncommitted', 'staged', 'untracked'):
+        print(f"   • {key}: {churn[key]}")
+    if not no_copy:
+        print(f"✅ Non-git copy written to {target / 'copy'}")
+
+
+if __name__ == "__main__":
+    main()
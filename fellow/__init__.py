@@ -0,0 +1,15 @@
+"""
+Fellow - semantic knowledge extraction and context enrichment.
+
+The importable library behind the plugin's hooks. The shared knowledge base
+utilities live as flat modules in the plugin's tools/ directory, which this
+package puts on sys.path.
+"""
+
+import os
+import sys
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS_DIR = os.path.join(PLUGIN_DIR, 'tools')
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
@@ -0,0 +1,176 @@
+"""
+Fellow Configuration
+
+Typed settings of the fellow-context-enrichment hook, read from
+.claude-plugin/hooks.json once per process.
+
+The hook runs on every prompt, so parsing JSON each time is avoided: the
+parsed config is cached next to hooks.json (hooks.config.cache, marshal
+format) keyed by the file's mtime and size, and only reparsed when
+hooks.json changes. Like detection, this module only uses modules the
+interpreter has already loaded under `python3 -I -S`.
+"""
+
+import marshal
+import os
+
+from fellow import PLUGIN_DIR
+
+HOOK_NAME = 'fellow-context-enrichment'
+
+CONFIG_CACHE_FILE = 'hooks.config.cache'
+CONFIG_CACHE_FORMAT = 1
+
+# Defaults for settings missing from hooks.json
+DEFAULT_MIN_CONFIDENCE = 0.5
+DEFAULT_MAX_CONTEXT_TOKENS = 600
+DEFAULT_DEADLINE_MS = 75
+DEFAULT_DEDUP_WINDOW = 10
+DEFAULT_DEDUP_REFRESH_SECONDS = 1800
+DEFAULT_PROMPT_CACHE_ENTRIES = 256
+DEFAULT_LOG_MAX_FILE_MB = 5
+DEFAULT_LOG_RETENTION_DAYS = 14
+DEFAULT_LOG_MAX_TOTAL_MB = 50
+DEFAULT_PROFILE_KEEP = 20
+
+# FELLOW_LOGGING values that override logging_enabled
+LOGGING_ON_VALUES = ('1', 'true', 'yes')
+LOGGING_OFF_VALUES = ('0', 'false', 'no')
+
+
+class Settings:
+    """Typed view of the fellow-context-enrichment config."""
+
+    def __init__(self, config: dict = None, stamp: str = ''):
+        """
+        Args:
+            config: The config block of the hook in hooks.json
+            stamp: Change stamp (mtime and size) of the hooks.json it came from
+        """
+        config = dict(config or {})
+        self.raw = config
+        self.stamp = stamp
+
+        # Detection
+        self.detect_coding_requests = bool(config.get('detect_coding_requests', True))
+        self.min_confidence = float(config.get('min_confidence', DEFAULT_MIN_CONFIDENCE))
+        self.keywords = [str(keyword) for keyword in config.get('keywords') or []]
+
+        # Enrichment budgets
+        self.auto_load_kb = bool(config.get('auto_load_kb', True))
+        self.silent_mode = bool(config.get('silent_mode', False))
+        self.max_context_tokens = int(config.get('max_context_tokens', DEFAULT_MAX_CONTEXT_TOKENS) or 0)
+        self.deadline_ms = float(config.get('deadline_ms', DEFAULT_DEADLINE_MS) or 0)
+
+        # Session deduplication and prompt cache
+        self.session_dedup = bool(config.get('session_dedup', True))
+        self.dedup_window = int(config.get('dedup_window', DEFAULT_DEDUP_WINDOW))
+        self.dedup_refresh_seconds = float(config.get('dedup_refresh_seconds', DEFAULT_DEDUP_REFRESH_SECONDS))
+        self.dedup_mode = str(config.get('dedup_mode', 'reference'))
+        self.prompt_cache = bool(config.get('prompt_cache', True))
+        self.prompt_cache_entries = int(config.get('prompt_cache_entries', DEFAULT_PROMPT_CACHE_ENTRIES))
+
+        # Logging
+        self.logging_enabled = bool(config.get('logging_enabled', False))
+        self.log_max_file_mb = float(config.get('log_max_file_mb', DEFAULT_LOG_MAX_FILE_MB))
+        self.log_retention_days = int(config.get('log_retention_days', DEFAULT_LOG_RETENTION_DAYS))
+        self.log_max_total_mb = float(config.get('log_max_total_mb', DEFAULT_LOG_MAX_TOTAL_MB))
+        self.log_compress = bool(config.get('log_compress', True))
+
+        # Latency metrics
+        self.metrics_enabled = bool(config.get('metrics_enabled', True))
+        self.metrics_prometheus = bool(config.get('metrics_prometheus', False))
+
+        # Profiling (enabled per run with FELLOW_PROFILE)
+        self.profile_keep = int(config.get('profile_keep', DEFAULT_PROFILE_KEEP))
+
+    def get(self, key: str, default=None):
+        """Get a raw config value (for keys without a typed setting)."""
+        return self.raw.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"Settings(stamp={self.stamp!r}, logging_enabled={self.logging_enabled})"
+
+
+_settings = {}
+
+
+def config_stamp(hooks_config: str) -> str:
+    """Get the change stamp (mtime and size) of hooks.json."""
+    try:
+        stat = os.stat(hooks_config)
+    except OSError:
+        return ''
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_hook_config(hooks_config: str) -> dict:
+    """Parse the config block of the enrichment hook from hooks.json."""
+    import json
+    try:
+        with open(hooks_config, 'r') as f:
+            for hook in json.load(f).get('hooks', []):
+                if hook.get('name') == HOOK_NAME:
+                    return hook.get('config', {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def load_settings(plugin_dir: str = PLUGIN_DIR) -> Settings:
+    """
+    Load the hook settings of a plugin, once per process.
+
+    Args:
+        plugin_dir: Plugin root directory (holding .claude-plugin/hooks.json)
+
+    Returns:
+        Settings (defaults for anything hooks.json doesn't set)
+    """
+    plugin_dir = str(plugin_dir)
+    settings = _settings.get(plugin_dir)
+    if settings is not None:
+        return settings
+
+    config_dir = os.path.join(plugin_dir, '.claude-plugin')
+    hooks_config = os.path.join(config_dir, 'hooks.json')
+    cache_file = os.path.join(config_dir, CONFIG_CACHE_FILE)
+    stamp = config_stamp(hooks_config)
+
+    config = None
+    try:
+        with open(cache_file, 'rb') as f:
+            cache_format, cached_stamp, cached_config = marshal.load(f)
+        if cache_format == CONFIG_CACHE_FORMAT and cached_stamp == stamp:
+            config = cached_config
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    if config is None:
+        config = read_hook_config(hooks_config)
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                marshal.dump((CONFIG_CACHE_FORMAT, stamp, config), f)
+            os.replace(tmp_file, cache_file)
+        except (OSError, ValueError):
+            pass  # Read-only plugin directory: parse once per process
+
+    settings = _settings[plugin_dir] = Settings(config, stamp)
+    return settings
+
+
+def is_logging_enabled(settings: Settings = None) -> bool:
+    """
+    Check whether enrichment events are logged.
+
+    FELLOW_LOGGING=1/true/yes or 0/false/no overrides logging_enabled.
+    """
+    env_value = os.environ.get('FELLOW_LOGGING', '').lower()
+    if env_value in LOGGING_ON_VALUES:
+        return True
+    if env_value in LOGGING_OFF_VALUES:
+        return False
+    if settings is None:
+        settings = load_settings()
+    return settings.logging_enabled
@@ -0,0 +1,29 @@
+"""
+Fellow context enrichment.
+
+    from fellow.enrich import Enricher
+
+    enricher = Enricher()              # KB found from the working directory
+    enricher.load()                    # Optional: load it before the first prompt
+    result = enricher.enrich("Add a refund method to OrderService")
+    print(result.text)
+
+The Enricher loads and indexes the knowledge base once, so editor
+integrations, evaluation scripts and long-running servers reuse it across
+prompts. The detection module is importable on its own (the hook imports it
+before deciding whether to enrich), so the heavier exports below are loaded
+on first access.
+"""
+
+__all__ = ['Enricher', 'EnrichmentResult', 'Deadline']
+
+
+def __getattr__(name):
+    """Load the enrichment pipeline on first access to its exports."""
+    if name in ('Enricher', 'EnrichmentResult'):
+        from fellow.enrich import enricher
+        return getattr(enricher, name)
+    if name == 'Deadline':
+        from fellow.enrich.pipeline import Deadline
+        return Deadline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,224 @@
+"""
+Fellow Coding Request Detection
+
+Decides whether a prompt is a coding request and which intent it expresses.
+Runs on every prompt before anything else is imported, so this module only
+uses modules the interpreter has already loaded; the enrichment pipeline
+(fellow.enrich.Enricher) is only loaded for coding requests.
+
+Detection follows the fellow-context-enrichment settings (fellow.config): the
+configured `keywords` (intent verbs and code entity terms), `min_confidence`
+and `detect_coding_requests`. The config is compiled once into a detector,
+a word table mapping each term to its intent and weight, and cached next to
+hooks.json (hooks.detection.cache, marshal format) keyed by the config
+file's mtime and size. Matching is by whole word, so "add" no longer
+matches "address"; plural, past and -ing forms of a term match too.
+"""
+
+import marshal
+import os
+
+from fellow.config import DEFAULT_MIN_CONFIDENCE, load_settings
+
+# Prompts longer than this are detected and scored against a condensed form
+# (see large_prompt.py)
+LARGE_PROMPT_CHARS = 16 * 1024
+
+# Coding request detection patterns (used when hooks.json sets no keywords)
+CODING_KEYWORDS = {
+    'create': ['add', 'create', 'implement', 'build', 'write', 'generate', 'make'],
+    'modify': ['update', 'modify', 'change', 'enhance', 'improve', 'optimize', 'refactor'],
+    'fix': ['fix', 'repair', 'debug', 'resolve', 'correct'],
+    'delete': ['delete', 'remove', 'clean up', 'eliminate'],
+    'test': ['test', 'validate', 'verify', 'check'],
+}
+
+CODE_ENTITIES = [
+    'endpoint', 'api', 'route', 'handler', 'function', 'method', 'class',
+    'service', 'component', 'module', 'interface', 'model', 'entity',
+    'controller', 'middleware', 'utility', 'helper', 'decorator', 'hook'
+]
+
+# Imperative mood: prompts opening with a verb, or a polite request for one
+IMPERATIVE_VERBS = (
+    'add', 'create', 'implement', 'build', 'write', 'update', 'modify', 'fix',
+    'refactor', 'delete', 'remove',
+)
+POLITE_REQUEST_PREFIXES = (('can', 'you'), ('could', 'you'), ('please',), ('would', 'you'))
+POLITE_REQUEST_VERBS = {'add': True, 'create': True, 'implement': True, 'update': True, 'fix': True}
+
+# Confidence contributed by each kind of match
+INTENT_TERM_WEIGHT = 0.4
+ENTITY_TERM_WEIGHT = 0.3
+IMPERATIVE_WEIGHT = 0.3
+
+DETECTOR_CACHE_FILE = 'hooks.detection.cache'
+DETECTOR_FORMAT = 1
+
+# ASCII punctuation (except '_') folded to spaces before splitting into words
+_WORD_SEPARATORS = str.maketrans({char: ' ' for char in '!"#$%&\'()*+,-./:;<=>?@[\\]^`{|}~'})
+
+# Inflections stripped when a word isn't a term itself ("fixes", "creating")
+_SUFFIXES = ('ing', 'ed', 'es', 's')
+
+
+def compile_detector(config: dict) -> dict:
+    """
+    Compile the hook config into a detector.
+
+    Configured keywords that are known intent verbs keep their intent; any
+    other keyword counts as a code entity term, alongside CODE_ENTITIES.
+    Without configured keywords, the built-in CODING_KEYWORDS are used.
+
+    Args:
+        config: The fellow-context-enrichment config block of hooks.json
+
+    Returns:
+        Detector dictionary (plain data, so it can be cached with marshal)
+    """
+    intent_order = list(CODING_KEYWORDS)
+    known_intents = {
+        keyword: category for category, keywords in CODING_KEYWORDS.items() for keyword in keywords
+    }
+    keywords = [str(keyword).lower().strip() for keyword in config.get('keywords') or []]
+    if not keywords:
+        keywords = list(known_intents)
+
+    terms = {}
+    phrases = []
+    for keyword in keywords + CODE_ENTITIES:
+        if not keyword:
+            continue
+        category = known_intents.get(keyword)
+        if category is not None:
+            term = (intent_order.index(category), INTENT_TERM_WEIGHT)
+        else:
+            term = (-1, ENTITY_TERM_WEIGHT)
+        if ' ' in keyword:
+            phrases.append((' ' + ' '.join(keyword.split()) + ' ',) + term)
+        else:
+            terms.setdefault(keyword, term)
+
+    return {
+        'format': DETECTOR_FORMAT,
+        'enabled': bool(config.get('detect_coding_requests', True)),
+        'min_confidence': float(config.get('min_confidence', DEFAULT_MIN_CONFIDENCE)),
+        'intents': intent_order,
+        'terms': terms,
+        'phrases': phrases,
+    }
+
+
+def load_detector(plugin_dir: str) -> dict:
+    """
+    Load the detector for a plugin, from the cache when hooks.json is unchanged.
+
+    Args:
+        plugin_dir: Plugin root directory (holding .claude-plugin/hooks.json)
+
+    Returns:
+        Detector dictionary (see compile_detector)
+    """
+    settings = load_settings(plugin_dir)
+    cache_file = os.path.join(str(plugin_dir), '.claude-plugin', DETECTOR_CACHE_FILE)
+    stamp = settings.stamp
+
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_stamp, detector = marshal.load(f)
+        if cached_stamp == stamp and detector.get('format') == DETECTOR_FORMAT:
+            return detector
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    detector = compile_detector(settings.raw)
+    try:
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            marshal.dump((stamp, detector), f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # Read-only plugin directory: compile on every run
+    return detector
+
+
+_default_detector = None
+
+
+def _lookup(word: str, terms: dict):
+    """Look up a word, or its uninflected form, in the term table."""
+    term = terms.get(word)
+    if term is not None:
+        return term
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            stem = word[:-len(suffix)]
+            term = terms.get(stem) or terms.get(stem + 'e')
+            if term is not None:
+                return term
+    return None
+
+
+def detect_coding_request(prompt: str, detector: dict = None) -> tuple:
+    """
+    Detect if a prompt is a coding request.
+
+    Args:
+        prompt: User prompt
+        detector: Compiled detector (see load_detector); defaults to the
+            built-in keywords
+
+    Returns:
+        (is_coding_request, intent_category, confidence)
+    """
+    global _default_detector
+    if detector is None:
+        if _default_detector is None:
+            _default_detector = compile_detector({})
+        detector = _default_detector
+
+    if not detector['enabled']:
+        return False, 'unknown', 0.0
+
+    words = prompt.lower().translate(_WORD_SEPARATORS).split()
+    terms = detector['terms']
+
+    # Check for coding keywords (the earliest intent category wins) and
+    # code entity mentions
+    intent_rank = None
+    intent_weight = 0.0
+    entity_weight = 0.0
+    matches = [_lookup(word, terms) for word in words]
+    if detector['phrases']:
+        text = ' ' + ' '.join(words) + ' '
+        matches.extend(phrase[1:] for phrase in detector['phrases'] if phrase[0] in text)
+
+    for match in matches:
+        if match is None:
+            continue
+        rank, weight = match
+        if rank < 0:
+            entity_weight = max(entity_weight, weight)
+        else:
+            intent_weight = max(intent_weight, weight)
+            if intent_rank is None or rank < intent_rank:
+                intent_rank = rank
+
+    # Check for imperative mood (commands)
+    imperative_found = bool(words) and words[0] in IMPERATIVE_VERBS
+    if not imperative_found:
+        for prefix in POLITE_REQUEST_PREFIXES:
+            if tuple(words[:len(prefix)]) == prefix:
+                rest = words[len(prefix):]
+                imperative_found = any(_lookup(word, POLITE_REQUEST_VERBS) for word in rest)
+                break
+
+    # Calculate confidence
+    confidence = round(intent_weight + entity_weight + (IMPERATIVE_WEIGHT if imperative_found else 0.0), 2)
+    is_coding_request = confidence >= detector['min_confidence']
+
+    intent_category = detector['intents'][intent_rank] if intent_rank is not None else None
+    if not intent_category and is_coding_request:
+        intent_category = 'create'  # Default
+
+    return is_coding_request, intent_category or 'unknown', confidence
@@ -0,0 +1,422 @@
+"""
+Enricher: context enrichment over a knowledge base loaded once.
+
+The hook builds an Enricher per prompt; long-running callers keep one and
+call reload_if_changed() to pick up rebuilt or merged knowledge bases.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fellow.config import Settings, load_settings
+from fellow.enrich.detection import LARGE_PROMPT_CHARS, compile_detector, detect_coding_request
+from fellow.enrich.pipeline import (
+    Deadline,
+    GUARDRAIL_PARTS,
+    build_context_blocks,
+    extract_applicable_constraints,
+    extract_relevant_entities,
+    extract_relevant_workflows,
+    get_entity_terms,
+    load_knowledge_base,
+    render_context,
+    select_context_blocks
+)
+from kb_render import RENDERED_CONTEXT_FILE, estimate_tokens, kb_size, kb_version_stamp
+from project_paths import find_knowledge_base
+
+# Measured load cost, kept in .fellow-data/cache/ and rewritten when a load
+# differs from the estimate by more than LOAD_COST_TOLERANCE. The estimate
+# halves every LOAD_COST_HALF_LIFE seconds, so a slow measurement (a cold
+# network file system) that made the hook skip the load is retried, and
+# re-measured, before long.
+LOAD_COST_FILE = 'kb_load_cost.json'
+LOAD_COST_TOLERANCE = 0.25
+LOAD_COST_HALF_LIFE = 600
+
+# Files loaded for guardrails only (see GUARDRAIL_PARTS)
+GUARDRAIL_FILES = ('conceptual_knowledge.json', RENDERED_CONTEXT_FILE)
+
+
+class EnrichmentResult:
+    """Outcome of enriching one prompt."""
+
+    def __init__(self, prompt: str, text: Optional[str] = None):
+        """
+        Args:
+            prompt: User prompt
+            text: Prompt to send (defaults to the user prompt, unchanged)
+        """
+        self.prompt = prompt
+        self.text = prompt if text is None else text
+        self.is_coding_request = False
+        self.intent = 'unknown'
+        self.confidence = 0.0
+        self.kb_found = False
+        self.entities: List[Dict[str, Any]] = []
+        self.workflows: List[Dict[str, Any]] = []
+        self.constraints: List[Dict[str, Any]] = []
+        self.blocks: List[Dict[str, Any]] = []
+        self.context_stats: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.deadline_hit = False
+
+    @property
+    def enriched(self) -> bool:
+        """Whether context was added to the prompt."""
+        return self.text != self.prompt
+
+    def __repr__(self) -> str:
+        return (f"EnrichmentResult(intent={self.intent!r}, enriched={self.enriched}, "
+                f"entities={len(self.entities)}, workflows={len(self.workflows)}, "
+                f"constraints={len(self.constraints)}, deadline_hit={self.deadline_hit})")
+
+
+class Enricher:
+    """Enriches prompts with context from a knowledge base loaded once."""
+
+    def __init__(
+        self,
+        kb_dir: Optional[Path] = None,
+        config: Optional[Any] = None,
+        prompt_cache: Optional[Any] = None
+    ):
+        """
+        Args:
+            kb_dir: Knowledge base directory (defaults to the one found from
+                the working directory)
+            config: Settings, or a fellow-context-enrichment config
+                dictionary (defaults to the settings from hooks.json)
+            prompt_cache: Cache of selections across processes, such as
+                prompt_cache.PromptResultCache (None disables caching)
+        """
+        if config is None:
+            config = load_settings()
+        elif not isinstance(config, Settings):
+            config = Settings(config)
+        self.settings = config
+        self.config = config.raw
+        self.kb_dir = Path(kb_dir) if kb_dir is not None else find_knowledge_base()
+        self.detector = compile_detector(self.config)
+        self.prompt_cache = prompt_cache
+
+        self._kb = None
+        self._kb_stamp = None
+        self._load_cost = None
+
+    @property
+    def kb(self) -> Optional[Dict[str, Any]]:
+        """The loaded knowledge base (loaded on first use, see load())."""
+        return self.load()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the knowledge base and build its entity terms, if not loaded yet.
+
+        Long-running callers call this once up front, so that the load isn't
+        charged to the deadline of the first prompt they enrich and entity
+        scoring reuses the terms (see get_entity_terms()) across prompts.
+
+        Returns:
+            The loaded knowledge base, or None if there is none
+        """
+        kb = self._load_kb()
+        if kb is not None:
+            get_entity_terms(kb)
+        return kb
+
+    def _load_kb(self) -> Optional[Dict[str, Any]]:
+        """Load the knowledge base if not loaded yet (without building entity terms)."""
+        if self._kb is None and self.kb_dir is not None:
+            started = time.perf_counter()
+            self._kb_stamp = kb_version_stamp(self.kb_dir)
+            self._kb = load_knowledge_base(self.kb_dir)
+            if self._kb is not None:
+                self._record_load_cost((time.perf_counter() - started) * 1000)
+        return self._kb
+
+    def estimate_load_ms(self, names: Optional[tuple] = None) -> float:
+        """
+        Estimate how long loading knowledge base files will take.
+
+        Scales the last measured load (kept in .fellow-data/cache/, so the
+        hook's per-prompt processes share it) to the current size of the
+        files, halving it every LOAD_COST_HALF_LIFE seconds since it was
+        measured. Until a load has been measured the estimate is 0, so the
+        first load happens and gets measured.
+
+        Args:
+            names: Knowledge base file names (defaults to all loaded for enrichment)
+
+        Returns:
+            Estimated load time in milliseconds
+        """
+        if self._load_cost is None:
+            try:
+                with open(self.kb_dir.parent / 'cache' / LOAD_COST_FILE, 'r') as f:
+                    self._load_cost = json.load(f)
+            except (OSError, ValueError):
+                self._load_cost = {}
+
+        cost = self._load_cost
+        if not (isinstance(cost, dict) and isinstance(cost.get('bytes'), int) and cost['bytes'] > 0
+                and isinstance(cost.get('load_ms'), (int, float))
+                and isinstance(cost.get('measured_at'), (int, float))):
+            return 0.0
+        age = max(0.0, time.time() - cost['measured_at'])
+        decay = 0.5 ** (age / LOAD_COST_HALF_LIFE)
+        return kb_size(self.kb_dir, names) * cost['load_ms'] / cost['bytes'] * decay
+
+    def _record_load_cost(self, load_ms: float):
+        """Remember a measured load, if the estimate was off."""
+        estimate = self.estimate_load_ms()
+        if self._load_cost and abs(estimate - load_ms) <= LOAD_COST_TOLERANCE * load_ms:
+            return
+
+        self._load_cost = {
+            'bytes': kb_size(self.kb_dir),
+            'load_ms': round(load_ms, 3),
+            'measured_at': round(time.time(), 3),
+        }
+        cost_file = self.kb_dir.parent / 'cache' / LOAD_COST_FILE
+        try:
+            cost_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cost_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(self._load_cost, f)
+            os.replace(tmp_file, cost_file)
+        except OSError:
+            pass  # The next load is measured again
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the knowledge base if a build or merge rewrote it.
+
+        Returns:
+            True if the knowledge base was reloaded
+        """
+        if self._kb is None or self.kb_dir is None:
+            return False
+        if kb_version_stamp(self.kb_dir) == self._kb_stamp:
+            return False
+        self._kb = None
+        return self.load() is not None
+
+    def _select(
+        self,
+        scoring_prompt: str,
+        intent: str,
+        deadline: Deadline,
+        timings: Dict[str, float]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Select the knowledge relevant to a prompt and render candidate blocks.
+
+        Stages stop early when the deadline runs out. Loading the knowledge
+        base can't be interrupted, so it is skipped up front when its
+        estimated cost doesn't fit the remaining budget, and only guardrails
+        are selected (see _select_guardrails()); a load that was paid for is
+        always used. During extraction the items
+        gathered so far are kept. Complete selections are stored in the
+        prompt cache.
+
+        Returns:
+            Selection dictionary (entities, workflows, constraints, blocks,
+            cache_hit), or None if no KB was loaded
+        """
+        cache_key = None
+        if self.prompt_cache is not None:
+            cache_key = self.prompt_cache.key(scoring_prompt, intent, kb_version_stamp(self.kb_dir))
+            cached = self.prompt_cache.get(cache_key)
+            if cached is not None and isinstance(cached.get('entities'), list):
+                return dict(cached, cache_hit=True)
+
+        if deadline.expired('find_kb'):
+            return None
+        if (self._kb is None and deadline.expires_at is not None
+                and not deadline.allows(self.estimate_load_ms(), 'load_kb')):
+            return self._select_guardrails(scoring_prompt, intent, deadline, timings)
+        stage_start = time.perf_counter_ns()
+        kb = self._load_kb()
+        timings['load_kb'] = (time.perf_counter_ns() - stage_start) / 1e6
+        if not kb:
+            return None
+        # A load that overran still selects from the first entities scored
+        deadline.expired('load_kb')
+
+        workflows, constraints = [], []
+        stage_start = time.perf_counter_ns()
+        entities = extract_relevant_entities(scoring_prompt, kb, deadline=deadline.expires_at)
+        timings['entities'] = (time.perf_counter_ns() - stage_start) / 1e6
+        if not deadline.expired('entities'):
+            stage_start = time.perf_counter_ns()
+            workflows = extract_relevant_workflows(scoring_prompt, kb)
+            timings['workflows'] = (time.perf_counter_ns() - stage_start) / 1e6
+            if not deadline.expired('workflows'):
+                stage_start = time.perf_counter_ns()
+                constraints = extract_applicable_constraints(scoring_prompt, intent, kb)
+                timings['constraints'] = (time.perf_counter_ns() - stage_start) / 1e6
+                deadline.expired('constraints')
+
+        selection = {
+            'entities': entities,
+            'workflows': workflows,
+            'constraints': constraints,
+            'blocks': build_context_blocks(entities, workflows, constraints, kb),
+        }
+        # Partial selections are not cached: a later run with time to spare
+        # would otherwise keep serving the truncated selection
+        if cache_key is not None and deadline.hit_stage is None:
+            self.prompt_cache.put(cache_key, selection)
+        return dict(selection, cache_hit=False)
+
+    def _select_guardrails(
+        self,
+        scoring_prompt: str,
+        intent: str,
+        deadline: Deadline,
+        timings: Dict[str, float]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Select guardrails and architecture context only, from the small conceptual files.
+
+        Used when the full knowledge base doesn't fit the remaining budget, so
+        a medium-sized knowledge base still adds its guardrails instead of
+        passing the prompt through. Never cached (the selection is partial).
+
+        Returns:
+            Selection dictionary, or None if even these files don't fit
+        """
+        remaining = deadline.remaining()
+        if remaining is not None and remaining * 1000 < self.estimate_load_ms(GUARDRAIL_FILES):
+            return None
+
+        stage_start = time.perf_counter_ns()
+        kb = load_knowledge_base(self.kb_dir, GUARDRAIL_PARTS)
+        timings['load_kb'] = (time.perf_counter_ns() - stage_start) / 1e6
+        if not kb:
+            return None
+
+        stage_start = time.perf_counter_ns()
+        constraints = extract_applicable_constraints(scoring_prompt, intent, kb)
+        timings['constraints'] = (time.perf_counter_ns() - stage_start) / 1e6
+        return {
+            'entities': [],
+            'workflows': [],
+            'constraints': constraints,
+            'blocks': build_context_blocks([], [], constraints, kb),
+            'cache_hit': False,
+        }
+
+    def enrich(
+        self,
+        prompt: str,
+        intent: Optional[str] = None,
+        confidence: Optional[float] = None,
+        scoring_prompt: Optional[str] = None,
+        session_state: Optional[Any] = None,
+        started: Optional[float] = None
+    ) -> EnrichmentResult:
+        """
+        Enrich a prompt.
+
+        Every stage checks the configured deadline (deadline_ms). When it
+        runs out, the knowledge gathered so far is rendered (entities first,
+        then workflows, then constraints), or the prompt is returned
+        unchanged if nothing was gathered yet.
+
+        Args:
+            prompt: User prompt
+            intent: Intent category, if already detected (skips detection)
+            confidence: Detection confidence, if already detected
+            scoring_prompt: Text to match knowledge against, if not the
+                prompt itself (defaults to the condensed form of a large prompt)
+            session_state: Session state used to skip static blocks already
+                sent, such as session_dedup.SessionContextState
+            started: time.perf_counter() value the deadline counts from
+                (defaults to now)
+
+        Returns:
+            Enrichment result; `text` is the prompt to send
+        """
+        started = time.perf_counter() if started is None else started
+        deadline = Deadline(self.settings.deadline_ms, started)
+        result = EnrichmentResult(prompt)
+
+        if scoring_prompt is None:
+            scoring_prompt = prompt
+            if len(prompt) > LARGE_PROMPT_CHARS:
+                from fellow.enrich.large_prompt import condense_prompt
+                scoring_prompt = condense_prompt(prompt)
+
+        if intent is None:
+            stage_start = time.perf_counter_ns()
+            is_coding, intent, confidence = detect_coding_request(scoring_prompt, self.detector)
+            result.timings['detect'] = (time.perf_counter_ns() - stage_start) / 1e6
+            result.is_coding_request, result.intent, result.confidence = is_coding, intent, confidence
+            if not is_coding:
+                return self._finish(result, started)
+        else:
+            result.is_coding_request, result.intent = True, intent
+            result.confidence = 1.0 if confidence is None else confidence
+
+        if self.kb_dir is None:
+            return self._finish(result, started)
+        result.kb_found = True
+
+        selection = self._select(scoring_prompt, intent, deadline, result.timings)
+        result.deadline_hit = deadline.hit_stage is not None
+
+        # If no relevant knowledge found, pass through
+        if not selection or not (selection['entities'] or selection['workflows'] or selection['constraints']):
+            if result.deadline_hit:
+                result.context_stats = deadline.stats()
+            return self._finish(result, started)
+
+        result.entities = selection['entities']
+        result.workflows = selection['workflows']
+        result.constraints = selection['constraints']
+
+        # Generate enriched context within the configured token budget,
+        # skipping static blocks already sent earlier in this session
+        stage_start = time.perf_counter_ns()
+        result.blocks, result.context_stats = select_context_blocks(
+            selection['blocks'],
+            max_tokens=self.settings.max_context_tokens,
+            session_state=session_state,
+            dedup_mode=self.settings.dedup_mode
+        )
+        if result.blocks:
+            result.text = render_context(prompt, result.blocks)
+            result.context_stats['context_tokens'] = estimate_tokens(result.text[:len(result.text) - len(prompt)])
+        result.timings['render'] = (time.perf_counter_ns() - stage_start) / 1e6
+
+        result.context_stats['cache_hit'] = selection['cache_hit']
+        result.context_stats['large_prompt'] = scoring_prompt is not prompt
+        result.context_stats.update(deadline.stats())
+        return self._finish(result, started)
+
+    def enrich_batch(self, prompts: List[str], **kwargs) -> List[EnrichmentResult]:
+        """
+        Enrich several prompts against the same knowledge base.
+
+        The knowledge base is reloaded first if it changed on disk.
+
+        Args:
+            prompts: User prompts
+            **kwargs: Passed to enrich() for every prompt
+
+        Returns:
+            Enrichment results, in prompt order
+        """
+        self.reload_if_changed()
+        return [self.enrich(prompt, **kwargs) for prompt in prompts]
+
+    @staticmethod
+    def _finish(result: EnrichmentResult, started: float) -> EnrichmentResult:
+        """Record the total time of an enrichment."""
+        result.timings['total'] = (time.perf_counter() - started) * 1000
+        return result
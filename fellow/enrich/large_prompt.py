@@ -0,0 +1,81 @@
+"""
+Fellow Large-Prompt Fast Path
+
+Pasted logs and stack traces can make a prompt hundreds of kilobytes long.
+Detection and scoring compare the prompt against every keyword and every
+knowledge base item, so their cost grows with prompt length times KB size.
+For prompts over LARGE_PROMPT_CHARS (see detection.py) the hook instead
+detects and scores against a condensed prompt: the opening of the prompt,
+where the request itself usually is, followed by the salient identifiers
+(file paths, CamelCase and snake_case symbols, exception names) collected in
+a single linear scan of the rest.
+"""
+
+import re
+from typing import List
+
+from file_filters import SOURCE_EXTENSIONS
+
+# Characters kept verbatim from the start of the prompt
+HEAD_CHARS = 2048
+
+# Maximum number of distinct identifiers kept, in order of first appearance
+MAX_IDENTIFIERS = 256
+
+_SOURCE_EXTENSION_PATTERN = '|'.join(sorted(ext.lstrip('.') for ext in SOURCE_EXTENSIONS))
+
+_IDENTIFIER_RE = re.compile(
+    r"(?<![\w./-])[\w.-]*/[\w./-]+\.\w+"                         # file paths
+    rf"|\b[\w-]+\.(?:{_SOURCE_EXTENSION_PATTERN})\b"               # source file names
+    r"|\b\w*(?:Error|Exception)\b"                                # exception names
+    r"|\b[A-Z][a-z0-9]+(?:[A-Z][a-z0-9]*)+\b"                     # CamelCase symbols
+    r"|\b[A-Za-z][a-z0-9]*(?:_[A-Za-z0-9]+)+\b"                   # snake_case symbols
+)
+
+
+def extract_identifiers(text: str, max_identifiers: int = MAX_IDENTIFIERS) -> List[str]:
+    """
+    Collect salient identifiers from text in a single scan.
+
+    The text is split on whitespace once; repeated tokens (common in logs)
+    and plain lowercase words are skipped before the identifier pattern runs.
+
+    Args:
+        text: Text to scan
+        max_identifiers: Maximum number of distinct identifiers returned
+
+    Returns:
+        Distinct identifiers in order of first appearance
+    """
+    seen = {}
+    scanned = set()
+    for token in text.split():
+        if token in scanned:
+            continue
+        scanned.add(token)
+        if token.islower() and '/' not in token and '_' not in token and '.' not in token:
+            continue
+
+        for match in _IDENTIFIER_RE.finditer(token):
+            identifier = match.group(0).strip('.-/')
+            if identifier and identifier not in seen:
+                seen[identifier] = None
+        if len(seen) >= max_identifiers:
+            break
+
+    return list(seen)[:max_identifiers]
+
+
+def condense_prompt(prompt: str) -> str:
+    """
+    Condense a large prompt for detection and scoring.
+
+    Args:
+        prompt: Full user prompt
+
+    Returns:
+        The prompt's opening followed by the identifiers found in the rest
+    """
+    head = prompt[:HEAD_CHARS]
+    identifiers = extract_identifiers(prompt[HEAD_CHARS:])
+    return head + '\n' + ' '.join(identifiers)
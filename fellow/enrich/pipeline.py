@@ -0,0 +1,571 @@
+"""
+Fellow context enrichment pipeline.
+
+The stages behind Enricher (see enricher.py):
+1. Loads semantic knowledge from .fellow-data/semantic/
+2. Retrieves relevant entities, workflows, patterns, and constraints
+3. Packs them into context blocks within a token budget
+4. Renders the enriched prompt with architectural guardrails
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+from kb_format import load_kb_file
+from kb_graph import expand_neighbors, get_entity_graph
+from kb_constraints import get_constraint_index, rank_constraints
+from file_filters import SOURCE_EXTENSIONS
+from kb_render import (
+    RENDERED_CONTEXT_FILE,
+    estimate_tokens,
+    get_rendered_context,
+    make_block,
+    render_constraint,
+    render_entity,
+    render_static_blocks,
+    render_workflow
+)
+
+
+# Knowledge base parts loaded for full enrichment, and for guardrails only
+KB_PARTS = ('factual', 'procedural', 'conceptual')
+GUARDRAIL_PARTS = ('conceptual',)
+
+# Relationship-graph expansion of the top-scoring entities
+NEIGHBOR_HOPS = 2
+NEIGHBOR_DECAY = 0.5
+EXPANSION_BUDGET_MS = 5.0
+
+# Entities scored between deadline checks (the first batch is always scored)
+DEADLINE_CHECK_ENTITIES = 1024
+
+# Context rendering: sections in output order, with their headers
+CONTEXT_SECTIONS = [
+    ('entities', "**Relevant Entities:**"),
+    ('workflows', "**Relevant Workflows:**"),
+    ('constraints', "**Architectural Guardrails (MUST follow):**"),
+    ('architecture', None),
+    ('patterns', None),
+]
+
+# Upper bound on items per section, regardless of budget
+MAX_CONTEXT_ITEMS = {'entities': 5, 'workflows': 3, 'constraints': 5}
+
+# Relevance of each section's top item; lower-ranked items decay by rank
+SECTION_WEIGHTS = {
+    'constraints': 1.0,
+    'entities': 0.9,
+    'workflows': 0.7,
+    'architecture': 0.5,
+    'patterns': 0.4,
+}
+RANK_DECAY = 0.5
+
+# Token cost of the fixed context frame (title, separator, request label)
+# and of opening each section (header line plus trailing blank line)
+CONTEXT_FRAME_TOKENS = 12
+SECTION_HEADER_TOKENS = {
+    section: (len(header) // 4 + 1 if header else 0) + 1 for section, header in CONTEXT_SECTIONS
+}
+
+
+def load_knowledge_base(kb_dir: Path, parts: Tuple[str, ...] = KB_PARTS) -> Optional[Dict[str, Any]]:
+    """
+    Load knowledge base files (any storage mode, see kb_format.py).
+
+    Args:
+        kb_dir: Knowledge base directory
+        parts: Parts to load: 'factual', 'procedural' and/or 'conceptual'
+            (which includes the pre-rendered static context). GUARDRAIL_PARTS
+            loads just enough for guardrails and architecture context.
+    """
+    try:
+        kb = {}
+
+        factual_file = kb_dir / 'factual_knowledge.json'
+        if 'factual' in parts and factual_file.exists():
+            kb['factual'] = load_kb_file(factual_file)
+
+        procedural_file = kb_dir / 'procedural_knowledge.json'
+        if 'procedural' in parts and procedural_file.exists():
+            kb['procedural'] = load_kb_file(procedural_file)
+
+        conceptual_file = kb_dir / 'conceptual_knowledge.json'
+        if 'conceptual' in parts and conceptual_file.exists():
+            kb['conceptual'] = load_kb_file(conceptual_file)
+
+            # Static context blocks pre-rendered at build/merge time
+            rendered_file = kb_dir / RENDERED_CONTEXT_FILE
+            if rendered_file.exists():
+                rendered = get_rendered_context(load_kb_file(rendered_file), kb_dir)
+                if rendered:
+                    kb['rendered'] = rendered
+
+        if not kb:
+            return None
+
+        return kb
+
+    except Exception as e:
+        print(f"Warning: Failed to load knowledge base: {e}", file=sys.stderr)
+        return None
+
+
+def _entity_terms(entities: List[Dict[str, Any]]):
+    """Yield the lowercased name, lowercased purpose words and category of each entity."""
+    return (
+        (
+            entity.get('name', '').lower(),
+            frozenset(entity.get('purpose', '').lower().split()),
+            entity.get('category', '')
+        )
+        for entity in entities
+    )
+
+
+def get_entity_terms(kb: Dict[str, Any]) -> List[Tuple[str, frozenset, str]]:
+    """
+    Get the terms entities are scored on, building them once per loaded knowledge base.
+
+    Worth it for callers scoring many prompts against one load (see
+    Enricher.load()); a single prompt is scored straight from the entities.
+
+    Returns:
+        (lowercased name, lowercased purpose words, category) per entity, in
+        entity order
+    """
+    entities = kb.get('factual', {}).get('entities', [])
+    terms = kb.get('entity_terms')
+    if not isinstance(terms, list) or len(terms) != len(entities):
+        terms = kb['entity_terms'] = list(_entity_terms(entities))
+    return terms
+
+
+def extract_relevant_entities(
+    prompt: str,
+    kb: Dict[str, Any],
+    max_entities: int = 5,
+    deadline: Optional[float] = None
+) -> List[Dict]:
+    """
+    Extract entities relevant to the prompt.
+
+    Entities are scored against the prompt, then the top-scoring ones spread a
+    decayed score to their neighbors in the precomputed entity graph, so the
+    models and services a mentioned entity depends on are surfaced too. The
+    precomputed importance score separates entities with equal relevance.
+
+    Scoring stops at `deadline` (a time.perf_counter() value), checked every
+    DEADLINE_CHECK_ENTITIES entities, keeping the entities scored so far.
+    Graph expansion stops at its own time budget or at `deadline`, whichever
+    comes first.
+    """
+    if 'factual' not in kb or 'entities' not in kb['factual']:
+        return []
+
+    entities = kb['factual']['entities']
+    prompt_lower = prompt.lower()
+    prompt_words = set(prompt_lower.split())
+    mentions_auth = 'auth' in prompt_lower
+    mentions_service = 'service' in prompt_lower
+
+    terms = kb.get('entity_terms')
+    if not isinstance(terms, list) or len(terms) != len(entities):
+        terms = _entity_terms(entities)
+
+    # Score entities by relevance (keyed by position in the entity list)
+    scores = {}
+    for position, (name, purpose_words, category) in enumerate(terms):
+        if (deadline is not None and position and not position % DEADLINE_CHECK_ENTITIES
+                and time.perf_counter() >= deadline):
+            break
+        score = 0
+
+        # Exact name match
+        if name in prompt_lower:
+            score += 10
+
+        # Purpose match (keywords)
+        score += len(purpose_words & prompt_words) * 2
+
+        # Category match
+        if mentions_auth and 'auth' in name:
+            score += 5
+        if mentions_service and category == 'technical_entity':
+            score += 3
+
+        if score > 0:
+            scores[position] = score
+
+    # Expand one or two hops along entity relationships, within a time budget
+    graph = get_entity_graph(kb['factual'])
+    if graph and scores:
+        expansion_deadline = time.perf_counter() + EXPANSION_BUDGET_MS / 1000
+        if deadline is not None:
+            expansion_deadline = min(expansion_deadline, deadline)
+        expand_neighbors(
+            scores, graph,
+            seeds=max_entities,
+            max_hops=NEIGHBOR_HOPS,
+            decay=NEIGHBOR_DECAY,
+            deadline=expansion_deadline
+        )
+
+    # Sort by score, breaking ties by precomputed importance (0-1), and
+    # return top N
+    ranked = sorted(
+        scores,
+        key=lambda position: (-scores[position], -entities[position].get('importance', 0), position)
+    )
+    return [entities[position] for position in ranked[:max_entities]]
+
+
+def extract_relevant_workflows(prompt: str, kb: Dict[str, Any], max_workflows: int = 3) -> List[Dict]:
+    """Extract workflows relevant to the prompt."""
+    if 'procedural' not in kb or 'workflows' not in kb['procedural']:
+        return []
+
+    workflows = kb['procedural']['workflows']
+    prompt_lower = prompt.lower()
+
+    # Score workflows by relevance
+    scored_workflows = []
+    for workflow in workflows:
+        score = 0
+
+        # Name match
+        if workflow.get('name', '').lower().replace('_', ' ') in prompt_lower:
+            score += 10
+
+        # Purpose/description match
+        purpose = workflow.get('purpose', '').lower()
+        if any(word in purpose for word in prompt_lower.split()):
+            score += 5
+
+        # Type match
+        workflow_type = workflow.get('type', '')
+        if 'endpoint' in prompt_lower and workflow_type == 'request_handler':
+            score += 5
+
+        if score > 0:
+            scored_workflows.append((score, workflow))
+
+    scored_workflows.sort(reverse=True, key=lambda x: x[0])
+    return [workflow for score, workflow in scored_workflows[:max_workflows]]
+
+
+def extract_file_mentions(prompt: str) -> List[str]:
+    """Extract file paths mentioned in the prompt (paths or source file names)."""
+    files = []
+    for token in prompt.split():
+        token = token.strip('`\'"()[]{}<>,;:!?')
+        if not token or '://' in token:
+            continue
+        if '/' in token or os.path.splitext(token)[1].lower() in SOURCE_EXTENSIONS:
+            files.append(token.split(':', 1)[0])  # drop :line suffixes
+    return files
+
+
+def extract_applicable_constraints(
+    prompt: str,
+    intent: str,
+    kb: Dict[str, Any],
+    max_constraints: int = 10
+) -> List[Dict]:
+    """
+    Extract architectural constraints applicable to the request.
+
+    Constraints are ranked by how strongly their type applies to the intent,
+    how many prompt terms their text shares, and whether their scope (layer,
+    module or file globs) covers the files the prompt mentions.
+    """
+    if 'conceptual' not in kb or 'constraints' not in kb['conceptual']:
+        return []
+
+    constraints = kb['conceptual']['constraints']
+    index = get_constraint_index(kb['conceptual'])
+
+    return rank_constraints(
+        prompt,
+        intent,
+        constraints,
+        index,
+        files=extract_file_mentions(prompt),
+        max_constraints=max_constraints
+    )
+
+
+def build_context_blocks(
+    entities: List[Dict],
+    workflows: List[Dict],
+    constraints: List[Dict],
+    kb: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Build the candidate context blocks for packing.
+
+    Each block is one rendered item (an entity, workflow, constraint, the
+    architecture style or the design patterns) with the section it belongs to
+    and a relevance value. Items arrive ordered by relevance, so values decay
+    with rank within a section. Guardrail, architecture style and design
+    pattern blocks come pre-rendered from rendered_context.json when it is
+    up to date.
+    """
+    blocks = []
+    rendered = kb.get('rendered')
+
+    def add(section: str, rank: int, block: Dict[str, Any]):
+        blocks.append(dict(block, value=SECTION_WEIGHTS[section] / (1 + RANK_DECAY * rank)))
+
+    # Relevant Entities
+    for rank, entity in enumerate(entities[:MAX_CONTEXT_ITEMS['entities']]):
+        add('entities', rank, make_block('entities', render_entity(entity)))
+
+    # Relevant Workflows
+    for rank, workflow in enumerate(workflows[:MAX_CONTEXT_ITEMS['workflows']]):
+        add('workflows', rank, make_block('workflows', render_workflow(workflow)))
+
+    # Applicable Constraints
+    positions = {}
+    if rendered:
+        positions = {id(c): i for i, c in enumerate(kb['conceptual'].get('constraints', []))}
+    for rank, constraint in enumerate(constraints[:MAX_CONTEXT_ITEMS['constraints']]):
+        position = positions.get(id(constraint))
+        if position is not None:
+            add('constraints', rank, rendered['constraints'][position])
+        else:
+            add('constraints', rank, make_block('constraints', render_constraint(constraint)))
+
+    # Architecture Style and Design Patterns
+    if rendered:
+        static_blocks = rendered['static']
+    elif 'conceptual' in kb:
+        static_blocks = render_static_blocks(kb['conceptual'])
+    else:
+        static_blocks = []
+    for block in static_blocks:
+        add(block['section'], 0, block)
+
+    return blocks
+
+
+def pack_context_blocks(
+    blocks: List[Dict[str, Any]],
+    max_tokens: Optional[int],
+    reserved: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Select blocks that fit the token budget, greedily by relevance per token.
+
+    Opening a section also costs its header. Blocks that don't fit are
+    skipped, so smaller lower-ranked blocks can still use the remaining budget.
+
+    Args:
+        blocks: Candidate context blocks
+        max_tokens: Token budget (None or 0 selects every block)
+        reserved: Blocks charged before any candidate, such as the reference
+            to context sent earlier in the session (kept only if they fit)
+
+    Returns:
+        (selected blocks in their original order followed by the reserved
+        blocks that fit, estimated context tokens)
+    """
+    used = CONTEXT_FRAME_TOKENS
+    opened = set()
+
+    def fits(block: Dict[str, Any]) -> bool:
+        nonlocal used
+        cost = block['tokens']
+        if block['section'] not in opened:
+            cost += SECTION_HEADER_TOKENS[block['section']]
+        if max_tokens and used + cost > max_tokens:
+            return False
+        used += cost
+        opened.add(block['section'])
+        return True
+
+    kept_reserved = [block for block in reserved or [] if fits(block)]
+
+    order = sorted(
+        range(len(blocks)),
+        key=lambda i: (-blocks[i]['value'] / blocks[i]['tokens'], i)
+    )
+    selected = {i for i in order if fits(blocks[i])}
+
+    return [block for i, block in enumerate(blocks) if i in selected] + kept_reserved, used
+
+
+def render_context(prompt: str, blocks: List[Dict[str, Any]]) -> str:
+    """Render selected context blocks, section by section, ahead of the prompt."""
+    context_parts = []
+
+    context_parts.append("📋 **Context from Knowledge Base**")
+    context_parts.append("")
+
+    for section, header in CONTEXT_SECTIONS:
+        section_blocks = [block for block in blocks if block['section'] == section]
+        if not section_blocks:
+            continue
+        if header:
+            context_parts.append(header)
+        for block in section_blocks:
+            context_parts.extend(block['lines'])
+        context_parts.append("")
+
+    context_parts.append("---")
+    context_parts.append("")
+    context_parts.append("**User Request:**")
+    context_parts.append(prompt)
+
+    return '\n'.join(context_parts)
+
+
+def reference_repeated_blocks(repeated: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Build short reference blocks standing in for context already sent this session.
+
+    Guardrails collapse to a single reminder line. The one-line architecture
+    style and design pattern blocks are simply dropped.
+    """
+    count = sum(1 for block in repeated if block['section'] == 'constraints')
+    if not count:
+        return []
+    noun = 'guardrail' if count == 1 else 'guardrails'
+    return [{
+        'section': 'constraints',
+        'lines': [f"- _(+{count} {noun} sent earlier in this session still apply)_"],
+        'value': 0.0,
+        'tokens': 12,
+        'hash': '',
+    }]
+
+
+def select_context_blocks(
+    blocks: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    session_state: Optional[Any] = None,
+    dedup_mode: str = 'reference'
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Select the context blocks to send, within the token budget.
+
+    Args:
+        blocks: Candidate context blocks (see build_context_blocks)
+        max_tokens: Token budget for the context (excluding the prompt itself).
+            None or 0 selects every candidate block.
+        session_state: Session state used to skip static blocks already sent
+            in this session, such as session_dedup.SessionContextState
+            (None disables deduplication)
+        dedup_mode: 'reference' collapses repeated guardrails to a reminder
+            line, 'drop' omits them
+
+    Returns:
+        (selected blocks in render order, packing statistics)
+    """
+    repeated = []
+    reference = []
+    if session_state is not None:
+        blocks_to_pack, repeated = session_state.split_blocks(blocks)
+        if repeated and dedup_mode == 'reference':
+            # Charged before the remaining blocks are packed
+            reference = reference_repeated_blocks(repeated)
+    else:
+        blocks_to_pack = blocks
+
+    selected, _ = pack_context_blocks(blocks_to_pack, max_tokens, reserved=reference)
+    if session_state is not None and selected:
+        session_state.record_blocks(selected)
+
+    stats = {
+        'token_budget': max_tokens or None,
+        'context_tokens': 0,
+        'blocks_total': len(blocks),
+        'blocks_selected': len(selected),
+        'blocks_deduplicated': len(repeated),
+    }
+    return selected, stats
+
+
+def generate_enriched_context(
+    prompt: str,
+    blocks: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    session_state: Optional[Any] = None,
+    dedup_mode: str = 'reference'
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Generate enriched context to prepend to the user's prompt.
+
+    Args:
+        prompt: User prompt
+        blocks: Candidate context blocks (see build_context_blocks)
+        max_tokens: Token budget for the context (see select_context_blocks)
+        session_state: Session state used to skip static blocks already sent
+        dedup_mode: 'reference' or 'drop' (see select_context_blocks)
+
+    Returns:
+        (enriched prompt, packing statistics). The prompt is returned
+        unchanged if no block fits the budget or everything was already sent.
+    """
+    selected, stats = select_context_blocks(blocks, max_tokens, session_state, dedup_mode)
+    if not selected:
+        return prompt, stats
+
+    enriched_prompt = render_context(prompt, selected)
+    stats['context_tokens'] = estimate_tokens(enriched_prompt[:len(enriched_prompt) - len(prompt)])
+    return enriched_prompt, stats
+
+
+class Deadline:
+    """Latency budget for one enrichment (the hook starts it once the pipeline is loaded)."""
+
+    def __init__(self, budget_ms: Optional[float], started: Optional[float] = None):
+        """
+        Args:
+            budget_ms: Budget in milliseconds (None or 0 disables the deadline)
+            started: time.perf_counter() value the budget counts from (defaults to now)
+        """
+        self.budget_ms = budget_ms or None
+        if started is None:
+            started = time.perf_counter()
+        self.expires_at = started + budget_ms / 1000 if budget_ms else None
+        self.hit_stage = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the budget (None without a deadline)."""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.perf_counter()
+
+    def allows(self, ms: float, stage: str) -> bool:
+        """
+        Check whether a step expected to take `ms` milliseconds fits in the budget.
+
+        For steps that can't be interrupted, such as loading the knowledge
+        base. Records the stage as the one that ran out if it doesn't fit.
+        """
+        remaining = self.remaining()
+        if remaining is None or remaining * 1000 >= ms:
+            return True
+        if self.hit_stage is None:
+            self.hit_stage = stage
+        return False
+
+    def expired(self, stage: str) -> bool:
+        """Check whether the budget is used up, recording the first stage that ran out."""
+        if self.expires_at is None or time.perf_counter() < self.expires_at:
+            return False
+        if self.hit_stage is None:
+            self.hit_stage = stage
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Deadline fields for the logged context statistics."""
+        return {
+            'deadline_ms': self.budget_ms,
+            'deadline_hit': self.hit_stage is not None,
+            'deadline_stage': self.hit_stage,
+        }
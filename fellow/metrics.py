@@ -0,0 +1,250 @@
+"""
+Fellow Hook Latency Metrics
+
+Per-stage latency histograms of the enrichment hook, kept in a small
+fixed-size file (.fellow-data/metrics/hook_latency.hist) that every hook run
+adds its stage timings to once the prompt has been printed. Buckets grow
+geometrically from 10 µs to several seconds, so percentiles stay accurate
+to within a bucket (25%) whatever the number of runs recorded.
+
+With `metrics_prometheus` set, the histograms are also written in the
+Prometheus textfile format (fellow_hook.prom) for node_exporter's textfile
+collector.
+
+Recording runs at the end of every hook, including the fast path for
+non-coding prompts, so like detection this module avoids pathlib, typing,
+json and array (which imports collections): the histogram is kept in plain
+lists and packed with struct.
+"""
+
+import os
+import struct
+
+# Hook stages, in execution order (timings of other names are ignored)
+STAGES = (
+    'interpreter',  # Shell start to the first line of enrich-context.py
+    'condense',     # Condensing a large prompt
+    'detect',
+    'import',       # Loading the enrichment pipeline (coding requests only)
+    'find_kb',
+    'load_kb',
+    'entities',
+    'workflows',
+    'constraints',
+    'render',
+    'total',        # Hook start to output (excluding the interpreter)
+    'logging',      # Writing the log event, after output
+)
+
+# Bucket upper bounds in milliseconds; the last bucket holds everything above
+FIRST_BUCKET_MS = 0.01
+BUCKET_GROWTH = 1.25
+NUM_BUCKETS = 72
+BUCKET_BOUNDS_MS = tuple(FIRST_BUCKET_MS * BUCKET_GROWTH ** i for i in range(NUM_BUCKETS - 1))
+
+HISTOGRAM_FILE = 'hook_latency.hist'
+PROMETHEUS_FILE = 'fellow_hook.prom'
+_MAGIC = b'FLH1'
+
+# File layout after the magic: little-endian uint64 bucket counts, stage by
+# stage, then one float64 sum of milliseconds per stage
+_COUNTS = struct.Struct(f'<{len(STAGES) * NUM_BUCKETS}Q')
+_SUMS = struct.Struct(f'<{len(STAGES)}d')
+
+
+def _bucket_index(ms: float) -> int:
+    """Find the bucket holding a duration."""
+    low, high = 0, len(BUCKET_BOUNDS_MS)
+    while low < high:
+        mid = (low + high) // 2
+        if ms <= BUCKET_BOUNDS_MS[mid]:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+class LatencyHistogram:
+    """Fixed-size per-stage latency histograms."""
+
+    def __init__(self):
+        self.counts = [0] * (len(STAGES) * NUM_BUCKETS)
+        self.sums = [0.0] * len(STAGES)
+
+    def add(self, stage: str, ms: float):
+        """Record one duration of a stage."""
+        if stage not in STAGES:
+            return
+        index = STAGES.index(stage)
+        self.counts[index * NUM_BUCKETS + _bucket_index(ms)] += 1
+        self.sums[index] += ms
+
+    def buckets(self, stage: str) -> list:
+        """Bucket counts of a stage."""
+        start = STAGES.index(stage) * NUM_BUCKETS
+        return self.counts[start:start + NUM_BUCKETS]
+
+    def count(self, stage: str) -> int:
+        """Number of durations recorded for a stage."""
+        return sum(self.buckets(stage))
+
+    def mean(self, stage: str) -> float:
+        """Mean duration of a stage in milliseconds (None if nothing was recorded)."""
+        count = self.count(stage)
+        return self.sums[STAGES.index(stage)] / count if count else None
+
+    def percentile(self, stage: str, q: float) -> float:
+        """
+        Estimate a percentile of a stage's durations.
+
+        Args:
+            stage: Stage name
+            q: Percentile (0-100)
+
+        Returns:
+            Duration in milliseconds, interpolated within its bucket, or None
+            if nothing was recorded
+        """
+        buckets = self.buckets(stage)
+        total = sum(buckets)
+        if not total:
+            return None
+
+        rank = q / 100 * total
+        seen = 0
+        for index, count in enumerate(buckets):
+            if count and seen + count >= rank:
+                low = BUCKET_BOUNDS_MS[index - 1] if index else 0.0
+                if index >= len(BUCKET_BOUNDS_MS):
+                    return low
+                high = BUCKET_BOUNDS_MS[index]
+                return low + (high - low) * max(0.0, rank - seen) / count
+            seen += count
+        return BUCKET_BOUNDS_MS[-1]
+
+    def to_bytes(self) -> bytes:
+        """Serialize the histogram (fixed size)."""
+        return _MAGIC + _COUNTS.pack(*self.counts) + _SUMS.pack(*self.sums)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'LatencyHistogram':
+        """Deserialize a histogram; unreadable data gives an empty histogram."""
+        histogram = cls()
+        counts_end = 4 + _COUNTS.size
+        if data[:4] == _MAGIC and len(data) == counts_end + _SUMS.size:
+            histogram.counts = list(_COUNTS.unpack_from(data, 4))
+            histogram.sums = list(_SUMS.unpack_from(data, counts_end))
+        return histogram
+
+
+def find_metrics_dir(start_dir: str = None) -> str:
+    """
+    Find the metrics directory of the project containing a directory.
+
+    Resolves through project_paths, whose per-directory cache makes this one
+    or two stat calls.
+
+    Args:
+        start_dir: Directory to search from (defaults to the working directory)
+
+    Returns:
+        Path of <project>/.fellow-data/metrics, or None outside a Fellow project
+    """
+    from project_paths import resolve_dirs
+
+    fellow_data = resolve_dirs(start_dir)[1]
+    return os.path.join(fellow_data, 'metrics') if fellow_data else None
+
+
+def record_timings(metrics_dir: str, timings: dict, prometheus: bool = False):
+    """
+    Add one hook run's stage timings to the histogram file.
+
+    The file is updated under an exclusive lock, so concurrent sessions
+    don't lose each other's runs.
+
+    Args:
+        metrics_dir: Metrics directory (.fellow-data/metrics/)
+        timings: Stage durations in milliseconds
+        prometheus: Also write the Prometheus textfile
+    """
+    import fcntl
+
+    os.makedirs(metrics_dir, exist_ok=True)
+    fd = os.open(os.path.join(metrics_dir, HISTOGRAM_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        histogram = LatencyHistogram.from_bytes(os.read(fd, 1 << 16))
+        for stage, ms in timings.items():
+            histogram.add(stage, ms)
+        data = histogram.to_bytes()
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, data)
+        os.ftruncate(fd, len(data))
+    finally:
+        os.close(fd)
+
+    if prometheus:
+        write_prometheus(os.path.join(metrics_dir, PROMETHEUS_FILE), histogram)
+
+
+def record_hook_run(timings: dict, settings) -> bool:
+    """
+    Record a hook run's timings in the current project's metrics, if enabled.
+
+    Args:
+        timings: Stage durations in milliseconds
+        settings: Hook settings (see fellow.config)
+
+    Returns:
+        True if the timings were recorded
+    """
+    if not settings.metrics_enabled:
+        return False
+    metrics_dir = find_metrics_dir()
+    if metrics_dir is None:
+        return False
+    try:
+        record_timings(metrics_dir, timings, prometheus=settings.metrics_prometheus)
+    except OSError:
+        return False  # Metrics are best-effort
+    return True
+
+
+def load_histogram(metrics_dir: str) -> LatencyHistogram:
+    """Load the histogram file of a metrics directory (empty if missing)."""
+    try:
+        with open(os.path.join(metrics_dir, HISTOGRAM_FILE), 'rb') as f:
+            return LatencyHistogram.from_bytes(f.read())
+    except OSError:
+        return LatencyHistogram()
+
+
+def render_prometheus(histogram: LatencyHistogram) -> str:
+    """Render the histograms in the Prometheus text exposition format."""
+    name = 'fellow_hook_stage_duration_seconds'
+    lines = [
+        f"# HELP {name} Latency of the Fellow enrichment hook by stage.",
+        f"# TYPE {name} histogram",
+    ]
+    for stage in STAGES:
+        buckets = histogram.buckets(stage)
+        if not any(buckets):
+            continue
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound / 1000:.6g}"}} {cumulative}')
+        cumulative += buckets[-1]
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sums[STAGES.index(stage)] / 1000:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(prom_file: str, histogram: LatencyHistogram):
+    """Write the Prometheus textfile atomically (the collector may read it anytime)."""
+    tmp_file = f"{prom_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        f.write(render_prometheus(histogram))
+    os.replace(tmp_file, prom_file)
@@ -0,0 +1,189 @@
+"""
+Fellow Profiling
+
+Opt-in profiles of the hook and the knowledge base tools, for diagnosing
+slow runs on a user's machine. With FELLOW_PROFILE set, enrich-context.py,
+detect_changes.py and merge_knowledge.py run their main() under cProfile:
+
+    FELLOW_PROFILE=cpu    cProfile only (also 1, true, yes)
+    FELLOW_PROFILE=mem    cProfile plus tracemalloc (also memory, all)
+
+Every run writes <script>-<time>-<pid>.pstats and a .json summary (wall
+time, and with tracemalloc the peak traced memory and the top allocation
+sites) to .fellow-data/profiles/. Only the newest `profile_keep` runs of
+each script are kept. tools/profile_report.py aggregates them.
+
+The hook only imports this module when FELLOW_PROFILE is set, so the fast
+path is unaffected.
+"""
+
+import os
+import sys
+import time
+
+from fellow import PLUGIN_DIR
+from fellow.config import load_settings
+from project_paths import resolve_dirs
+
+PROFILES_DIR = 'profiles'
+PSTATS_SUFFIX = '.pstats'
+SUMMARY_SUFFIX = '.json'
+
+# Allocation sites listed in a run's summary
+TOP_ALLOCATIONS = 25
+
+PROFILE_OFF_VALUES = ('', '0', 'false', 'no', 'off')
+PROFILE_MEMORY_VALUES = ('mem', 'memory', 'all')
+
+
+def profile_mode() -> str:
+    """
+    Get the profiling mode requested by FELLOW_PROFILE.
+
+    Returns:
+        'cpu', 'mem' (cProfile plus tracemalloc) or None when profiling is off
+    """
+    value = os.environ.get('FELLOW_PROFILE', '').strip().lower()
+    if value in PROFILE_OFF_VALUES:
+        return None
+    return 'mem' if value in PROFILE_MEMORY_VALUES else 'cpu'
+
+
+def find_profiles_dir(start_dir: str = None) -> str:
+    """
+    Find the profiles directory of the project containing a directory.
+
+    Outside a Fellow project, profiles go to the plugin's own .fellow-data/
+    (as logs do). Resolves through project_paths, like the logs and metrics
+    directories.
+
+    Args:
+        start_dir: Directory to search from (defaults to the working directory)
+
+    Returns:
+        Path of the profiles directory (not necessarily existing yet)
+    """
+    fellow_data = resolve_dirs(start_dir)[1]
+    if fellow_data is None:
+        fellow_data = os.path.join(PLUGIN_DIR, '.fellow-data')
+    return os.path.join(fellow_data, PROFILES_DIR)
+
+
+def allocation_summary(snapshot, top: int = TOP_ALLOCATIONS) -> list:
+    """
+    Summarize the largest allocation sites of a tracemalloc snapshot.
+
+    Returns:
+        List of {'location', 'size', 'count'} dictionaries, largest first
+    """
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+    return [{
+        'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+        'size': stat.size,
+        'count': stat.count,
+    } for stat in snapshot.statistics('lineno')[:top]]
+
+
+def prune_profiles(profiles_dir: str, script: str, keep: int) -> int:
+    """
+    Delete all but the newest `keep` runs of a script.
+
+    Returns:
+        Number of runs deleted
+    """
+    prefix = f"{script}-"
+    runs = sorted(
+        name[:-len(PSTATS_SUFFIX)] for name in os.listdir(profiles_dir)
+        if name.startswith(prefix) and name.endswith(PSTATS_SUFFIX)
+    )
+    stale = runs[:-keep] if keep > 0 else runs
+    for stem in stale:
+        for suffix in (PSTATS_SUFFIX, SUMMARY_SUFFIX):
+            try:
+                os.unlink(os.path.join(profiles_dir, stem + suffix))
+            except FileNotFoundError:
+                pass
+    return len(stale)
+
+
+def save_profile(profiles_dir: str, script: str, profiler, summary: dict, keep: int) -> str:
+    """
+    Write a run's profile and summary, then apply the retention cap.
+
+    Args:
+        profiles_dir: Profiles directory (.fellow-data/profiles/)
+        script: Name of the profiled script
+        profiler: Finished cProfile.Profile
+        summary: Run summary (wall time, memory)
+        keep: Runs of the script to keep
+
+    Returns:
+        Path of the .pstats file
+    """
+    import json
+
+    os.makedirs(profiles_dir, exist_ok=True)
+    # Names sort chronologically, which prune_profiles relies on
+    stem = os.path.join(
+        profiles_dir,
+        f"{script}-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{os.getpid()}"
+    )
+    profiler.dump_stats(stem + PSTATS_SUFFIX)
+    with open(stem + SUMMARY_SUFFIX, 'w') as f:
+        json.dump(summary, f, indent=2)
+    prune_profiles(profiles_dir, script, keep)
+    return stem + PSTATS_SUFFIX
+
+
+def run_profiled(script: str, func, start_dir: str = None):
+    """
+    Run a script's entry point, under the profilers FELLOW_PROFILE asks for.
+
+    Profiles are written even when the entry point exits with sys.exit()
+    or raises. Failing to write them never fails the run.
+
+    Args:
+        script: Name of the script (prefix of the profile files)
+        func: Entry point, called without arguments
+        start_dir: Directory of the project being worked on (defaults to
+                   the working directory)
+
+    Returns:
+        The entry point's return value
+    """
+    mode = profile_mode()
+    if mode is None:
+        return func()
+
+    import cProfile
+    if mode == 'mem':
+        import tracemalloc
+        tracemalloc.start()
+
+    profiler = cProfile.Profile()
+    started = time.time()
+    started_ns = time.perf_counter_ns()
+    try:
+        return profiler.runcall(func)
+    finally:
+        summary = {
+            'script': script,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+            'wall_ms': round((time.perf_counter_ns() - started_ns) / 1e6, 3),
+            'mode': mode,
+            'argv': sys.argv[1:],
+        }
+        if mode == 'mem':
+            summary['current_bytes'], summary['peak_bytes'] = tracemalloc.get_traced_memory()
+            summary['allocations'] = allocation_summary(tracemalloc.take_snapshot())
+            tracemalloc.stop()
+        try:
+            keep = load_settings(PLUGIN_DIR).profile_keep
+            save_profile(find_profiles_dir(start_dir), script, profiler, summary, keep)
+        except OSError:
+            pass  # Profiling is best-effort
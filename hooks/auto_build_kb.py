@@ -11,54 +11,42 @@ import sys
 from pathlib import Path
 from typing import Optional, Tuple
 
+# Shared path resolution lives in the plugin's tools/ directory
+TOOLS_DIR = Path(__file__).resolve().parent.parent / 'tools'
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
 
-def find_knowledge_base(start_dir: Optional[Path] = None) -> Optional[Path]:
-    """
-    Find the knowledge base directory.
+from project_paths import get_project_root, resolve_project
 
-    Searches upward from start_dir for .fellow-data/semantic/
-    """
-    if start_dir is None:
-        start_dir = Path.cwd()
 
-    current = start_dir
-    for _ in range(10):  # Search up to 10 levels
-        kb_dir = current / '.fellow-data' / 'semantic'
-        if kb_dir.exists() and kb_dir.is_dir():
-            # Check if KB has files
-            required_files = [
-                'factual_knowledge.json',
-                'procedural_knowledge.json',
-                'conceptual_knowledge.json'
-            ]
-            if any((kb_dir / f).exists() for f in required_files):
-                return kb_dir
-        if current.parent == current:  # Reached root
-            break
-        current = current.parent
-
-    return None
-
-
-def get_project_root(start_dir: Optional[Path] = None) -> Path:
+def find_knowledge_base(start_dir: Optional[Path] = None) -> Optional[Path]:
     """
-    Get the project root directory (where KB should be built).
+    Find the knowledge base directory.
 
-    Returns current directory or the first parent with .git/
+    Resolves .fellow-data/semantic/ upward from start_dir (see
+    project_paths.py), continuing past knowledge base directories that hold
+    no knowledge files.
     """
-    if start_dir is None:
-        start_dir = Path.cwd()
-
+    required_files = [
+        'factual_knowledge.json',
+        'procedural_knowledge.json',
+        'conceptual_knowledge.json'
+    ]
     current = start_dir
-    for _ in range(10):
-        if (current / '.git').exists():
-            return current
-        if current.parent == current:  # Reached root
-            break
-        current = current.parent
-
-    # No .git found, use current directory
-    return start_dir
+    while True:
+        kb_dir = resolve_project(current).kb_dir
+        if kb_dir is None:
+            return None
+
+        # Check if KB has files
+        if any((kb_dir / f).exists() for f in required_files):
+            return kb_dir
+
+        # Empty: keep searching above the directory holding it
+        holder = kb_dir.parent.parent
+        if holder.parent == holder:  # Reached root
+            return None
+        current = holder.parent
 
 
 def kb_exists() -> Tuple[bool, Optional[Path]]:
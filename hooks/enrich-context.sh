@@ -11,13 +11,14 @@
 
 set -e
 
+# Wall-clock start of the hook, for the interpreter startup timing
+# (EPOCHREALTIME needs bash 5; without it the stage is not measured)
+export FELLOW_HOOK_STARTED="${EPOCHREALTIME:-}"
+
 # Get the directory where this script is located
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PLUGIN_DIR="$(dirname "$SCRIPT_DIR")"
 
-# User's prompt is passed as argument or via stdin
-USER_PROMPT="${1:-$(cat)}"
-
 # Check if Python enrichment script exists
 ENRICH_SCRIPT="$SCRIPT_DIR/enrich-context.py"
 if [ ! -f "$ENRICH_SCRIPT" ]; then
@@ -32,5 +33,12 @@ fi
 # 3. Load relevant knowledge
 # 4. Generate enriched context
 # 5. Output enriched prompt or original if no KB
-
-python3 "$ENRICH_SCRIPT" "$USER_PROMPT"
+#
+# The interpreter runs isolated and without site (-I -S) for a fast start,
+# and reads the prompt from stdin: an argument is passed as a here-string,
+# otherwise the hook's stdin is handed over untouched.
+# exec keeps the hook's parent process (used to identify the session) intact
+if [ $# -gt 0 ]; then
+    exec python3 -I -S "$ENRICH_SCRIPT" <<<"$1"
+fi
+exec python3 -I -S "$ENRICH_SCRIPT"
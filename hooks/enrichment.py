@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Fellow Context Enrichment Hook Runner
+
+Loaded by the enrichment hook (enrich-context.py) once a prompt has been
+detected as a coding request. Runs the Enricher (fellow.enrich) for the
+prompt with the hook's per-process helpers: the prompt result cache,
+session deduplication state and event logging.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Hook helpers live next to this module; the fellow package lives in the
+# plugin root
+HOOKS_DIR = Path(__file__).resolve().parent
+PLUGIN_DIR = HOOKS_DIR.parent
+for import_dir in (HOOKS_DIR, PLUGIN_DIR):
+    if str(import_dir) not in sys.path:
+        sys.path.insert(0, str(import_dir))
+
+from fellow.config import Settings, is_logging_enabled, load_settings
+from fellow.enrich import Enricher
+from fellow.metrics import record_hook_run
+from project_paths import find_knowledge_base
+from session_dedup import SessionContextState
+from prompt_cache import PromptResultCache
+
+
+class DummyLogger:
+    """Stand-in logger when logging is off or the logger is unavailable."""
+    def log_enrichment_event(self, *args, **kwargs):
+        pass
+    def log_error(self, *args, **kwargs):
+        pass
+
+
+def get_logger(settings: Settings):
+    """Get the event logger, without loading it when logging is off."""
+    if not is_logging_enabled(settings):
+        return DummyLogger()
+    try:
+        from logger import get_logger as get_event_logger
+    except ImportError:
+        return DummyLogger()
+    return get_event_logger(settings)
+
+
+def finish_hook(settings: Settings, logger: Any, timings: Dict[str, float], **event):
+    """
+    Log the enrichment event, then record the hook's stage timings.
+
+    Args:
+        settings: Hook settings
+        logger: Event logger (see get_logger)
+        timings: Stage durations in milliseconds; logging time is added
+        **event: Passed to log_enrichment_event()
+    """
+    if not isinstance(logger, DummyLogger):
+        stage_start = time.perf_counter_ns()
+        logger.log_enrichment_event(timings=timings, **event)
+        timings['logging'] = (time.perf_counter_ns() - stage_start) / 1e6
+    record_hook_run(timings, settings)
+
+
+def enrich_prompt(
+    user_prompt: str,
+    intent: str,
+    confidence: float,
+    started: Optional[float] = None,
+    scoring_prompt: Optional[str] = None,
+    timings: Optional[Dict[str, float]] = None,
+    deadline_started: Optional[float] = None
+):
+    """
+    Enrich a detected coding request, print the result and log the event.
+
+    Args:
+        user_prompt: User prompt
+        intent: Detected intent category
+        confidence: Detection confidence
+        started: time.perf_counter() value at hook start
+        scoring_prompt: Text to match knowledge against, if not the prompt
+            itself (the condensed form of a large prompt)
+        timings: Durations of the stages already run, in milliseconds
+            (interpreter startup, detection)
+        deadline_started: time.perf_counter() value the deadline counts
+            from (defaults to started)
+    """
+    started = time.perf_counter() if started is None else started
+    deadline_started = started if deadline_started is None else deadline_started
+    timings = {} if timings is None else timings
+    settings = load_settings()
+    logger = get_logger(settings)
+
+    # Step 2: Find knowledge base
+    stage_start = time.perf_counter_ns()
+    kb_dir = find_knowledge_base()
+    timings['find_kb'] = (time.perf_counter_ns() - stage_start) / 1e6
+    if not kb_dir:
+        # No KB found - prepend warning message to prompt so it appears in chat
+        warning_message = """⚠️  **Fellow Knowledge Base Not Found**
+
+Fellow detected a coding request but couldn't find a knowledge base for this project.
+
+**To enable context enrichment:**
+1. Build the knowledge base: `/build-kb`
+   (Takes 2-5 minutes for first extraction)
+
+**Or continue without enrichment:**
+Your request will proceed without Fellow's architectural context.
+
+---
+
+**Original Request:**
+"""
+
+        # Output warning + original prompt to stdout (appears in chat)
+        print(warning_message + user_prompt)
+        sys.stdout.flush()
+        timings['total'] = (time.perf_counter() - started) * 1000
+
+        # Log the event
+        finish_hook(
+            settings,
+            logger,
+            timings,
+            original_prompt=user_prompt,
+            is_coding_request=True,
+            intent=intent,
+            confidence=confidence,
+            kb_found=False,
+            kb_path=None,
+            entities_found=0,
+            workflows_found=0,
+            constraints_found=0,
+            enriched_prompt=user_prompt,
+            source="hook"
+        )
+        return
+
+    # Step 3: Select knowledge (reusing the selection for an earlier identical
+    # prompt while the KB is unchanged) and generate enriched context,
+    # skipping static blocks already sent earlier in this session
+    prompt_cache = None
+    if settings.prompt_cache:
+        prompt_cache = PromptResultCache(
+            kb_dir.parent / 'cache' / 'prompts',
+            max_entries=settings.prompt_cache_entries
+        )
+
+    session_state = None
+    if settings.session_dedup:
+        session_state = SessionContextState(
+            kb_dir.parent / 'sessions',
+            window=settings.dedup_window,
+            refresh_seconds=settings.dedup_refresh_seconds
+        )
+
+    enricher = Enricher(kb_dir, config=settings, prompt_cache=prompt_cache)
+    result = enricher.enrich(
+        user_prompt,
+        intent=intent,
+        confidence=confidence,
+        scoring_prompt=scoring_prompt,
+        session_state=session_state,
+        started=deadline_started
+    )
+
+    # Output enriched prompt (or the original) before the bookkeeping
+    print(result.text)
+    sys.stdout.flush()
+    timings.update(result.timings)
+    timings['total'] = (time.perf_counter() - started) * 1000
+
+    if session_state is not None and result.enriched:
+        session_state.save()
+
+    # Log enrichment event
+    finish_hook(
+        settings,
+        logger,
+        timings,
+        original_prompt=user_prompt,
+        is_coding_request=True,
+        intent=intent,
+        confidence=confidence,
+        kb_found=True,
+        kb_path=str(kb_dir),
+        entities_found=len(result.entities),
+        workflows_found=len(result.workflows),
+        constraints_found=len(result.constraints),
+        enriched_prompt=result.text,
+        source="hook",
+        context_stats=result.context_stats or None,
+        context_blocks=result.blocks
+    )
@@ -3,45 +3,214 @@
 Fellow Logging Utility
 
 Logs enrichment events for debugging and analysis.
+
+Each event is appended to a daily JSONL file as one pre-serialized record.
+Enriched prompts are recorded as references to context blocks stored once
+in a content-addressed block store next to the logs.
+Rotation, compression and retention are handled by tools/manage_logs.py,
+which also renders the human-readable view on demand:
+
+    python3 tools/manage_logs.py render YYYY-MM-DD
 """
 
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# Shared path resolution lives in the plugin's tools/ directory, settings in
+# the fellow package in the plugin root
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+TOOLS_DIR = PLUGIN_DIR / 'tools'
+for import_dir in (TOOLS_DIR, PLUGIN_DIR):
+    if str(import_dir) not in sys.path:
+        sys.path.insert(0, str(import_dir))
+
+from fellow.config import Settings, is_logging_enabled, load_settings
+from pass_through_log import MAX_LOGGED_PROMPT_CHARS, append_line
+from project_paths import find_fellow_data
+
+# Enriched prompts are logged as block references; each distinct block body
+# is stored once under <log_dir>/blocks/<hash>.txt
+BLOCK_STORE_DIR = 'blocks'
+
+def truncate_for_log(text: str) -> str:
+    """Truncate long text for logging, noting the original length."""
+    if len(text) <= MAX_LOGGED_PROMPT_CHARS:
+        return text
+    return f"{text[:MAX_LOGGED_PROMPT_CHARS]}\n... [truncated, {len(text)} chars total]"
+
+
+def append_record(log_file: Path, record: Dict[str, Any]) -> Tuple[int, bool]:
+    """
+    Append one record to a JSONL log file.
+
+    The record is serialized up front and written with a single write() on
+    a descriptor opened with O_APPEND, so records from concurrent sessions
+    never interleave and the hook pays for one system call.
+
+    Args:
+        log_file: JSONL log file (created if missing)
+        record: JSON-serializable record
+
+    Returns:
+        Tuple of (file size after the write, whether this call created the file)
+    """
+    data = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+    return append_line(str(log_file), data)
+
+
+def store_blocks(blocks_dir: Path, blocks: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Store context block bodies in the content-addressed block store.
+
+    A block body already in the store is not written again, so the
+    architecture, pattern and guardrail text repeated across events is kept
+    once.
+
+    Args:
+        blocks_dir: Block store directory (<log_dir>/blocks/)
+        blocks: Context blocks sent with the prompt, in render order
+
+    Returns:
+        [section, hash] pairs referencing the stored bodies, in render order
+    """
+    from kb_render import block_hash
+
+    refs = []
+    for block in blocks:
+        text = '\n'.join(block['lines'])
+        digest = block.get('hash') or block_hash(text)
+        block_path = blocks_dir / f"{digest}.txt"
+        if not block_path.exists():
+            blocks_dir.mkdir(exist_ok=True)
+            tmp_path = blocks_dir / f"{digest}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, block_path)
+        refs.append([block['section'], digest])
+    return refs
+
+
+def start_log_maintenance(log_dir: Path):
+    """
+    Rotate, compress and prune logs in a detached background process.
+
+    Runs tools/manage_logs.py so that no prompt waits for compression.
+    """
+    import subprocess
+    try:
+        subprocess.Popen(
+            [sys.executable, str(TOOLS_DIR / 'manage_logs.py'), 'rotate', '--quiet',
+             '--log-dir', str(log_dir)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    except OSError:
+        pass
+
+
+def render_event(entry: Dict[str, Any]) -> str:
+    """
+    Render a logged enrichment event in human-readable form.
+
+    Args:
+        entry: Record from an enrichment_YYYY-MM-DD.jsonl file
+
+    Returns:
+        Multi-line summary of the event
+    """
+    detection = entry.get('detection', {})
+    knowledge_base = entry.get('knowledge_base', {})
+    enrichment = entry.get('enrichment', {})
+    prompt_length = entry.get('prompt_length', {})
+    context_stats = entry.get('context') or {}
+    timestamp = entry.get('timestamp', '')[:19].replace('T', ' ')
+
+    lines = [
+        '',
+        '=' * 80,
+        f"[{timestamp}] {entry.get('source', 'hook').upper()}",
+        '=' * 80,
+        f"Original Prompt ({prompt_length.get('original', 0)} chars):",
+        entry.get('original_prompt', ''),
+        '',
+        'Detection:',
+        f"  - Coding Request: {detection.get('is_coding_request')}",
+        f"  - Intent: {detection.get('intent')}",
+        f"  - Confidence: {detection.get('confidence', 0.0):.2f}",
+        '',
+        'Knowledge Base:',
+        f"  - Found: {knowledge_base.get('found')}",
+    ]
+    if knowledge_base.get('path'):
+        lines.append(f"  - Path: {knowledge_base['path']}")
+    lines.append('')
+
+    timings = entry.get('timings')
+    if timings:
+        stages = ', '.join(f"{stage} {ms:.2f}" for stage, ms in timings.items() if stage != 'total')
+        lines.append(f"Latency: {timings.get('total', 0.0):.2f} ms ({stages})")
+        lines.append('')
+
+    if context_stats.get('deadline_hit'):
+        lines.append(f"Deadline: hit after {context_stats.get('deadline_stage')}"
+                     f" ({context_stats.get('deadline_ms')} ms)")
+        lines.append('')
+
+    if enrichment.get('was_enriched'):
+        lines.extend([
+            'Enrichment:',
+            f"  - Entities: {enrichment.get('entities_count', 0)}",
+            f"  - Workflows: {enrichment.get('workflows_count', 0)}",
+            f"  - Constraints: {enrichment.get('constraints_count', 0)}",
+            f"  - Enriched Length: {prompt_length.get('enriched', 0)} chars",
+        ])
+        if 'context_tokens' in context_stats:
+            lines.append(f"  - Context Tokens: ~{context_stats.get('context_tokens', 0)}"
+                         f" (budget: {context_stats.get('token_budget') or 'none'})")
+            if context_stats.get('cache_hit'):
+                lines.append('  - Prompt Cache: hit')
+        lines.extend(['', 'Enriched Prompt:', entry.get('enriched_prompt') or ''])
+    else:
+        lines.append('Result: Pass-through (no enrichment)')
+    lines.append('')
+    return '\n'.join(lines) + '\n'
 
 
 class FellowLogger:
     """Logger for Fellow enrichment events."""
 
-    def __init__(self, log_dir: Optional[Path] = None):
+    def __init__(self, log_dir: Optional[Path] = None, settings: Optional[Settings] = None):
         """
         Initialize logger.
 
         Args:
             log_dir: Directory to store logs. If None, searches for .fellow-data/logs/
+            settings: Hook settings (defaults to the settings from hooks.json)
         """
-        if log_dir is None:
-            log_dir = self._find_log_dir()
+        self.settings = load_settings() if settings is None else settings
+        self.enabled = is_logging_enabled(self.settings)
+        self.max_file_bytes = int(self.settings.log_max_file_mb * 1024 * 1024)
 
-        self.log_dir = log_dir
-        self.enabled = self._check_if_enabled()
-
-        if self.enabled and self.log_dir:
+        # The log directory is only looked up when logging is on
+        self.log_dir = None
+        if not self.enabled:
+            return
+        self.log_dir = self._find_log_dir() if log_dir is None else log_dir
+        if self.log_dir:
             self.log_dir.mkdir(parents=True, exist_ok=True)
 
     def _find_log_dir(self) -> Optional[Path]:
         """Find or create log directory."""
-        # Search upward for .fellow-data/
-        current = Path.cwd()
-        for _ in range(10):
-            fellow_data = current / '.fellow-data'
-            if fellow_data.exists() and fellow_data.is_dir():
-                return fellow_data / 'logs'
-            if current.parent == current:  # Reached root
-                break
-            current = current.parent
+        # Nearest .fellow-data/ above the working directory
+        fellow_data = find_fellow_data()
+        if fellow_data is not None:
+            return fellow_data / 'logs'
 
         # Fallback: Use Fellow plugin directory
         try:
@@ -50,25 +219,11 @@ class FellowLogger:
         except:
             return None
 
-    def _check_if_enabled(self) -> bool:
-        """Check if logging is enabled via environment variable or config."""
-        # Check environment variable
-        if os.environ.get('FELLOW_LOGGING', '').lower() in ('1', 'true', 'yes'):
-            return True
-
-        # Check hooks.json config
-        try:
-            hooks_config = Path(__file__).parent.parent / '.claude-plugin' / 'hooks.json'
-            if hooks_config.exists():
-                with open(hooks_config, 'r') as f:
-                    config = json.load(f)
-                    for hook in config.get('hooks', []):
-                        if hook.get('name') == 'fellow-context-enrichment':
-                            return hook.get('config', {}).get('logging_enabled', False)
-        except:
-            pass
-
-        return False
+    def _write(self, log_file: Path, record: Dict[str, Any]):
+        """Append a record, starting log maintenance on a new or oversized file."""
+        size, created = append_record(log_file, record)
+        if created or size > self.max_file_bytes:
+            start_log_maintenance(self.log_dir)
 
     def log_enrichment_event(
         self,
@@ -82,7 +237,10 @@ class FellowLogger:
         workflows_found: int,
         constraints_found: int,
         enriched_prompt: str,
-        source: str = "hook"
+        source: str = "hook",
+        context_stats: Optional[Dict[str, Any]] = None,
+        context_blocks: Optional[List[Dict[str, Any]]] = None,
+        timings: Optional[Dict[str, float]] = None
     ):
         """
         Log an enrichment event.
@@ -99,16 +257,24 @@ class FellowLogger:
             constraints_found: Number of applicable constraints
             enriched_prompt: Final enriched prompt (or original if pass-through)
             source: Source of enrichment ("hook" or "command")
+            context_stats: Context packing statistics (token budget, estimated
+                context tokens, blocks selected) and deadline outcome
+            context_blocks: Context blocks the enriched prompt was rendered
+                from. When given, the record references them in the block
+                store instead of holding the enriched prompt.
+            timings: Hook stage durations in milliseconds (see fellow.metrics)
         """
         if not self.enabled or not self.log_dir:
             return
 
         try:
             timestamp = datetime.now()
+            logged_prompt = truncate_for_log(original_prompt)
+            logged_enriched = truncate_for_log(enriched_prompt)
             log_entry = {
                 "timestamp": timestamp.isoformat(),
                 "source": source,
-                "original_prompt": original_prompt,
+                "original_prompt": logged_prompt,
                 "detection": {
                     "is_coding_request": is_coding_request,
                     "intent": intent,
@@ -124,49 +290,27 @@ class FellowLogger:
                     "constraints_count": constraints_found,
                     "was_enriched": kb_found and is_coding_request
                 },
-                "enriched_prompt": enriched_prompt if kb_found and is_coding_request else None,
+                "enriched_prompt": logged_enriched if kb_found and is_coding_request else None,
                 "prompt_length": {
                     "original": len(original_prompt),
                     "enriched": len(enriched_prompt)
                 }
             }
+            if logged_prompt is not original_prompt:
+                import hashlib
+                log_entry["original_prompt_sha1"] = hashlib.sha1(original_prompt.encode('utf-8')).hexdigest()
+            if context_stats:
+                log_entry["context"] = context_stats
+            if timings:
+                log_entry["timings"] = {stage: round(ms, 3) for stage, ms in timings.items()}
+            if context_blocks and log_entry["enriched_prompt"] is not None:
+                log_entry["enriched_prompt"] = None
+                log_entry["enriched_blocks"] = store_blocks(self.log_dir / BLOCK_STORE_DIR, context_blocks)
 
-            # Write to daily log file
+            # Write to daily log file; the human-readable form is rendered
+            # on demand from these records (see render_event)
             log_file = self.log_dir / f"enrichment_{timestamp.strftime('%Y-%m-%d')}.jsonl"
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
-
-            # Also write human-readable summary
-            summary_file = self.log_dir / f"enrichment_{timestamp.strftime('%Y-%m-%d')}.log"
-            with open(summary_file, 'a') as f:
-                f.write(f"\n{'='*80}\n")
-                f.write(f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {source.upper()}\n")
-                f.write(f"{'='*80}\n")
-                f.write(f"Original Prompt ({len(original_prompt)} chars):\n")
-                f.write(f"{original_prompt}\n")
-                f.write(f"\n")
-                f.write(f"Detection:\n")
-                f.write(f"  - Coding Request: {is_coding_request}\n")
-                f.write(f"  - Intent: {intent}\n")
-                f.write(f"  - Confidence: {confidence:.2f}\n")
-                f.write(f"\n")
-                f.write(f"Knowledge Base:\n")
-                f.write(f"  - Found: {kb_found}\n")
-                if kb_path:
-                    f.write(f"  - Path: {kb_path}\n")
-                f.write(f"\n")
-                if kb_found and is_coding_request:
-                    f.write(f"Enrichment:\n")
-                    f.write(f"  - Entities: {entities_found}\n")
-                    f.write(f"  - Workflows: {workflows_found}\n")
-                    f.write(f"  - Constraints: {constraints_found}\n")
-                    f.write(f"  - Enriched Length: {len(enriched_prompt)} chars\n")
-                    f.write(f"\n")
-                    f.write(f"Enriched Prompt:\n")
-                    f.write(f"{enriched_prompt}\n")
-                else:
-                    f.write(f"Result: Pass-through (no enrichment)\n")
-                f.write(f"\n")
+            self._write(log_file, log_entry)
 
         except Exception as e:
             # Silently fail - don't break the enrichment process
@@ -187,13 +331,19 @@ class FellowLogger:
             }
 
             error_file = self.log_dir / f"errors_{timestamp.strftime('%Y-%m-%d')}.jsonl"
-            with open(error_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            self._write(error_file, log_entry)
 
         except Exception as e:
             print(f"Warning: Failed to write error log: {e}", file=sys.stderr)
 
 
-def get_logger() -> FellowLogger:
-    """Get a logger instance."""
-    return FellowLogger()
+_logger = None
+
+
+def get_logger(settings: Optional[Settings] = None) -> FellowLogger:
+    """Get the logger of this process."""
+    global _logger
+    if _logger is None:
+        _logger = FellowLogger(settings=settings)
+    return _logger
+
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fellow Pass-Through Logging
+
+Logs prompts the hook passed through unchanged (non-coding requests), the
+bulk of all events. Claude Code waits for the hook process to exit, so
+logging them must cost close to nothing: like fellow.config and detection,
+this module only uses modules the interpreter has already loaded under
+`python3 -I -S` (os, time), builds the JSONL record by hand in the format
+of logger.FellowLogger.log_enrichment_event, and resolves the log
+directory through the cached project_paths.resolve_dirs(). hashlib is only
+imported for prompts long enough to be logged truncated, and the full
+logger only to start log maintenance on a new or oversized log file.
+"""
+
+import os
+import sys
+import time
+
+# Longer prompts are logged truncated, with a hash of the full text
+MAX_LOGGED_PROMPT_CHARS = 4096
+
+# Characters escaped in JSON strings: quote, backslash and control characters
+_JSON_ESCAPES = {i: f'\\u{i:04x}' for i in range(0x20)}
+_JSON_ESCAPES.update({
+    ord('"'): '\\"', ord('\\'): '\\\\', ord('\n'): '\\n', ord('\r'): '\\r', ord('\t'): '\\t',
+})
+
+
+def json_string(text: str) -> str:
+    """Encode a string as a JSON string literal."""
+    return '"' + text.translate(_JSON_ESCAPES) + '"'
+
+
+def json_number(value: float) -> str:
+    """Encode a finite number as JSON (non-finite numbers become null)."""
+    if value != value or value in (float('inf'), float('-inf')):
+        return 'null'
+    return repr(value)
+
+
+def append_line(log_file: str, data: bytes) -> tuple:
+    """
+    Append one serialized record to a JSONL log file.
+
+    Written with a single write() on a descriptor opened with O_APPEND, so
+    records from concurrent sessions never interleave.
+
+    Args:
+        log_file: JSONL log file (created if missing)
+        data: Serialized record, ending with a newline
+
+    Returns:
+        Tuple of (file size after the write, whether this call created the file)
+    """
+    created = False
+    try:
+        fd = os.open(log_file, os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        try:
+            fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+            created = True
+        except FileExistsError:
+            fd = os.open(log_file, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, data)
+        return os.fstat(fd).st_size, created
+    finally:
+        os.close(fd)
+
+
+def find_log_dir(plugin_dir: str) -> str:
+    """Get the log directory: the nearest .fellow-data/logs/, else the plugin's own."""
+    from project_paths import resolve_dirs
+
+    fellow_data = resolve_dirs()[1]
+    if fellow_data is None:
+        fellow_data = os.path.join(plugin_dir, '.fellow-data')
+    return os.path.join(fellow_data, 'logs')
+
+
+def log_pass_through(
+    plugin_dir: str,
+    user_prompt: str,
+    intent: str,
+    confidence: float,
+    timings: dict,
+    settings
+):
+    """
+    Log a prompt passed through unchanged.
+
+    Args:
+        plugin_dir: Plugin root (the log directory outside a Fellow project)
+        user_prompt: User prompt
+        intent: Detected intent category
+        confidence: Detection confidence
+        timings: Hook stage durations in milliseconds
+        settings: Hook settings (see fellow.config)
+    """
+    try:
+        now = time.time()
+        local = time.localtime(now)
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S', local) + f'.{int(now % 1 * 1e6):06d}'
+
+        logged_prompt = user_prompt
+        extra = ''
+        if len(user_prompt) > MAX_LOGGED_PROMPT_CHARS:
+            import hashlib
+            logged_prompt = (f"{user_prompt[:MAX_LOGGED_PROMPT_CHARS]}\n"
+                             f"... [truncated, {len(user_prompt)} chars total]")
+            digest = hashlib.sha1(user_prompt.encode('utf-8')).hexdigest()
+            extra += f',"original_prompt_sha1":"{digest}"'
+        if timings:
+            extra += ',"timings":{' + ','.join(
+                f'{json_string(stage)}:{json_number(round(ms, 3))}' for stage, ms in timings.items()
+            ) + '}'
+
+        line = (
+            f'{{"timestamp":"{timestamp}","source":"hook",'
+            f'"original_prompt":{json_string(logged_prompt)},'
+            f'"detection":{{"is_coding_request":false,'
+            f'"intent":{json_string(intent) if intent is not None else "null"},'
+            f'"confidence":{json_number(confidence)}}},'
+            f'"knowledge_base":{{"found":false,"path":null}},'
+            f'"enrichment":{{"entities_count":0,"workflows_count":0,"constraints_count":0,'
+            f'"was_enriched":false}},'
+            f'"enriched_prompt":null,'
+            f'"prompt_length":{{"original":{len(user_prompt)},"enriched":{len(user_prompt)}}}'
+            f'{extra}}}\n'
+        )
+
+        log_dir = find_log_dir(plugin_dir)
+        os.makedirs(log_dir, exist_ok=True)
+        log_file = os.path.join(log_dir, f"enrichment_{time.strftime('%Y-%m-%d', local)}.jsonl")
+        # Lone surrogates (undecodable input) become \udcXX escapes, still valid JSON
+        size, created = append_line(log_file, line.encode('utf-8', 'backslashreplace'))
+        if created or size > settings.log_max_file_mb * 1024 * 1024:
+            from logger import start_log_maintenance
+            from pathlib import Path
+            start_log_maintenance(Path(log_dir))
+
+    except Exception as e:
+        # Silently fail - don't break the hook
+        print(f"Warning: Failed to write log: {e}", file=sys.stderr)
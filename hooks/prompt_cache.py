@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Fellow Prompt Result Cache
+
+Caches the knowledge the enrichment hook selected for a prompt, so that a
+resubmitted prompt (for example after an interrupted turn) skips knowledge
+base loading and scoring.
+
+Entries are keyed by a hash of the normalized prompt (case, whitespace and
+punctuation folded), the detected intent and the knowledge base version
+stamp (see kb_render.kb_version_stamp). The stamp changes whenever a full
+build or merge_knowledge.py rewrites a knowledge base file, so stale results
+are never served; they simply age out. Entries live as small files under
+.fellow-data/cache/prompts/ and are evicted least recently used first once
+the cache holds `max_entries`.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_ENTRIES = 256
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, whitespace and punctuation so trivially different prompts match."""
+    return ' '.join(_PUNCTUATION_RE.sub(' ', prompt.lower()).split())
+
+
+class PromptResultCache:
+    """On-disk LRU cache of enrichment results."""
+
+    def __init__(self, cache_dir: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            cache_dir: Directory holding cache entries (.fellow-data/cache/prompts/)
+            max_entries: Maximum number of cached results
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, max_entries)
+
+    def key(self, prompt: str, intent: str, kb_stamp: str) -> str:
+        """Build the cache key of a prompt against a knowledge base version."""
+        text = f"{kb_stamp}\0{intent}\0{normalize_prompt(prompt)}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result, marking it as recently used.
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        entry_path = self.cache_dir / f"{key}.json"
+        try:
+            with open(entry_path, 'r') as f:
+                result = json.load(f)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result, evicting the least recently used entries if full."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry_path = self.cache_dir / f"{key}.json"
+            tmp_path = entry_path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f, separators=(',', ':'))
+            os.replace(tmp_path, entry_path)
+            self._evict()
+        except OSError:
+            pass  # Caching is best-effort
+
+    def clear(self):
+        """Remove every cached result."""
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    os.unlink(entry.path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove the least recently used entries beyond max_entries."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    pass
+
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                pass
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Fellow Session Context Deduplication
+
+Tracks which context blocks (by content hash) the enrichment hook has already
+sent in the current session, so that static context such as the architecture
+style, design patterns and guardrails isn't re-injected on every prompt.
+
+State is kept in a small per-session file under .fellow-data/sessions/. A
+block counts as already sent while it was last sent in full fewer than
+`window` prompts ago and less than `refresh_seconds` ago; after that it is
+sent in full again.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sections whose blocks are deduplicated by default
+DEFAULT_DEDUP_SECTIONS = ('constraints', 'architecture', 'patterns')
+
+DEFAULT_WINDOW = 10
+DEFAULT_REFRESH_SECONDS = 1800
+
+# Session state files untouched for this long are removed
+STALE_SESSION_SECONDS = 7 * 24 * 3600
+
+
+def get_session_id() -> str:
+    """
+    Identify the current session.
+
+    Uses CLAUDE_SESSION_ID or FELLOW_SESSION_ID when set, otherwise the parent
+    process (the Claude Code process that runs the hook for every prompt).
+    """
+    for var in ('CLAUDE_SESSION_ID', 'FELLOW_SESSION_ID'):
+        value = os.environ.get(var, '').strip()
+        if value:
+            return value
+    return f"ppid-{os.getppid()}"
+
+
+class SessionContextState:
+    """Per-session record of the context blocks already sent."""
+
+    def __init__(
+        self,
+        state_dir: Path,
+        session_id: Optional[str] = None,
+        window: int = DEFAULT_WINDOW,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS
+    ):
+        """
+        Load session state.
+
+        Args:
+            state_dir: Directory holding session state files (.fellow-data/sessions/)
+            session_id: Session identifier (defaults to get_session_id())
+            window: Number of prompts a sent block stays deduplicated
+            refresh_seconds: Seconds after which a block is sent in full again
+        """
+        session_id = session_id or get_session_id()
+        self.state_dir = state_dir
+        self.path = state_dir / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)}.json"
+        self.window = window
+        self.refresh_seconds = refresh_seconds
+        self.is_new = not self.path.exists()
+
+        self.prompt_index = 0
+        self.sent: Dict[str, List[float]] = {}
+        if not self.is_new:
+            try:
+                with open(self.path, 'r') as f:
+                    state = json.load(f)
+                self.prompt_index = int(state.get('prompt_index', 0))
+                self.sent = state.get('sent', {})
+            except (OSError, ValueError):
+                pass
+
+    def _recently_sent(self, digest: str, prompt_index: int, now: float) -> bool:
+        """Check whether a block was sent in full within the window of a prompt."""
+        record = self.sent.get(digest)
+        if not record:
+            return False
+        sent_index, sent_at = record
+        return (prompt_index - sent_index < self.window
+                and now - sent_at < self.refresh_seconds)
+
+    def split_blocks(
+        self,
+        blocks: List[Dict[str, Any]],
+        sections: Tuple[str, ...] = DEFAULT_DEDUP_SECTIONS
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split blocks into those to send with the next prompt and those already sent.
+
+        Blocks in sections that aren't deduplicated are always sent. Nothing
+        is recorded: call record_blocks() with the blocks actually sent.
+
+        Args:
+            blocks: Context blocks with 'section' and 'hash' keys
+            sections: Sections whose blocks may be deduplicated
+
+        Returns:
+            (blocks to send, blocks already sent)
+        """
+        now = time.time()
+        kept, repeated = [], []
+        for block in blocks:
+            if block['section'] in sections and self._recently_sent(block['hash'], self.prompt_index + 1, now):
+                repeated.append(block)
+            else:
+                kept.append(block)
+        return kept, repeated
+
+    def record_blocks(
+        self,
+        blocks: List[Dict[str, Any]],
+        sections: Tuple[str, ...] = DEFAULT_DEDUP_SECTIONS
+    ):
+        """
+        Record the blocks sent with a prompt (call save() afterwards).
+
+        Args:
+            blocks: Context blocks sent, with 'section' and 'hash' keys
+            sections: Sections whose blocks may be deduplicated
+        """
+        self.prompt_index += 1
+        now = time.time()
+        for block in blocks:
+            if block['section'] in sections and block['hash']:
+                self.sent[block['hash']] = [self.prompt_index, now]
+
+    def save(self):
+        """Write session state, dropping expired entries."""
+        now = time.time()
+        self.sent = {
+            digest: record for digest, record in self.sent.items()
+            if self.prompt_index - record[0] < self.window and now - record[1] < self.refresh_seconds
+        }
+
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            if self.is_new:
+                self._remove_stale_sessions(now)
+
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'prompt_index': self.prompt_index, 'sent': self.sent}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Deduplication is best-effort
+
+    def _remove_stale_sessions(self, now: float):
+        """Remove state files of sessions that ended long ago."""
+        for state_file in self.state_dir.glob('*.json'):
+            try:
+                if now - state_file.stat().st_mtime > STALE_SESSION_SECONDS:
+                    state_file.unlink()
+            except OSError:
+                pass
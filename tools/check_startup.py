@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Measure the enrichment hook's startup cost for non-coding prompts.
+
+Most prompts are not coding requests and should pass through the hook at
+close to the cost of starting a bare interpreter. This tool runs the hook the
+way enrich-context.sh does (`python3 -I -S`, prompt on stdin) for a set of
+non-coding prompts, compares the median wall time with a bare
+`python3 -I -S -c pass`, and fails when the overhead exceeds the budget.
+
+The hook runs with the settings of hooks.json as shipped (logging and
+metrics on), from a scratch project directory, so the test prompts' log
+records and metrics don't end up in a real project. FELLOW_LOGGING is
+removed from the environment for the same reason.
+
+`--save-baseline` records the measured overhead on this machine
+(.claude-plugin/startup_baseline.json); later checks also fail when the
+overhead grows past that baseline by more than the tolerance.
+
+Usage:
+    python3 check_startup.py [--budget-ms=15] [--runs=20] [--tolerance-ms=2]
+                             [--save-baseline] [--baseline=FILE]
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+HOOK_SCRIPT = PLUGIN_DIR / "hooks" / "enrich-context.py"
+BASELINE_FILE = PLUGIN_DIR / ".claude-plugin" / "startup_baseline.json"
+
+DEFAULT_BUDGET_MS = 15.0
+DEFAULT_RUNS = 20
+
+# Allowed growth over the saved baseline (run-to-run noise)
+DEFAULT_TOLERANCE_MS = 2.0
+
+NON_CODING_PROMPTS = [
+    "What does this project do?",
+    "Thanks, that looks good",
+    "Explain the difference between a process and a thread",
+    "Summarize the conversation so far",
+]
+
+
+def time_runs(command: List[str], prompts: List[str], runs: int, env: dict, cwd: str) -> List[float]:
+    """Run a command once per prompt, `runs` times over, returning wall times in ms."""
+    timings = []
+    for i in range(runs):
+        prompt = prompts[i % len(prompts)]
+        start = time.perf_counter()
+        subprocess.run(command, input=prompt, capture_output=True, text=True, env=env, cwd=cwd)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def load_baseline(baseline_file: Path) -> Optional[float]:
+    """Load the saved hook overhead in ms (None if no baseline was saved)."""
+    try:
+        with open(baseline_file, 'r') as f:
+            return float(json.load(f)["overhead_ms"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_baseline(baseline_file: Path, overhead: float, hook: float, interpreter: float):
+    """Save the measured hook overhead as this machine's baseline."""
+    baseline_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(baseline_file, 'w') as f:
+        json.dump({
+            "overhead_ms": round(overhead, 2),
+            "hook_ms": round(hook, 2),
+            "interpreter_ms": round(interpreter, 2),
+            "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, f, indent=2)
+
+
+def main():
+    """Main entry point for the startup check."""
+    budget_ms = DEFAULT_BUDGET_MS
+    runs = DEFAULT_RUNS
+    tolerance_ms = DEFAULT_TOLERANCE_MS
+    baseline_file = BASELINE_FILE
+    save = False
+    for arg in sys.argv[1:]:
+        if arg.startswith("--budget-ms="):
+            budget_ms = float(arg.split("=", 1)[1])
+        elif arg.startswith("--runs="):
+            runs = max(1, int(arg.split("=", 1)[1]))
+        elif arg.startswith("--tolerance-ms="):
+            tolerance_ms = float(arg.split("=", 1)[1])
+        elif arg.startswith("--baseline="):
+            baseline_file = Path(arg.split("=", 1)[1])
+        elif arg == "--save-baseline":
+            save = True
+        else:
+            print("Usage: check_startup.py [--budget-ms=MS] [--runs=N] [--tolerance-ms=MS]"
+                  " [--save-baseline] [--baseline=FILE]", file=sys.stderr)
+            sys.exit(1)
+
+    python = sys.executable or "python3"
+    project_dir = tempfile.mkdtemp(prefix="fellow-check-startup-")
+    try:
+        # A scratch project: logs and metrics go to its .fellow-data/
+        os.mkdir(os.path.join(project_dir, ".fellow-data"))
+        env = {key: value for key, value in os.environ.items() if key != "FELLOW_LOGGING"}
+        env["FELLOW_PATHS_CACHE"] = os.path.join(project_dir, "project_paths.cache")
+
+        # Warm the bytecode cache, the path cache and the file system cache first
+        time_runs([python, "-I", "-S", str(HOOK_SCRIPT)], NON_CODING_PROMPTS, 2, env, project_dir)
+
+        interpreter = statistics.median(
+            time_runs([python, "-I", "-S", "-c", "pass"], [""], runs, env, project_dir))
+        hook = statistics.median(
+            time_runs([python, "-I", "-S", str(HOOK_SCRIPT)], NON_CODING_PROMPTS, runs, env, project_dir))
+    finally:
+        shutil.rmtree(project_dir, ignore_errors=True)
+    overhead = hook - interpreter
+    baseline = load_baseline(baseline_file)
+
+    print(f"⏱️  Hook startup (non-coding prompts, shipped settings, median of {runs} runs)")
+    print(f"   • Bare interpreter: {interpreter:.1f} ms")
+    print(f"   • Hook: {hook:.1f} ms")
+    print(f"   • Overhead: {overhead:.1f} ms (budget: {budget_ms:.1f} ms)")
+    if baseline is not None:
+        print(f"   • Baseline overhead: {baseline:.1f} ms (tolerance: {tolerance_ms:.1f} ms)")
+
+    failed = False
+    if overhead > budget_ms:
+        print(f"❌ Startup overhead exceeds the budget by {overhead - budget_ms:.1f} ms", file=sys.stderr)
+        failed = True
+    if baseline is not None and not save and overhead > baseline + tolerance_ms:
+        print(f"❌ Startup overhead exceeds the baseline by {overhead - baseline:.1f} ms", file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+    if save:
+        save_baseline(baseline_file, overhead, hook, interpreter)
+        print(f"✓ Baseline saved to {baseline_file}")
+    print("✅ Within budget" if baseline is None or save else "✅ Within budget and baseline")
+
+
+if __name__ == "__main__":
+    main()
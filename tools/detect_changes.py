@@ -27,6 +27,7 @@ from file_filters import (
     is_source_file,
     SOURCE_EXTENSIONS
 )
+from kb_format import load_kb_file
 
 
 def load_metadata(kb_dir: Path) -> Optional[Dict]:
@@ -37,9 +38,8 @@ def load_metadata(kb_dir: Path) -> Optional[Dict]:
         return None
 
     try:
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError) as e:
+        return load_kb_file(metadata_path)
+    except (ValueError, OSError) as e:
         print(f"⚠️  Warning: Could not load metadata: {e}", file=sys.stderr)
         return None
 
@@ -399,4 +399,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if os.environ.get('FELLOW_PROFILE'):
+        sys.path.insert(0, str(SCRIPT_DIR.parent))
+        from fellow.profiling import run_profiled
+        project_args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+        run_profiled('detect_changes', main, start_dir=project_args[0] if project_args else None)
+    else:
+        main()
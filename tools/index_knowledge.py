@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Build-time indexing of the knowledge base.
+
+Run after a full extraction to bring the knowledge base files written by the
+extraction agents into their indexed form:
+- Assigns stable IDs to entities
+- Stores relationships as compact [source_id, target_id, kind] tuples
+- Precomputes the CSR entity adjacency graph used for neighbor expansion
+- Precomputes a PageRank importance score per entity, used to break ranking ties
+- Indexes constraints by terms, scope and type with per-intent candidate lists
+- Pre-renders the static context blocks (guardrails, architecture style,
+  design patterns) per intent into rendered_context.json
+
+Incremental updates are indexed by merge_knowledge.py as part of the merge.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Add the tools directory to Python path to ensure imports work
+SCRIPT_DIR = Path(__file__).parent.resolve()
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from kb_constraints import attach_constraint_index
+from kb_format import STORAGE_MODES, load_kb_file, write_kb_file
+from kb_graph import attach_entity_graph, attach_entity_importance, normalize_factual_knowledge
+from kb_render import write_rendered_context
+
+
+def index_factual_knowledge(
+    factual: Dict[str, Any],
+    procedural: Optional[Dict[str, Any]] = None
+) -> Dict[str, int]:
+    """
+    Index factual knowledge in place.
+
+    Args:
+        factual: Factual knowledge dictionary
+        procedural: Procedural knowledge dictionary, for workflow membership
+
+    Returns:
+        Statistics dictionary
+    """
+    before = len(factual.get("entity_relationships", []))
+    normalize_factual_knowledge(factual)
+    attach_entity_graph(factual)
+    attach_entity_importance(factual, procedural)
+    return {
+        "entities": len(factual["entities"]),
+        "relationships": len(factual["entity_relationships"]),
+        "relationships_dropped": before - len(factual["entity_relationships"]),
+    }
+
+
+def index_knowledge_base(kb_dir: Path, storage: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Index the knowledge base files in a directory.
+
+    Args:
+        kb_dir: Path to the knowledge base directory (.fellow-data/semantic/)
+        storage: Storage mode for rewritten files (None keeps the current mode)
+
+    Returns:
+        Dictionary with indexing statistics
+    """
+    stats = {}
+
+    procedural_path = kb_dir / "procedural_knowledge.json"
+    procedural = load_kb_file(procedural_path) if procedural_path.exists() else None
+
+    factual_path = kb_dir / "factual_knowledge.json"
+    if factual_path.exists():
+        factual = load_kb_file(factual_path)
+        stats["factual"] = index_factual_knowledge(factual, procedural)
+        write_kb_file(factual_path, factual, storage)
+
+    conceptual_path = kb_dir / "conceptual_knowledge.json"
+    if conceptual_path.exists():
+        conceptual = load_kb_file(conceptual_path)
+        attach_constraint_index(conceptual)
+        stats["conceptual"] = {"constraints": len(conceptual.get("constraints", []))}
+        write_kb_file(conceptual_path, conceptual, storage)
+        write_rendered_context(kb_dir, conceptual, storage)
+
+    return stats
+
+
+def main():
+    """Main entry point for the index-knowledge tool."""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--storage=")]
+    storage_args = [arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--storage=")]
+    storage = storage_args[-1] if storage_args else None
+
+    if len(args) < 1 or (storage and storage not in STORAGE_MODES):
+        print("Usage: index_knowledge.py <target-project-path> [--storage=MODE]", file=sys.stderr)
+        print("", file=sys.stderr)
+        print("Indexes a freshly extracted knowledge base (entity IDs, relationship tuples).", file=sys.stderr)
+        sys.exit(1)
+
+    target_path = Path(args[0]).resolve()
+    kb_dir = target_path / ".fellow-data" / "semantic"
+
+    if not kb_dir.is_dir():
+        print(f"❌ Error: Knowledge base directory does not exist: {kb_dir}", file=sys.stderr)
+        print("   Run /fellow:build-kb first to create the knowledge base.", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        stats = index_knowledge_base(kb_dir, storage)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error indexing knowledge base: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print("✅ Knowledge Base Indexed")
+    factual = stats.get("factual")
+    if factual:
+        print(f"   • Entities: {factual['entities']}")
+        print(f"   • Relationships: {factual['relationships']}"
+              + (f" ({factual['relationships_dropped']} unresolved or duplicate dropped)"
+                 if factual["relationships_dropped"] else ""))
+    conceptual = stats.get("conceptual")
+    if conceptual:
+        print(f"   • Constraints indexed: {conceptual['constraints']}")
+    print(f"📁 Knowledge base location: {kb_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Constraint indexing and prompt-aware ranking for conceptual knowledge.
+
+Constraints are indexed by their text terms, their scope (layer, module or
+file globs, where the extractor recorded one) and their type. The index also
+holds a precomputed candidate list per intent category, ordered by how
+strongly the constraint type applies to that intent:
+
+    "constraint_index": {
+      "constraints": 12,
+      "terms": [["api", "database", "layer"], ...],
+      "scopes": [["src/api/**"], ...],
+      "by_intent": {"create": [3, 0, 7, ...], ...}
+    }
+
+At prompt time the candidates for the detected intent are ranked against the
+prompt text and the files it mentions, so the limited guardrail slots go to
+the constraints that apply to the request.
+"""
+
+import re
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, List, Optional
+
+# Intent categories the enrichment hook detects (see CODING_KEYWORDS)
+INTENT_CATEGORIES = ("create", "modify", "fix", "delete", "test")
+
+# Constraint types that apply to every request, by priority
+ALWAYS_APPLICABLE = {"security": 3, "architectural": 2}
+
+# Constraint types that apply to specific intents
+INTENT_APPLICABLE = {
+    "performance": ("create", "modify"),
+    "data validation": ("create", "modify"),
+}
+
+# Fields that may hold a constraint's scope
+SCOPE_FIELDS = ("scope", "layer", "layers", "module", "modules", "files", "applies_to")
+
+# Scoring weights
+TERM_WEIGHT = 2
+SCOPE_MATCH_WEIGHT = 5
+SCOPE_MISS_PENALTY = 2
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+_STOPWORDS = frozenset((
+    "the", "and", "for", "with", "that", "this", "must", "should", "not", "are",
+    "all", "any", "from", "into", "only", "use", "using", "via", "its", "can",
+    "has", "have", "been", "will", "each", "when", "than", "then", "also",
+))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, dropping short words and stopwords."""
+    return [
+        word for word in _WORD_RE.findall(text.lower())
+        if len(word) > 2 and word not in _STOPWORDS
+    ]
+
+
+def constraint_scopes(constraint: Dict[str, Any]) -> List[str]:
+    """Collect the scope values (globs, layer or module names) of a constraint."""
+    scopes = []
+    for field in SCOPE_FIELDS:
+        value = constraint.get(field)
+        if isinstance(value, str) and value.strip():
+            scopes.append(value.strip())
+        elif isinstance(value, list):
+            scopes.extend(str(item).strip() for item in value if str(item).strip())
+    return scopes
+
+
+def type_priority(constraint_type: str, intent: str) -> int:
+    """Get how strongly a constraint type applies to an intent (0 = not by type)."""
+    constraint_type = constraint_type.lower()
+    if constraint_type in ALWAYS_APPLICABLE:
+        return ALWAYS_APPLICABLE[constraint_type]
+    if intent in INTENT_APPLICABLE.get(constraint_type, ()):
+        return 1
+    return 0
+
+
+def _candidates_for_intent(constraints: List[Dict[str, Any]], intent: str) -> List[int]:
+    """Order constraint positions by type priority for an intent (file order within a type)."""
+    priorities = [type_priority(c.get("type", ""), intent) for c in constraints]
+    return sorted(range(len(constraints)), key=lambda position: (-priorities[position], position))
+
+
+def build_constraint_index(constraints: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the constraint index stored as ``constraint_index`` in conceptual knowledge.
+
+    Args:
+        constraints: Constraint list
+
+    Returns:
+        Constraint index dictionary
+    """
+    terms = []
+    for constraint in constraints:
+        text = " ".join(
+            str(constraint.get(field, "")) for field in ("type", "constraint", "rationale")
+        )
+        terms.append(sorted(set(tokenize(text))))
+
+    return {
+        "constraints": len(constraints),
+        "terms": terms,
+        "scopes": [constraint_scopes(constraint) for constraint in constraints],
+        "by_intent": {
+            intent: _candidates_for_intent(constraints, intent) for intent in INTENT_CATEGORIES
+        },
+    }
+
+
+def attach_constraint_index(conceptual: Dict[str, Any]) -> Dict[str, Any]:
+    """Build and store the constraint index of conceptual knowledge in place."""
+    conceptual["constraint_index"] = build_constraint_index(conceptual.get("constraints", []))
+    return conceptual
+
+
+def get_constraint_index(conceptual: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the stored constraint index, rebuilding it if missing or stale."""
+    constraints = conceptual.get("constraints", [])
+    index = conceptual.get("constraint_index")
+    if not isinstance(index, dict) or index.get("constraints") != len(constraints):
+        index = build_constraint_index(constraints)
+    return index
+
+
+def _scope_matches(scope: str, prompt_terms: set, files: List[str]) -> bool:
+    """Check whether a scope applies to the prompt terms or mentioned files."""
+    scope_lower = scope.lower()
+    if any(char in scope_lower for char in "/*."):
+        pattern = scope_lower if any(char in scope_lower for char in "*?[") else scope_lower.rstrip("/") + "*"
+        return any(
+            fnmatch(file_path.lower(), pattern) or fnmatch(file_path.lower(), "*/" + pattern)
+            for file_path in files
+        )
+
+    # Layer or module name: match prompt words and path components
+    names = set(tokenize(scope_lower))
+    if names & prompt_terms:
+        return True
+    return any(names & set(tokenize(file_path)) for file_path in files)
+
+
+def rank_constraints(
+    prompt: str,
+    intent: str,
+    constraints: List[Dict[str, Any]],
+    index: Dict[str, Any],
+    files: Optional[Iterable[str]] = None,
+    max_constraints: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Rank constraints against a prompt.
+
+    Each candidate scores its type priority for the intent, plus a bonus per
+    prompt term found in its text and a bonus when its scope covers a file or
+    layer the prompt mentions. Scoped constraints whose scope misses every
+    mentioned file are demoted. Constraints that neither apply by type nor
+    match the prompt are left out.
+
+    Args:
+        prompt: User prompt
+        intent: Detected intent category
+        constraints: Constraint list
+        index: Constraint index (see build_constraint_index)
+        files: File paths mentioned in the prompt
+        max_constraints: Maximum number of constraints to return
+
+    Returns:
+        Constraints ordered by relevance
+    """
+    files = list(files or [])
+    prompt_terms = set(tokenize(prompt))
+
+    candidates = index["by_intent"].get(intent)
+    if candidates is None:
+        candidates = _candidates_for_intent(constraints, intent)
+
+    scored = []
+    for rank, position in enumerate(candidates):
+        constraint = constraints[position]
+        base = type_priority(constraint.get("type", ""), intent)
+
+        relevance = TERM_WEIGHT * len(prompt_terms.intersection(index["terms"][position]))
+
+        scopes = index["scopes"][position]
+        if scopes:
+            if any(_scope_matches(scope, prompt_terms, files) for scope in scopes):
+                relevance += SCOPE_MATCH_WEIGHT
+            elif files:
+                relevance -= SCOPE_MISS_PENALTY
+
+        if base <= 0 and relevance <= 0:
+            continue
+
+        score = base + relevance
+        if score > 0:
+            scored.append((-score, rank, constraint))
+
+    scored.sort(key=lambda item: (item[0], item[1]))
+    return [constraint for _, _, constraint in scored[:max_constraints]]
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Knowledge base serialization formats.
+
+Knowledge base files can be stored in one of several modes:
+- json:     indented JSON (default, human-readable)
+- compact:  minified JSON without whitespace
+- gzip:     compact JSON, gzip-compressed
+- lzma:     compact JSON, xz-compressed
+
+Every mode other than plain ``json`` starts with a one-line header naming the
+mode, so readers (hooks and tools) detect the encoding and decode it
+transparently:
+
+    #FELLOW-KB 1 gzip
+    <payload bytes>
+
+Files without a header are read as plain JSON, which keeps knowledge bases
+written by older versions (and by extraction agents using json.dump) readable.
+
+The mode used for writing is chosen from, in order: an explicit argument, the
+FELLOW_KB_STORAGE environment variable, the mode of the file being replaced,
+and finally ``json``.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+
+# Header written in front of non-legacy payloads
+HEADER_MAGIC = b"#FELLOW-KB"
+HEADER_VERSION = 1
+
+# Supported storage modes
+STORAGE_MODES = ("json", "compact", "gzip", "lzma")
+DEFAULT_MODE = "json"
+
+# Environment variable selecting the storage mode for writers
+STORAGE_ENV_VAR = "FELLOW_KB_STORAGE"
+
+# Magic numbers of raw (headerless) compressed streams
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+class KBFormatError(ValueError):
+    """Raised when a knowledge base file cannot be decoded."""
+
+
+def _parse_header(raw: bytes) -> Tuple[Optional[str], int]:
+    """
+    Parse the storage header at the start of a file.
+
+    Args:
+        raw: File contents
+
+    Returns:
+        Tuple of (mode, payload offset). Mode is None for headerless files.
+    """
+    if raw.startswith(HEADER_MAGIC):
+        end = raw.find(b"\n")
+        if end == -1:
+            raise KBFormatError("Truncated knowledge base header")
+        parts = raw[:end].decode("ascii", errors="replace").split()
+        if len(parts) != 3 or parts[2] not in STORAGE_MODES:
+            raise KBFormatError(f"Unrecognized knowledge base header: {raw[:end]!r}")
+        if int(parts[1]) > HEADER_VERSION:
+            raise KBFormatError(f"Unsupported knowledge base format version: {parts[1]}")
+        return parts[2], end + 1
+
+    # Headerless files: legacy JSON, or a compressed stream written by hand
+    if raw.startswith(_GZIP_MAGIC):
+        return "gzip", 0
+    if raw.startswith(_XZ_MAGIC):
+        return "lzma", 0
+
+    return None, 0
+
+
+def decode_kb_bytes(raw: bytes) -> Any:
+    """
+    Decode knowledge base file contents in any supported mode.
+
+    Args:
+        raw: File contents
+
+    Returns:
+        Parsed JSON data
+    """
+    mode, offset = _parse_header(raw)
+    payload = raw[offset:] if offset else raw
+
+    try:
+        if mode == "gzip":
+            import gzip
+            payload = gzip.decompress(payload)
+        elif mode == "lzma":
+            import lzma
+            payload = lzma.decompress(payload)
+    except Exception as e:  # gzip raises OSError/EOFError, lzma raises LZMAError
+        raise KBFormatError(f"Could not decompress {mode} payload: {e}") from e
+
+    return json.loads(payload.decode("utf-8"))
+
+
+def encode_kb_bytes(data: Any, mode: str = DEFAULT_MODE, indent: int = 2) -> bytes:
+    """
+    Encode data for storage in the given mode.
+
+    Args:
+        data: JSON-serializable data
+        mode: One of STORAGE_MODES
+        indent: JSON indentation in json mode (the other modes are minified)
+
+    Returns:
+        Bytes to write to disk, including the header for non-legacy modes
+    """
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown storage mode: {mode} (expected one of {', '.join(STORAGE_MODES)})")
+
+    if mode == "json":
+        return json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    if mode == "gzip":
+        import gzip
+        payload = gzip.compress(payload, compresslevel=6, mtime=0)
+    elif mode == "lzma":
+        import lzma
+        payload = lzma.compress(payload, preset=6)
+
+    header = HEADER_MAGIC + f" {HEADER_VERSION} {mode}\n".encode("ascii")
+    return header + payload
+
+
+def detect_mode(file_path: Union[str, Path]) -> Optional[str]:
+    """
+    Detect the storage mode of an existing file.
+
+    Args:
+        file_path: Path to the knowledge base file
+
+    Returns:
+        Storage mode, or None if the file doesn't exist or can't be read
+    """
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(64)
+    except OSError:
+        return None
+
+    try:
+        mode, _ = _parse_header(head)
+    except KBFormatError:
+        return None
+
+    if mode is None:
+        # Headerless JSON: indented unless it is a single minified line
+        return "json" if b"\n" in head or len(head) < 64 else "compact"
+    return mode
+
+
+def resolve_mode(file_path: Union[str, Path], mode: Optional[str] = None) -> str:
+    """
+    Choose the storage mode for writing a file.
+
+    Args:
+        file_path: File about to be written
+        mode: Explicitly requested mode, if any
+
+    Returns:
+        Storage mode to use
+    """
+    if mode:
+        return mode
+
+    env_mode = os.environ.get(STORAGE_ENV_VAR, "").strip().lower()
+    if env_mode in STORAGE_MODES:
+        return env_mode
+
+    return detect_mode(file_path) or DEFAULT_MODE
+
+
+def load_kb_file(file_path: Union[str, Path]) -> Any:
+    """
+    Load a knowledge base file, detecting its storage mode.
+
+    Args:
+        file_path: Path to the knowledge base file
+
+    Returns:
+        Parsed JSON data
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file can't be decoded (json.JSONDecodeError or KBFormatError)
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    return decode_kb_bytes(raw)
+
+
+def _file_mode(file_path: Path) -> int:
+    """Permission bits for a rewritten file: the existing file's, else 0666 minus the umask."""
+    try:
+        return os.stat(file_path).st_mode & 0o7777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_kb_file(file_path: Union[str, Path], data: Any, mode: Optional[str] = None, indent: int = 2) -> str:
+    """
+    Write a knowledge base file atomically in the chosen storage mode.
+
+    The data is written to a temporary file in the same directory and renamed
+    over the target, so concurrent readers (e.g. the enrichment hook) never
+    observe a partially written file.
+
+    Args:
+        file_path: Destination path
+        data: JSON-serializable data
+        mode: Storage mode (see resolve_mode for the default)
+        indent: JSON indentation in json mode
+
+    Returns:
+        The storage mode that was used
+
+    Raises:
+        OSError: If the file can't be written
+    """
+    file_path = Path(file_path)
+    mode = resolve_mode(file_path, mode)
+    encoded = encode_kb_bytes(data, mode, indent)
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_mode = _file_mode(file_path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{file_path.name}.", dir=str(file_path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # mkstemp creates the file 0600; keep the mode readers expect
+            os.fchmod(f.fileno(), file_mode)
+            f.write(encoded)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    return mode
+
+
+def main():
+    """Convert knowledge base files between storage modes."""
+    if len(sys.argv) < 3:
+        print("Usage: kb_format.py <mode> <file> [<file> ...]", file=sys.stderr)
+        print("", file=sys.stderr)
+        print(f"Rewrites knowledge base files in the given storage mode ({', '.join(STORAGE_MODES)}).", file=sys.stderr)
+        sys.exit(1)
+
+    mode = sys.argv[1]
+    if mode not in STORAGE_MODES:
+        print(f"❌ Error: Unknown storage mode: {mode}", file=sys.stderr)
+        sys.exit(1)
+
+    for name in sys.argv[2:]:
+        path = Path(name)
+        try:
+            before = path.stat().st_size
+            write_kb_file(path, load_kb_file(path), mode)
+            after = path.stat().st_size
+        except (OSError, ValueError) as e:
+            print(f"✗ {path}: {e}", file=sys.stderr)
+            continue
+        print(f"✓ {path.name}: {before:,} → {after:,} bytes ({mode})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Entity identity and relationship storage for the factual knowledge base.
+
+Entities are referenced by stable IDs derived from their grounding file and
+name, and relationships are stored as compact ``[source_id, target_id, kind]``
+tuples instead of embedding full copies of both endpoint entities:
+
+    "entity_relationships": [
+      ["e3f1a09c2b7d", "9a0c4e1f6b22", "depends-on"],
+      ...
+    ]
+
+Relationships written in the legacy format by extraction agents (dicts with
+``source_entity``/``target_entity`` objects or names) are converted when the
+knowledge base is merged or indexed.
+
+Merging and indexing also precompute a CSR adjacency structure over entities
+(``entity_graph``), which the enrichment hook uses to surface the neighbors of
+the entities a prompt mentions, and a PageRank ``importance`` score per entity
+that breaks ranking ties at prompt time.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Marker recorded in factual metadata once relationships are normalized
+RELATIONSHIP_FORMAT = "id-tuples"
+
+DEFAULT_RELATIONSHIP_KIND = "relates-to"
+
+
+def entity_file(entity: Dict[str, Any]) -> Optional[str]:
+    """Get the grounding file of an entity."""
+    grounding = entity.get("grounding")
+    if isinstance(grounding, dict):
+        return grounding.get("file")
+    return None
+
+
+def entity_id(entity: Dict[str, Any]) -> str:
+    """
+    Get the stable ID of an entity.
+
+    The ID is taken from the entity's ``id`` field when present, otherwise it
+    is derived from the grounding file and entity name, so re-extracting an
+    unchanged entity yields the same ID.
+
+    Args:
+        entity: Entity dictionary
+
+    Returns:
+        Stable entity ID (12 hex characters for derived IDs)
+    """
+    existing = entity.get("id")
+    if existing:
+        return str(existing)
+    key = f"{entity_file(entity) or ''}\0{entity.get('name', '')}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def assign_entity_ids(entities: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Ensure every entity carries an ``id`` field.
+
+    Args:
+        entities: Entity list (modified in place)
+
+    Returns:
+        Mapping of entity ID to entity
+    """
+    by_id = {}
+    for entity in entities:
+        eid = entity_id(entity)
+        entity["id"] = eid
+        by_id[eid] = entity
+    return by_id
+
+
+def _endpoint_id(
+    endpoint: Any,
+    known_ids: Dict[str, Dict[str, Any]],
+    ids_by_name: Dict[str, str]
+) -> Optional[str]:
+    """Resolve a legacy relationship endpoint (entity dict, ID or name) to an entity ID."""
+    if isinstance(endpoint, dict):
+        eid = entity_id(endpoint)
+        if eid in known_ids:
+            return eid
+        return ids_by_name.get(endpoint.get("name", ""))
+    if isinstance(endpoint, str):
+        if endpoint in known_ids:
+            return endpoint
+        return ids_by_name.get(endpoint)
+    return None
+
+
+def normalize_relationships(
+    relationships: Iterable[Any],
+    entities: List[Dict[str, Any]]
+) -> List[List[str]]:
+    """
+    Convert relationships to ``[source_id, target_id, kind]`` tuples.
+
+    Accepts both normalized tuples and legacy relationship dicts. Relationships
+    whose endpoints can't be resolved to one of the given entities are dropped,
+    as are exact duplicates.
+
+    Args:
+        relationships: Relationships in any supported format
+        entities: Entities the relationships may refer to (IDs are assigned)
+
+    Returns:
+        List of normalized relationship tuples
+    """
+    known_ids = assign_entity_ids(entities)
+
+    # Later entities win name lookups, so delta entities shadow stale ones
+    ids_by_name = {}
+    for entity in entities:
+        name = entity.get("name")
+        if name:
+            ids_by_name[name] = entity["id"]
+
+    normalized = {}
+    for rel in relationships:
+        if isinstance(rel, (list, tuple)) and len(rel) >= 2:
+            source, target = str(rel[0]), str(rel[1])
+            kind = str(rel[2]) if len(rel) > 2 and rel[2] else DEFAULT_RELATIONSHIP_KIND
+            if source not in known_ids:
+                source = ids_by_name.get(source)
+            if target not in known_ids:
+                target = ids_by_name.get(target)
+        elif isinstance(rel, dict):
+            source = _endpoint_id(rel.get("source_entity", rel.get("source")), known_ids, ids_by_name)
+            target = _endpoint_id(rel.get("target_entity", rel.get("target")), known_ids, ids_by_name)
+            kind = (rel.get("type") or rel.get("relationship_type") or rel.get("kind")
+                    or DEFAULT_RELATIONSHIP_KIND)
+        else:
+            continue
+
+        if source and target:
+            normalized[(source, target, str(kind))] = None
+
+    return [list(rel) for rel in normalized]
+
+
+def normalize_factual_knowledge(factual: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Assign entity IDs and normalize relationships of factual knowledge in place.
+
+    Args:
+        factual: Factual knowledge dictionary
+
+    Returns:
+        The same dictionary, for chaining
+    """
+    entities = factual.setdefault("entities", [])
+    factual["entity_relationships"] = normalize_relationships(
+        factual.get("entity_relationships", []), entities
+    )
+    factual.setdefault("metadata", {})["relationship_format"] = RELATIONSHIP_FORMAT
+    return factual
+
+
+class RelationshipIndex:
+    """
+    Adjacency index over normalized relationships, built once at load time.
+
+    Maps grounding files to the entities they define and entities to the
+    positions of the relationships they take part in, so the relationships
+    touching a set of files are found without scanning the whole list.
+    """
+
+    def __init__(self, entities: List[Dict[str, Any]], relationships: List[List[str]]):
+        self.ids_by_file: Dict[str, Set[str]] = {}
+        for entity in entities:
+            file_path = entity_file(entity)
+            if file_path:
+                self.ids_by_file.setdefault(file_path, set()).add(entity_id(entity))
+
+        self.relationships_by_id: Dict[str, List[int]] = {}
+        for position, (source, target, *_) in enumerate(relationships):
+            self.relationships_by_id.setdefault(source, []).append(position)
+            if target != source:
+                self.relationships_by_id.setdefault(target, []).append(position)
+
+    def entities_in_files(self, files: Iterable[str]) -> Set[str]:
+        """Get the IDs of entities grounded in any of the given files."""
+        ids = set()
+        for file_path in files:
+            ids.update(self.ids_by_file.get(file_path, ()))
+        return ids
+
+    def relationships_for_files(self, files: Iterable[str]) -> Set[int]:
+        """Get positions of relationships with an endpoint in any of the given files."""
+        positions = set()
+        for eid in self.entities_in_files(files):
+            positions.update(self.relationships_by_id.get(eid, ()))
+        return positions
+
+
+def build_entity_graph(entities: List[Dict[str, Any]], relationships: List[List[str]]) -> Dict[str, Any]:
+    """
+    Build a compressed sparse row (CSR) adjacency structure over entities.
+
+    Nodes are positions in the entity list. Edges are undirected, so both
+    endpoints of a relationship reach each other. Neighbors of node ``i`` are
+    ``neighbors[offsets[i]:offsets[i + 1]]``.
+
+    Args:
+        entities: Entity list (with IDs assigned)
+        relationships: Normalized relationship tuples
+
+    Returns:
+        Entity graph dictionary, stored as ``entity_graph`` in factual knowledge
+    """
+    positions = {entity_id(entity): position for position, entity in enumerate(entities)}
+    adjacency: List[Set[int]] = [set() for _ in entities]
+
+    for source, target, *_ in relationships:
+        source_pos = positions.get(source)
+        target_pos = positions.get(target)
+        if source_pos is None or target_pos is None or source_pos == target_pos:
+            continue
+        adjacency[source_pos].add(target_pos)
+        adjacency[target_pos].add(source_pos)
+
+    offsets = [0]
+    neighbors: List[int] = []
+    for node_neighbors in adjacency:
+        neighbors.extend(sorted(node_neighbors))
+        offsets.append(len(neighbors))
+
+    return {
+        "format": "csr",
+        "nodes": len(entities),
+        "offsets": offsets,
+        "neighbors": neighbors,
+    }
+
+
+def attach_entity_graph(factual: Dict[str, Any]) -> Dict[str, Any]:
+    """Build and store the entity graph of normalized factual knowledge in place."""
+    factual["entity_graph"] = build_entity_graph(
+        factual.get("entities", []), factual.get("entity_relationships", [])
+    )
+    return factual
+
+
+def get_entity_graph(factual: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Get the stored entity graph if it matches the entity list.
+
+    Returns:
+        The CSR graph, or None if missing or stale (entities edited after indexing)
+    """
+    graph = factual.get("entity_graph")
+    if (not isinstance(graph, dict) or graph.get("format") != "csr"
+            or graph.get("nodes") != len(factual.get("entities", []))):
+        return None
+    return graph
+
+
+def expand_neighbors(
+    scores: Dict[int, float],
+    graph: Dict[str, Any],
+    seeds: int = 5,
+    max_hops: int = 2,
+    decay: float = 0.5,
+    max_fanout: int = 32,
+    deadline: Optional[float] = None
+) -> Dict[int, float]:
+    """
+    Spread scores from the top-scoring entities to their graph neighbors.
+
+    Starting from the ``seeds`` highest-scoring nodes, each hop gives neighbors
+    the score of the node they were reached from multiplied by ``decay``. A
+    neighbor keeps the higher of its own score and the propagated one. Hub
+    nodes contribute at most ``max_fanout`` neighbors per hop.
+
+    Args:
+        scores: Mapping of entity position to relevance score (updated in place)
+        graph: CSR entity graph (see build_entity_graph)
+        seeds: Number of top-scoring nodes to expand from
+        max_hops: Maximum hop distance from a seed
+        decay: Score multiplier per hop
+        max_fanout: Maximum neighbors visited per node
+        deadline: time.perf_counter() value after which expansion stops
+
+    Returns:
+        The updated scores mapping
+    """
+    import time
+
+    offsets = graph["offsets"]
+    neighbors = graph["neighbors"]
+    frontier = sorted(scores, key=lambda node: scores[node], reverse=True)[:seeds]
+
+    for _ in range(max_hops):
+        next_frontier = []
+        for node in frontier:
+            if deadline is not None and time.perf_counter() > deadline:
+                return scores
+            propagated = scores[node] * decay
+            start = offsets[node]
+            end = min(offsets[node + 1], start + max_fanout)
+            for neighbor in neighbors[start:end]:
+                if propagated > scores.get(neighbor, 0):
+                    scores[neighbor] = propagated
+                    next_frontier.append(neighbor)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    return scores
+
+
+def workflow_memberships(entities: List[Dict[str, Any]], workflows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Count the workflows each entity takes part in.
+
+    An entity is a member of a workflow when its grounding file is the
+    workflow's entry point or is referenced by one of its steps, or when its
+    name appears among the step functions (e.g. ``OrderService.create``).
+
+    Args:
+        entities: Entity list
+        workflows: Workflow list from procedural knowledge
+
+    Returns:
+        Membership count per entity position
+    """
+    positions_by_file: Dict[str, List[int]] = {}
+    positions_by_name: Dict[str, List[int]] = {}
+    for position, entity in enumerate(entities):
+        file_path = entity_file(entity)
+        if file_path:
+            positions_by_file.setdefault(file_path, []).append(position)
+        name = entity.get("name")
+        if name:
+            positions_by_name.setdefault(name, []).append(position)
+
+    counts = [0] * len(entities)
+    for workflow in workflows:
+        files = set()
+        names = set()
+
+        entry_point = workflow.get("entry_point") or {}
+        if entry_point.get("file"):
+            files.add(entry_point["file"])
+        if entry_point.get("function"):
+            names.add(str(entry_point["function"]).split(".")[0])
+
+        for step in workflow.get("steps", []):
+            grounding = step.get("grounding") or {}
+            if grounding.get("file"):
+                files.add(grounding["file"])
+            for reference in step.get("file_references", []):
+                files.add(str(reference).rsplit(":", 1)[0] if ":" in str(reference) else str(reference))
+            for function in step.get("functions", []):
+                names.add(str(function).split(".")[0])
+
+        members = set()
+        for file_path in files:
+            members.update(positions_by_file.get(file_path, ()))
+        for name in names:
+            members.update(positions_by_name.get(name, ()))
+        for position in members:
+            counts[position] += 1
+
+    return counts
+
+
+def compute_entity_importance(
+    graph: Dict[str, Any],
+    memberships: Optional[List[int]] = None,
+    damping: float = 0.85,
+    iterations: int = 50,
+    tolerance: float = 1e-8
+) -> List[float]:
+    """
+    Compute PageRank importance over the entity graph.
+
+    Teleportation is biased towards entities that take part in many workflows,
+    so both relationship structure and workflow step membership raise an
+    entity's importance. Scores are scaled so the most important entity is 1.0.
+
+    Args:
+        graph: CSR entity graph (see build_entity_graph)
+        memberships: Workflow membership count per entity (see workflow_memberships)
+        damping: PageRank damping factor
+        iterations: Maximum power iterations
+        tolerance: L1 change below which iteration stops
+
+    Returns:
+        Importance score in [0, 1] per entity position
+    """
+    nodes = graph["nodes"]
+    if nodes == 0:
+        return []
+
+    offsets = graph["offsets"]
+    neighbors = graph["neighbors"]
+    degrees = [offsets[node + 1] - offsets[node] for node in range(nodes)]
+
+    weights = [1.0 + (memberships[node] if memberships else 0) for node in range(nodes)]
+    total_weight = sum(weights)
+    teleport = [weight / total_weight for weight in weights]
+
+    rank = list(teleport)
+    for _ in range(iterations):
+        dangling = sum(rank[node] for node in range(nodes) if degrees[node] == 0)
+        next_rank = [(1 - damping + damping * dangling) * teleport[node] for node in range(nodes)]
+        for node in range(nodes):
+            if degrees[node]:
+                share = damping * rank[node] / degrees[node]
+                for neighbor in neighbors[offsets[node]:offsets[node + 1]]:
+                    next_rank[neighbor] += share
+        change = sum(abs(next_rank[node] - rank[node]) for node in range(nodes))
+        rank = next_rank
+        if change < tolerance:
+            break
+
+    top = max(rank)
+    return [round(value / top, 4) for value in rank]
+
+
+def attach_entity_importance(
+    factual: Dict[str, Any],
+    procedural: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Store a precomputed ``importance`` score on every entity in place.
+
+    Requires the entity graph (see attach_entity_graph).
+
+    Args:
+        factual: Factual knowledge dictionary
+        procedural: Procedural knowledge dictionary, for workflow membership
+
+    Returns:
+        The factual knowledge dictionary, for chaining
+    """
+    entities = factual.get("entities", [])
+    graph = get_entity_graph(factual) or build_entity_graph(
+        entities, factual.get("entity_relationships", [])
+    )
+    workflows = (procedural or {}).get("workflows", [])
+    memberships = workflow_memberships(entities, workflows) if workflows else None
+
+    for entity, importance in zip(entities, compute_entity_importance(graph, memberships)):
+        entity["importance"] = importance
+    return factual
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Rendering of knowledge base items into enrichment context blocks.
+
+A context block is one rendered item of the enriched prompt (an entity, a
+workflow, a guardrail, the architecture style or the design patterns):
+
+    {"section": "constraints", "lines": [...], "tokens": 14, "hash": "..."}
+
+The enrichment hook renders entity and workflow blocks per prompt. The static
+blocks, which depend only on the knowledge base, are pre-rendered by index_knowledge.py and merge_knowledge.py into
+rendered_context.json next to the knowledge base, so the hook only has to
+concatenate them:
+
+    {
+      "conceptual_stamp": "1767612345000000000:48213",
+      "constraints": [{"section": "constraints", "lines": [...], ...}, ...],
+      "static": [{"section": "architecture", ...}, {"section": "patterns", ...}]
+    }
+
+The stamp (mtime and size of conceptual_knowledge.json) lets the hook detect
+a stale file and fall back to rendering from the knowledge base. Files
+written before the static blocks were stored once (per intent, under
+"intents") count as stale too.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from kb_format import write_kb_file
+
+RENDERED_CONTEXT_FILE = "rendered_context.json"
+
+# Knowledge base files whose stamps make up the KB version stamp
+KB_FILES = (
+    "factual_knowledge.json",
+    "procedural_knowledge.json",
+    "conceptual_knowledge.json",
+)
+
+# Maximum number of design patterns listed
+MAX_PATTERNS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token cost of text (roughly four characters per token)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def block_hash(text: str) -> str:
+    """Get the content hash identifying a context block."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def make_block(section: str, lines: List[str]) -> Dict[str, Any]:
+    """Create a context block from rendered lines."""
+    text = "\n".join(lines)
+    return {
+        "section": section,
+        "lines": lines,
+        "tokens": estimate_tokens(text),
+        "hash": block_hash(text),
+    }
+
+
+def render_entity(entity: Dict[str, Any]) -> List[str]:
+    """Render an entity as context lines."""
+    name = entity.get("name", "Unknown")
+    purpose = entity.get("purpose", "No description")
+    entity_type = entity.get("type", "unknown")
+    grounding = entity.get("grounding", {})
+    file_path = grounding.get("file", "unknown")
+
+    return [
+        f"- **{name}** ({entity_type}): {purpose}",
+        f"  Location: `{file_path}`",
+    ]
+
+
+def render_workflow(workflow: Dict[str, Any]) -> List[str]:
+    """Render a workflow as context lines."""
+    name = workflow.get("name", "Unknown")
+    purpose = workflow.get("purpose", "No description")
+    entry_point = workflow.get("entry_point", {})
+    entry_file = entry_point.get("file", "unknown")
+
+    return [
+        f"- **{name}**: {purpose}",
+        f"  Entry: `{entry_file}`",
+    ]
+
+
+def render_constraint(constraint: Dict[str, Any]) -> List[str]:
+    """Render a constraint as context lines."""
+    constraint_type = constraint.get("type", "Unknown")
+    constraint_text = constraint.get("constraint", "No description")
+    rationale = constraint.get("rationale", "")
+
+    lines = [f"- [{constraint_type}] {constraint_text}"]
+    if rationale:
+        lines.append(f"  Rationale: {rationale}")
+    return lines
+
+
+def render_static_blocks(conceptual: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Render the blocks that depend only on the knowledge base.
+
+    Args:
+        conceptual: Conceptual knowledge dictionary
+
+    Returns:
+        Architecture style and design pattern blocks (where present)
+    """
+    blocks = []
+
+    if "architecture_style" in conceptual:
+        arch_style = conceptual["architecture_style"]
+        style_name = arch_style.get("primary_style") or arch_style.get("primary", "Unknown")
+        blocks.append(make_block("architecture", [f"**Architecture Style:** {style_name}"]))
+
+    patterns = conceptual.get("design_patterns")
+    if patterns:
+        pattern_names = [p.get("pattern", "") for p in patterns[:MAX_PATTERNS]]
+        blocks.append(make_block("patterns", [f"**Design Patterns in Use:** {', '.join(pattern_names)}"]))
+
+    return blocks
+
+
+def file_stamp(file_path: Path) -> Optional[str]:
+    """Get a cheap change stamp (mtime and size) for a file."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def kb_version_stamp(kb_dir: Path) -> str:
+    """Get a stamp that changes whenever any knowledge base file is rewritten."""
+    return "|".join(file_stamp(kb_dir / name) or "-" for name in KB_FILES)
+
+
+def kb_size(kb_dir: Path, names: Optional[Tuple[str, ...]] = None) -> int:
+    """Get the total size in bytes of knowledge base files (by default, all those loaded for enrichment)."""
+    total = 0
+    for name in names or KB_FILES + (RENDERED_CONTEXT_FILE,):
+        try:
+            total += os.stat(kb_dir / name).st_size
+        except OSError:
+            pass
+    return total
+
+
+def prerender_context(conceptual: Dict[str, Any], conceptual_stamp: Optional[str]) -> Dict[str, Any]:
+    """
+    Pre-render the static context blocks of a knowledge base.
+
+    Args:
+        conceptual: Conceptual knowledge dictionary
+        conceptual_stamp: file_stamp() of conceptual_knowledge.json as written
+
+    Returns:
+        Rendered context dictionary (stored as rendered_context.json)
+    """
+    return {
+        "conceptual_stamp": conceptual_stamp,
+        "constraints": [
+            make_block("constraints", render_constraint(constraint))
+            for constraint in conceptual.get("constraints", [])
+        ],
+        "static": render_static_blocks(conceptual),
+    }
+
+
+def get_rendered_context(rendered: Optional[Dict[str, Any]], kb_dir: Path) -> Optional[Dict[str, Any]]:
+    """
+    Validate pre-rendered context against the conceptual knowledge file.
+
+    Returns:
+        The rendered context, or None if missing or stale
+    """
+    if not isinstance(rendered, dict):
+        return None
+    stamp = rendered.get("conceptual_stamp")
+    if not stamp or stamp != file_stamp(kb_dir / "conceptual_knowledge.json"):
+        return None
+    if not isinstance(rendered.get("static"), list):
+        return None
+    return rendered
+
+
+def write_rendered_context(kb_dir: Path, conceptual: Dict[str, Any], storage: Optional[str] = None) -> None:
+    """
+    Pre-render static context and store it next to the knowledge base.
+
+    Must run after conceptual_knowledge.json has been written, since the
+    rendered file records that file's stamp.
+
+    Args:
+        kb_dir: Knowledge base directory
+        conceptual: Conceptual knowledge as written
+        storage: Storage mode (None keeps the current mode)
+    """
+    rendered = prerender_context(conceptual, file_stamp(kb_dir / "conceptual_knowledge.json"))
+    write_kb_file(kb_dir / RENDERED_CONTEXT_FILE, rendered, storage)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Report the enrichment hook's latency by stage.
+
+Reads the histograms the hook records in .fellow-data/metrics/ (see
+fellow/metrics.py) and prints p50/p95/p99 and the mean of every stage:
+interpreter startup, detection, KB resolution and loading, retrieval,
+rendering, logging and the hook total.
+
+Usage:
+    python3 latency_report.py [--metrics-dir DIR] [--json] [--prometheus] [--reset]
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PLUGIN_DIR = SCRIPT_DIR.parent
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+from fellow.metrics import HISTOGRAM_FILE, STAGES, find_metrics_dir, load_histogram, render_prometheus
+
+PERCENTILES = (50, 95, 99)
+
+
+def stage_report(histogram) -> dict:
+    """
+    Summarize the recorded durations of every stage.
+
+    Returns:
+        Dictionary mapping stage names to count, mean and percentiles (ms);
+        stages without recorded durations are left out
+    """
+    report = {}
+    for stage in STAGES:
+        count = histogram.count(stage)
+        if not count:
+            continue
+        summary = {'count': count, 'mean': round(histogram.mean(stage), 3)}
+        for q in PERCENTILES:
+            summary[f'p{q}'] = round(histogram.percentile(stage, q), 3)
+        report[stage] = summary
+    return report
+
+
+def print_report(report: dict, metrics_dir: str):
+    """Print the stage summary as a table."""
+    runs = report.get('total', {}).get('count', 0)
+    print(f"⏱️  Hook latency by stage ({runs} runs, {metrics_dir})")
+    print(f"   {'Stage':<12} {'Count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'Mean':>9}")
+    for stage, summary in report.items():
+        print(f"   {stage:<12} {summary['count']:>7} "
+              + ' '.join(f"{summary[f'p{q}']:>9.2f}" for q in PERCENTILES)
+              + f" {summary['mean']:>9.2f}")
+    print("   (milliseconds)")
+
+
+def main():
+    """Main entry point for the latency report tool."""
+    args = sys.argv[1:]
+
+    metrics_dir = None
+    if '--metrics-dir' in args:
+        index = args.index('--metrics-dir')
+        if index + 1 >= len(args):
+            print("❌ Error: --metrics-dir needs a directory", file=sys.stderr)
+            sys.exit(1)
+        metrics_dir = args[index + 1]
+    if metrics_dir is None:
+        metrics_dir = find_metrics_dir()
+    if metrics_dir is None:
+        print("❌ Error: No .fellow-data/ directory found from the working directory", file=sys.stderr)
+        sys.exit(1)
+
+    if '--reset' in args:
+        try:
+            os.unlink(os.path.join(metrics_dir, HISTOGRAM_FILE))
+        except FileNotFoundError:
+            pass
+        print(f"✓ Reset latency metrics in {metrics_dir}")
+        return
+
+    histogram = load_histogram(metrics_dir)
+    if '--prometheus' in args:
+        sys.stdout.write(render_prometheus(histogram))
+        return
+
+    report = stage_report(histogram)
+    if '--json' in args:
+        print(json.dumps(report, indent=2))
+    elif not report:
+        print(f"No hook runs recorded in {metrics_dir}")
+    else:
+        print_report(report, metrics_dir)
+
+
+if __name__ == "__main__":
+    main()
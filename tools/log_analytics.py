@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Enrichment log analytics.
+
+Ingests the hook's enrichment logs (.fellow-data/logs/enrichment_*.jsonl,
+including rotated segments and gzip archives) into a local SQLite database
+and answers canned questions about them: how often enrichment finds
+nothing, per intent; how many entities, workflows and constraints are
+selected; how much enrichment inflates prompts; and how long each hook
+stage takes.
+
+Ingestion is incremental. Every log file is identified by a fingerprint of
+its first record and the database remembers how many bytes of it were
+read, so re-runs only parse new lines, and a file keeps its progress when
+rotation renames or compresses it. Files whose size and mtime haven't
+changed since the last run are not opened at all.
+
+Usage:
+    python3 log_analytics.py ingest [--log-dir DIR] [--db PATH]
+    python3 log_analytics.py report [NAME ...] [--json] [--log-dir DIR] [--db PATH]
+
+Reports: summary, intents, counts, size, latency, daily (default: all)
+"""
+
+import gzip
+import hashlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from manage_logs import default_log_dir, list_log_files
+
+ANALYTICS_DB = 'enrichment_analytics.db'
+SCHEMA_VERSION = 1
+
+# Lines are parsed and inserted in batches of this many
+BATCH_LINES = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    fingerprint TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_path ON sources (path);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    day TEXT,
+    source TEXT,
+    is_coding INTEGER,
+    intent TEXT,
+    confidence REAL,
+    kb_found INTEGER,
+    enriched INTEGER,
+    entities INTEGER,
+    workflows INTEGER,
+    constraints INTEGER,
+    original_chars INTEGER,
+    enriched_chars INTEGER,
+    context_tokens INTEGER,
+    cache_hit INTEGER,
+    deadline_hit INTEGER
+);
+CREATE TABLE IF NOT EXISTS stage_timings (
+    event_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    ms REAL NOT NULL
+);
+"""
+
+REPORTS = ('summary', 'intents', 'counts', 'size', 'latency', 'daily')
+
+
+def open_db(db_path: Path) -> sqlite3.Connection:
+    """Open (and create if needed) the analytics database."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript(
+            "DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS events; "
+            "DROP TABLE IF EXISTS stage_timings;"
+        )
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+
+def event_row(record: Dict[str, Any]) -> Tuple:
+    """Flatten a log record into an events row (without the id)."""
+    detection = record.get('detection') or {}
+    knowledge_base = record.get('knowledge_base') or {}
+    enrichment = record.get('enrichment') or {}
+    prompt_length = record.get('prompt_length') or {}
+    context = record.get('context') or {}
+    timestamp = record.get('timestamp') or ''
+    original = prompt_length.get('original', 0)
+    enriched = prompt_length.get('enriched', 0)
+    return (
+        timestamp,
+        timestamp[:10],
+        record.get('source'),
+        int(bool(detection.get('is_coding_request'))),
+        detection.get('intent'),
+        detection.get('confidence'),
+        int(bool(knowledge_base.get('found'))),
+        int(enriched > original),
+        enrichment.get('entities_count', 0),
+        enrichment.get('workflows_count', 0),
+        enrichment.get('constraints_count', 0),
+        original,
+        enriched,
+        context.get('context_tokens'),
+        int(bool(context.get('cache_hit'))),
+        int(bool(context.get('deadline_hit'))),
+    )
+
+
+def _open_log(path: Path):
+    """Open a log file for binary reading, decompressing archives."""
+    return gzip.open(path, 'rb') if path.name.endswith('.gz') else open(path, 'rb')
+
+
+def ingest_file(conn: sqlite3.Connection, path: Path, next_id: int) -> Tuple[int, int]:
+    """
+    Ingest the lines of a log file not read yet.
+
+    Args:
+        conn: Analytics database
+        path: Log file (.jsonl or .jsonl.gz)
+        next_id: Id of the next event row
+
+    Returns:
+        (events ingested, next event id)
+    """
+    stat = path.stat()
+    known = conn.execute(
+        "SELECT 1 FROM sources WHERE path = ? AND size = ? AND mtime_ns = ?",
+        (str(path), stat.st_size, stat.st_mtime_ns)
+    ).fetchone()
+    if known:
+        return 0, next_id
+
+    with _open_log(path) as f:
+        first_line = f.readline()
+        if not first_line.endswith(b'\n'):
+            return 0, next_id  # No complete record yet
+        fingerprint = hashlib.sha1(first_line).hexdigest()
+        row = conn.execute("SELECT offset FROM sources WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        offset = row[0] if row else 0
+        f.seek(offset)
+
+        loads = json.JSONDecoder().decode
+        ingested = 0
+        while True:
+            lines = f.readlines(BATCH_LINES * 512)
+            if not lines:
+                break
+            partial = not lines[-1].endswith(b'\n')
+            if partial:
+                lines.pop()  # Record still being written: read it next run
+            events, timings = [], []
+            for line in lines:
+                offset += len(line)
+                try:
+                    record = loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                if not isinstance(record, dict) or 'timestamp' not in record:
+                    continue
+                events.append((next_id,) + event_row(record))
+                for stage, ms in (record.get('timings') or {}).items():
+                    timings.append((next_id, stage, ms))
+                next_id += 1
+            conn.executemany(f"INSERT INTO events VALUES ({','.join('?' * 17)})", events)
+            conn.executemany("INSERT INTO stage_timings VALUES (?, ?, ?)", timings)
+            ingested += len(events)
+            if partial:
+                break
+
+    conn.execute(
+        "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+        (fingerprint, str(path), offset, stat.st_size, stat.st_mtime_ns)
+    )
+    return ingested, next_id
+
+
+def ingest_logs(conn: sqlite3.Connection, log_dir: Path) -> Dict[str, int]:
+    """
+    Ingest every enrichment log of a directory, incrementally.
+
+    Returns:
+        Counts of files scanned and events ingested
+    """
+    next_id = (conn.execute("SELECT MAX(id) FROM events").fetchone()[0] or 0) + 1
+    summary = {'files': 0, 'events': 0}
+    with conn:
+        for log_file in list_log_files(log_dir):
+            if log_file.kind != 'enrichment' or '.jsonl' not in log_file.path.name:
+                continue
+            conn.execute("SAVEPOINT log_file")
+            try:
+                ingested, next_id = ingest_file(conn, log_file.path, next_id)
+            except (OSError, EOFError):
+                # Rotated or compressed while reading; the next run picks it up
+                conn.execute("ROLLBACK TO log_file")
+                next_id = (conn.execute("SELECT MAX(id) FROM events").fetchone()[0] or 0) + 1
+                continue
+            finally:
+                conn.execute("RELEASE log_file")
+            summary['files'] += 1
+            summary['events'] += ingested
+    return summary
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(100.0 * part / whole, 1) if whole else None
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))
+    return round(sorted_values[index], 3)
+
+
+def report_summary(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Overall event counts and rates."""
+    total, coding, kb_found, enriched, cache_hits, deadline_hits = conn.execute(
+        "SELECT COUNT(*), SUM(is_coding), SUM(is_coding AND kb_found), SUM(enriched), "
+        "SUM(cache_hit), SUM(deadline_hit) FROM events"
+    ).fetchone()
+    coding = coding or 0
+    kb_found = kb_found or 0
+    return {
+        'events': total,
+        'coding_requests': coding,
+        'coding_rate': _rate(coding, total),
+        'kb_found_rate': _rate(kb_found, coding),
+        'enriched_rate': _rate(enriched or 0, kb_found),
+        'found_nothing_rate': _rate(kb_found - (enriched or 0), kb_found),
+        'cache_hit_rate': _rate(cache_hits or 0, enriched or 0),
+        'deadline_hit_rate': _rate(deadline_hits or 0, kb_found),
+    }
+
+
+def report_intents(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Enrichment hit rates per detected intent (coding requests with a KB)."""
+    rows = conn.execute(
+        "SELECT intent, COUNT(*), SUM(enriched), AVG(confidence) FROM events "
+        "WHERE is_coding AND kb_found GROUP BY intent ORDER BY COUNT(*) DESC"
+    ).fetchall()
+    return [{
+        'intent': intent,
+        'events': count,
+        'hit_rate': _rate(hits or 0, count),
+        'found_nothing': count - (hits or 0),
+        'avg_confidence': round(confidence or 0.0, 2),
+    } for intent, count, hits, confidence in rows]
+
+
+def report_counts(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Entities, workflows and constraints selected per enriched prompt."""
+    report = {}
+    for column in ('entities', 'workflows', 'constraints'):
+        avg, maximum, none = conn.execute(
+            f"SELECT AVG({column}), MAX({column}), SUM({column} = 0) FROM events WHERE enriched"
+        ).fetchone()
+        report[column] = {
+            'avg': round(avg or 0.0, 2),
+            'max': maximum or 0,
+            'events_without': none or 0,
+        }
+    return report
+
+
+def report_size(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Prompt size inflation from enrichment."""
+    avg_original, avg_enriched, avg_tokens, avg_ratio = conn.execute(
+        "SELECT AVG(original_chars), AVG(enriched_chars), AVG(context_tokens), "
+        "AVG(CAST(enriched_chars AS REAL) / MAX(original_chars, 1)) FROM events WHERE enriched"
+    ).fetchone()
+    tokens = [row[0] for row in conn.execute(
+        "SELECT context_tokens FROM events WHERE enriched AND context_tokens IS NOT NULL "
+        "ORDER BY context_tokens"
+    )]
+    return {
+        'avg_original_chars': round(avg_original or 0.0, 1),
+        'avg_enriched_chars': round(avg_enriched or 0.0, 1),
+        'avg_added_chars': round((avg_enriched or 0.0) - (avg_original or 0.0), 1),
+        'avg_inflation_ratio': round(avg_ratio or 0.0, 2),
+        'avg_context_tokens': round(avg_tokens or 0.0, 1),
+        'p95_context_tokens': _percentile(tokens, 95),
+    }
+
+
+def report_latency(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+    """Percentiles of each hook stage's duration (ms)."""
+    report = {}
+    stages = [row[0] for row in conn.execute("SELECT DISTINCT stage FROM stage_timings")]
+    for stage in stages:
+        values = [row[0] for row in conn.execute(
+            "SELECT ms FROM stage_timings WHERE stage = ? ORDER BY ms", (stage,)
+        )]
+        report[stage] = {
+            'count': len(values),
+            'p50': _percentile(values, 50),
+            'p95': _percentile(values, 95),
+            'p99': _percentile(values, 99),
+        }
+    return report
+
+
+def report_daily(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Events and hit rates per day."""
+    rows = conn.execute(
+        "SELECT day, COUNT(*), SUM(is_coding), SUM(is_coding AND kb_found), SUM(enriched) "
+        "FROM events GROUP BY day ORDER BY day"
+    ).fetchall()
+    return [{
+        'day': day,
+        'events': total,
+        'coding_requests': coding or 0,
+        'enriched': enriched or 0,
+        'hit_rate': _rate(enriched or 0, kb_found or 0),
+    } for day, total, coding, kb_found, enriched in rows]
+
+
+REPORT_FUNCTIONS = {
+    'summary': report_summary,
+    'intents': report_intents,
+    'counts': report_counts,
+    'size': report_size,
+    'latency': report_latency,
+    'daily': report_daily,
+}
+
+
+def print_report(name: str, report: Any):
+    """Print a report as an indented listing or table."""
+    print(f"\n📊 {name.capitalize()}")
+    if isinstance(report, list):
+        if not report:
+            print("   (no events)")
+            return
+        columns = list(report[0])
+        print('   ' + '  '.join(f"{column:>15}" for column in columns))
+        for row in report:
+            print('   ' + '  '.join(f"{str(row[column]):>15}" for column in columns))
+    else:
+        for key, value in report.items():
+            if isinstance(value, dict):
+                details = ', '.join(f"{k}={v}" for k, v in value.items())
+                print(f"   {key:<22} {details}")
+            else:
+                print(f"   {key:<22} {value}")
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    """Remove `name VALUE` from the arguments and return VALUE."""
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f"❌ Error: {name} needs a value", file=sys.stderr)
+        sys.exit(1)
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+
+def main():
+    """Main entry point for the log analytics tool."""
+    args = sys.argv[1:]
+    as_json = '--json' in args
+    args = [arg for arg in args if arg != '--json']
+    log_dir = Path(_option(args, '--log-dir') or default_log_dir())
+    db_path = Path(_option(args, '--db') or log_dir.parent / 'analytics' / ANALYTICS_DB)
+
+    command = args[0] if args else 'report'
+    if command not in ('ingest', 'report'):
+        print(f"❌ Error: Unknown command: {command}", file=sys.stderr)
+        print("Usage: log_analytics.py [ingest|report [NAME ...]] [--json] [--log-dir DIR] [--db PATH]",
+              file=sys.stderr)
+        sys.exit(1)
+
+    names = args[1:] or list(REPORTS)
+    unknown = [name for name in names if name not in REPORT_FUNCTIONS]
+    if command == 'report' and unknown:
+        print(f"❌ Error: Unknown report(s): {', '.join(unknown)} (available: {', '.join(REPORTS)})",
+              file=sys.stderr)
+        sys.exit(1)
+
+    conn = open_db(db_path)
+    summary = ingest_logs(conn, log_dir)
+    if command == 'ingest':
+        print(f"✓ Ingested {summary['events']} new event(s) from {summary['files']} log file(s) into {db_path}")
+        return
+
+    reports = {name: REPORT_FUNCTIONS[name](conn) for name in names}
+    try:
+        if as_json:
+            print(json.dumps(reports, indent=2))
+        else:
+            for name, report in reports.items():
+                print_report(name, report)
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
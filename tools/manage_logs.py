@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Manage Fellow's enrichment logs in .fellow-data/logs/.
+
+The hook appends one JSON record per event to a daily file
+(enrichment_YYYY-MM-DD.jsonl, errors_YYYY-MM-DD.jsonl). This tool keeps
+those files bounded:
+
+- Size rotation: an active file over `log_max_file_mb` is renamed to the
+  next numbered segment (enrichment_YYYY-MM-DD.1.jsonl, .2, ...)
+- Compression: closed files (earlier days and rotated segments) are gzipped
+- Retention: archives older than `log_retention_days` are deleted, then the
+  oldest files go until the directory fits in `log_max_total_mb`; block
+  bodies no longer referenced by any log are removed from the block store
+
+Enrichment records reference their context blocks by hash (the logger
+stores each distinct block body once in blocks/). read_records() puts the
+full enriched prompt back together.
+
+The logger starts `rotate` in the background when a day's file is created or
+outgrows its cap, so no prompt waits for it. `render` prints the
+human-readable view of a day's events from the JSONL records.
+
+Usage:
+    python3 manage_logs.py rotate [--log-dir DIR] [--quiet]
+    python3 manage_logs.py render [YYYY-MM-DD | FILE ...] [--log-dir DIR]
+    python3 manage_logs.py status [--log-dir DIR]
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PLUGIN_DIR = SCRIPT_DIR.parent
+HOOKS_DIR = PLUGIN_DIR / 'hooks'
+for import_dir in (SCRIPT_DIR, HOOKS_DIR, PLUGIN_DIR):
+    if str(import_dir) not in sys.path:
+        sys.path.insert(0, str(import_dir))
+
+from fellow.config import Settings, load_settings
+from logger import BLOCK_STORE_DIR, render_event
+from project_paths import find_fellow_data
+
+# Rotated segments may still receive a write from a hook that opened the
+# file just before the rename; they are compressed once this old
+CLOSED_GRACE_SECONDS = 60
+
+_LOG_NAME_RE = re.compile(
+    r'^(?P<kind>[a-z]+)_(?P<day>\d{4}-\d{2}-\d{2})(?:\.(?P<segment>\d+))?'
+    r'\.(?P<ext>jsonl|log)(?P<gz>\.gz)?$'
+)
+
+
+class LogFile(NamedTuple):
+    """A file in the log directory, parsed from its name."""
+    path: Path
+    kind: str
+    day: str
+    segment: int
+    compressed: bool
+
+    @property
+    def active(self) -> bool:
+        """Whether hooks still append to this file (today's, unrotated)."""
+        return self.segment == 0 and not self.compressed and self.day == date.today().isoformat()
+
+    @property
+    def sort_key(self):
+        # Segments first, then the unnumbered file that was current last
+        return (self.day, self.kind, self.segment or sys.maxsize)
+
+
+def log_settings(settings: Settings) -> Dict[str, Any]:
+    """
+    Read the log retention settings from the hook settings.
+
+    Args:
+        settings: Hook settings (see fellow.config)
+
+    Returns:
+        Dictionary with max_file_bytes, retention_days, max_total_bytes and
+        compress
+    """
+    return {
+        'max_file_bytes': int(settings.log_max_file_mb * 1024 * 1024),
+        'retention_days': settings.log_retention_days,
+        'max_total_bytes': int(settings.log_max_total_mb * 1024 * 1024),
+        'compress': settings.log_compress,
+    }
+
+
+def list_log_files(log_dir: Path) -> List[LogFile]:
+    """
+    List the log files in a directory, oldest first.
+
+    Args:
+        log_dir: Log directory (.fellow-data/logs/)
+
+    Returns:
+        Parsed log files; other files are ignored
+    """
+    files = []
+    try:
+        entries = list(os.scandir(log_dir))
+    except OSError:
+        return files
+
+    for entry in entries:
+        match = _LOG_NAME_RE.match(entry.name)
+        if match:
+            files.append(LogFile(
+                Path(entry.path),
+                match.group('kind'),
+                match.group('day'),
+                int(match.group('segment') or 0),
+                bool(match.group('gz'))
+            ))
+    files.sort(key=lambda f: f.sort_key)
+    return files
+
+
+def next_segment_path(log_file: Path) -> Path:
+    """Return the next free numbered segment name for a daily log file."""
+    stem, ext = log_file.name.split('.', 1)
+    taken = {f.segment for f in list_log_files(log_file.parent)
+             if f.path.name.startswith(stem + '.')}
+    segment = max(taken | {0}) + 1
+    return log_file.with_name(f"{stem}.{segment}.{ext}")
+
+
+def rotate_file(log_file: Path) -> Optional[Path]:
+    """
+    Close a daily log file by renaming it to its next segment.
+
+    Hooks holding the file open finish their write into the segment; the
+    next event creates a fresh file.
+
+    Returns:
+        The segment path, or None if the file was already rotated
+    """
+    segment_path = next_segment_path(log_file)
+    try:
+        os.rename(log_file, segment_path)
+    except OSError:
+        return None
+    return segment_path
+
+
+def compress_file(log_file: Path) -> Optional[Path]:
+    """
+    Gzip a closed log file, replacing it with `<name>.gz`.
+
+    Returns:
+        The archive path, or None if the file could not be compressed
+    """
+    archive = log_file.with_name(log_file.name + '.gz')
+    tmp_path = log_file.with_name(f"{archive.name}.{os.getpid()}.tmp")
+    try:
+        with open(log_file, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, archive)
+        os.unlink(log_file)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return None
+    return archive
+
+
+def maintain_logs(log_dir: Path, settings: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Rotate, compress and prune a log directory.
+
+    Args:
+        log_dir: Log directory (.fellow-data/logs/)
+        settings: Retention settings (see log_settings)
+
+    Returns:
+        Counts of rotated, compressed and deleted files, and of block bodies
+        deleted from the block store
+    """
+    summary = {'rotated': 0, 'compressed': 0, 'deleted': 0, 'blocks_deleted': 0}
+
+    # Size rotation of today's files
+    for log_file in list_log_files(log_dir):
+        if log_file.active:
+            try:
+                oversized = log_file.path.stat().st_size > settings['max_file_bytes']
+            except OSError:
+                continue
+            if oversized and rotate_file(log_file.path):
+                summary['rotated'] += 1
+
+    # Retention by age
+    cutoff = (date.today() - timedelta(days=settings['retention_days'])).isoformat()
+    for log_file in list_log_files(log_dir):
+        if log_file.day < cutoff:
+            try:
+                os.unlink(log_file.path)
+                summary['deleted'] += 1
+            except OSError:
+                pass
+
+    # Compression of closed files
+    if settings['compress']:
+        now = time.time()
+        for log_file in list_log_files(log_dir):
+            if log_file.compressed or log_file.active:
+                continue
+            try:
+                if log_file.segment and now - log_file.path.stat().st_mtime < CLOSED_GRACE_SECONDS:
+                    continue
+            except OSError:
+                continue
+            if compress_file(log_file.path):
+                summary['compressed'] += 1
+
+    # Retention by total size (oldest first, never active files)
+    remaining = []
+    for log_file in list_log_files(log_dir):
+        try:
+            remaining.append((log_file, log_file.path.stat().st_size))
+        except OSError:
+            pass
+
+    total = sum(size for _, size in remaining)
+    for log_file, size in remaining:
+        if total <= settings['max_total_bytes']:
+            break
+        if log_file.active:
+            continue
+        try:
+            os.unlink(log_file.path)
+            summary['deleted'] += 1
+            total -= size
+        except OSError:
+            pass
+
+    if summary['deleted']:
+        summary['blocks_deleted'] = prune_blocks(log_dir)
+    return summary
+
+
+def prune_blocks(log_dir: Path) -> int:
+    """
+    Delete block bodies no longer referenced by any enrichment log.
+
+    Recently stored blocks are kept, since the record referencing them may
+    not have been written yet.
+
+    Returns:
+        Number of block bodies deleted
+    """
+    blocks_dir = log_dir / BLOCK_STORE_DIR
+    if not blocks_dir.is_dir():
+        return 0
+
+    referenced = set()
+    for log_file in list_log_files(log_dir):
+        if log_file.kind != 'enrichment' or '.jsonl' not in log_file.path.name:
+            continue
+        try:
+            for record in read_records(log_file.path, expand=False):
+                referenced.update(digest for _, digest in record.get('enriched_blocks') or ())
+        except (OSError, EOFError):
+            return 0  # Never drop blocks based on a partial scan
+
+    deleted = 0
+    now = time.time()
+    for entry in os.scandir(blocks_dir):
+        digest = entry.name.split('.', 1)[0]
+        if digest in referenced:
+            continue
+        try:
+            if now - entry.stat().st_mtime >= CLOSED_GRACE_SECONDS:
+                os.unlink(entry.path)
+                deleted += 1
+        except OSError:
+            pass
+    return deleted
+
+
+def read_records(log_file: Path, expand: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Read the JSON records of a log file, compressed or not.
+
+    Lines that are not valid JSON (a record cut short by a full disk) are
+    skipped.
+
+    Args:
+        log_file: JSONL log file (.jsonl or .jsonl.gz)
+        expand: Rebuild `enriched_prompt` from the block store for records
+            that reference their context blocks
+
+    Yields:
+        Log records, in file order
+    """
+    block_cache: Dict[str, str] = {}
+    blocks_dir = log_file.parent / BLOCK_STORE_DIR
+    opener = gzip.open if log_file.name.endswith('.gz') else open
+    with opener(log_file, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if expand and record.get('enriched_blocks'):
+                record['enriched_prompt'] = expand_enriched_prompt(record, blocks_dir, block_cache)
+            yield record
+
+
+def expand_enriched_prompt(
+    record: Dict[str, Any],
+    blocks_dir: Path,
+    block_cache: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Rebuild the enriched prompt of a record from its block references.
+
+    Args:
+        record: Enrichment record with `enriched_blocks` ([section, hash] pairs)
+        blocks_dir: Block store directory (<log_dir>/blocks/)
+        block_cache: Block bodies already read, by hash
+
+    Returns:
+        The enriched prompt as sent (with the prompt as logged)
+    """
+    from fellow.enrich.pipeline import render_context
+
+    if block_cache is None:
+        block_cache = {}
+    blocks = []
+    for section, digest in record['enriched_blocks']:
+        if digest not in block_cache:
+            try:
+                block_cache[digest] = (blocks_dir / f"{digest}.txt").read_text(encoding='utf-8')
+            except OSError:
+                block_cache[digest] = f"[missing context block {digest}]"
+        blocks.append({'section': section, 'lines': [block_cache[digest]]})
+    return render_context(record.get('original_prompt', ''), blocks)
+
+
+def day_files(log_dir: Path, day: str, kind: str = 'enrichment') -> List[Path]:
+    """Return a day's JSONL files (segments and archives) in write order."""
+    return [f.path for f in list_log_files(log_dir)
+            if f.day == day and f.kind == kind and '.jsonl' in f.path.name]
+
+
+def default_log_dir() -> Path:
+    """Return the log directory of the project containing the working directory."""
+    fellow_data = find_fellow_data()
+    if fellow_data is None:
+        return SCRIPT_DIR.parent / '.fellow-data' / 'logs'
+    return fellow_data / 'logs'
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for display."""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def show_status(log_dir: Path):
+    """Print the log files of a directory with their sizes."""
+    files = list_log_files(log_dir)
+    if not files:
+        print(f"No logs in {log_dir}")
+        return
+
+    total = 0
+    print(f"📁 {log_dir}")
+    for log_file in files:
+        size = log_file.path.stat().st_size
+        total += size
+        marker = ' (active)' if log_file.active else ''
+        print(f"   {log_file.path.name:<44} {format_size(size):>10}{marker}")
+
+    blocks_dir = log_dir / BLOCK_STORE_DIR
+    if blocks_dir.is_dir():
+        block_sizes = [entry.stat().st_size for entry in os.scandir(blocks_dir)]
+        total += sum(block_sizes)
+        print(f"   {BLOCK_STORE_DIR + '/ (' + str(len(block_sizes)) + ' blocks)':<44} "
+              f"{format_size(sum(block_sizes)):>10}")
+    print(f"   Total: {format_size(total)}")
+
+
+def render(paths: List[Path]):
+    """Print the human-readable view of the events in log files."""
+    for log_file in paths:
+        for record in read_records(log_file):
+            sys.stdout.write(render_event(record))
+
+
+def main():
+    """Main entry point for the log management tool."""
+    args = sys.argv[1:]
+    quiet = '--quiet' in args
+    args = [arg for arg in args if arg != '--quiet']
+
+    log_dir = None
+    if '--log-dir' in args:
+        index = args.index('--log-dir')
+        if index + 1 >= len(args):
+            print("❌ Error: --log-dir needs a directory", file=sys.stderr)
+            sys.exit(1)
+        log_dir = Path(args[index + 1])
+        del args[index:index + 2]
+    if log_dir is None:
+        log_dir = default_log_dir()
+
+    command = args[0] if args else 'status'
+    targets = args[1:]
+
+    if command == 'rotate':
+        summary = maintain_logs(log_dir, log_settings(load_settings()))
+        if not quiet:
+            print(f"✓ Rotated {summary['rotated']}, compressed {summary['compressed']}, "
+                  f"deleted {summary['deleted']} log file(s) in {log_dir}"
+                  f" ({summary['blocks_deleted']} unused block(s) removed)")
+
+    elif command == 'render':
+        if targets and not re.match(r'^\d{4}-\d{2}-\d{2}$', targets[0]):
+            paths = [Path(target) for target in targets]
+        else:
+            day = targets[0] if targets else date.today().isoformat()
+            paths = day_files(log_dir, day)
+            if not paths:
+                print(f"❌ Error: No enrichment logs for {day} in {log_dir}", file=sys.stderr)
+                sys.exit(1)
+        try:
+            render(paths)
+        except BrokenPipeError:
+            pass
+        except (OSError, EOFError) as e:
+            print(f"❌ Error: Cannot read logs: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    elif command == 'status':
+        show_status(log_dir)
+
+    else:
+        print(f"❌ Error: Unknown command: {command}", file=sys.stderr)
+        print("Usage: manage_logs.py [rotate|render|status] [--log-dir DIR]", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,32 @@ This tool handles the knowledge base merge operation during incremental extracti
 combining newly extracted knowledge (delta files) with the existing knowledge base.
 """
 
-import json
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+# Add the tools directory to Python path to ensure imports work
+SCRIPT_DIR = Path(__file__).parent.resolve()
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from kb_constraints import attach_constraint_index
+from kb_format import STORAGE_MODES, load_kb_file, write_kb_file
+from kb_graph import (
+    RelationshipIndex,
+    attach_entity_graph,
+    attach_entity_importance,
+    normalize_factual_knowledge,
+    normalize_relationships
+)
+from kb_render import write_rendered_context
+
 
 def load_json(file_path: Path) -> Optional[Dict[str, Any]]:
     """
-    Load and parse a JSON file.
+    Load and parse a JSON file in any knowledge base storage mode.
 
     Args:
         file_path: Path to the JSON file
@@ -27,24 +42,24 @@ def load_json(file_path: Path) -> Optional[Dict[str, Any]]:
     try:
         if not file_path.exists():
             return None
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError) as e:
+        return load_kb_file(file_path)
+    except (ValueError, OSError) as e:
         print(f"⚠️  Warning: Could not load {file_path.name}: {e}", file=sys.stderr)
         return None
 
 
-def write_json(file_path: Path, data: Dict[str, Any]) -> None:
+def write_json(file_path: Path, data: Dict[str, Any], storage: Optional[str] = None) -> None:
     """
-    Write data to a JSON file with proper formatting.
+    Write data to a JSON file in the knowledge base storage mode.
 
     Args:
         file_path: Path where to write the JSON file
         data: Dictionary to write as JSON
+        storage: Storage mode (json, compact, gzip, lzma). Defaults to
+            FELLOW_KB_STORAGE, then the mode of the existing file.
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_kb_file(file_path, data, storage)
     except OSError as e:
         print(f"❌ Error writing {file_path.name}: {e}", file=sys.stderr)
         sys.exit(1)
@@ -97,32 +112,39 @@ def merge_factual_knowledge(
     # Convert changed files to set for faster lookup
     changed_files_set = set(changed_files)
 
+    # Reference relationship endpoints by entity ID (converts legacy dicts)
+    normalize_factual_knowledge(existing)
+    existing_entities = existing["entities"]
+    existing_relationships = existing["entity_relationships"]
+
     # Remove entities from changed files
     filtered_entities = [
-        entity for entity in existing.get("entities", [])
+        entity for entity in existing_entities
         if entity.get("grounding", {}).get("file") not in changed_files_set
     ]
 
-    entities_removed = len(existing.get("entities", [])) - len(filtered_entities)
+    entities_removed = len(existing_entities) - len(filtered_entities)
 
     # Add newly extracted entities
     delta_entities = delta.get("entities", [])
     merged_entities = filtered_entities + delta_entities
 
-    # Update relationships: Remove old relationships involving changed files
-    existing_relationships = existing.get("entity_relationships", [])
+    # Update relationships: Remove old relationships involving changed files,
+    # found through the adjacency index instead of scanning every relationship
+    index = RelationshipIndex(existing_entities, existing_relationships)
+    stale_positions = index.relationships_for_files(changed_files_set)
     filtered_relationships = [
-        rel for rel in existing_relationships
-        if (rel.get("source_entity", {}).get("grounding", {}).get("file") not in changed_files_set and
-            rel.get("target_entity", {}).get("grounding", {}).get("file") not in changed_files_set)
+        rel for position, rel in enumerate(existing_relationships)
+        if position not in stale_positions
     ]
 
-    # Add new relationships from delta
-    delta_relationships = delta.get("entity_relationships", [])
+    # Add new relationships from delta (endpoints may be unchanged entities)
+    delta_relationships = normalize_relationships(
+        delta.get("entity_relationships", []), merged_entities
+    )
     merged_relationships = filtered_relationships + delta_relationships
 
-    relationships_updated = (len(existing_relationships) - len(filtered_relationships) +
-                            len(delta_relationships))
+    relationships_updated = len(stale_positions) + len(delta_relationships)
 
     # Update metadata
     updated_metadata = existing.get("metadata", {}).copy()
@@ -150,6 +172,9 @@ def merge_factual_knowledge(
         "summary": summary
     }
 
+    # Precompute the CSR adjacency used for neighbor expansion at query time
+    attach_entity_graph(merged)
+
     stats = {
         "entities_removed": entities_removed,
         "entities_added": len(delta_entities),
@@ -292,13 +317,18 @@ def merge_conceptual_knowledge(
     return updated, status
 
 
-def merge_knowledge_bases(kb_dir: Path, changed_files: List[str]) -> Dict[str, Any]:
+def merge_knowledge_bases(
+    kb_dir: Path,
+    changed_files: List[str],
+    storage: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Perform the full knowledge base merge operation.
 
     Args:
         kb_dir: Path to the knowledge base directory (.fellow-data/semantic/)
         changed_files: List of changed file paths
+        storage: Storage mode for the merged files (None keeps the current mode)
 
     Returns:
         Dictionary with merge statistics
@@ -344,17 +374,29 @@ def merge_knowledge_bases(kb_dir: Path, changed_files: List[str]) -> Dict[str, A
         existing_procedural, delta_procedural, changed_files
     )
 
+    # Precompute entity importance (relationships + workflow membership)
+    attach_entity_importance(merged_factual, merged_procedural)
+
     # Merge conceptual knowledge
     merged_conceptual, conceptual_status = merge_conceptual_knowledge(
         existing_conceptual, delta_conceptual
     )
 
+    # Index constraints for prompt-aware ranking
+    attach_constraint_index(merged_conceptual)
+
     print("💾 Writing merged knowledge base...")
 
     # Write merged knowledge base
-    write_json(kb_dir / "factual_knowledge.json", merged_factual)
-    write_json(kb_dir / "procedural_knowledge.json", merged_procedural)
-    write_json(kb_dir / "conceptual_knowledge.json", merged_conceptual)
+    write_json(kb_dir / "factual_knowledge.json", merged_factual, storage)
+    write_json(kb_dir / "procedural_knowledge.json", merged_procedural, storage)
+    write_json(kb_dir / "conceptual_knowledge.json", merged_conceptual, storage)
+
+    # Pre-render static context blocks for the enrichment hook
+    try:
+        write_rendered_context(kb_dir, merged_conceptual, storage)
+    except OSError as e:
+        print(f"⚠️  Warning: Could not pre-render context blocks: {e}", file=sys.stderr)
 
     print("🧹 Cleaning up delta files...")
 
@@ -411,14 +453,21 @@ def print_merge_statistics(stats: Dict[str, Any]) -> None:
 
 def main():
     """Main entry point for the merge-knowledge tool."""
-    if len(sys.argv) < 2:
-        print("Usage: merge_knowledge.py <target-project-path>", file=sys.stderr)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--storage=")]
+    storage_args = [arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--storage=")]
+    storage = storage_args[-1] if storage_args else None
+
+    if len(args) < 1 or (storage and storage not in STORAGE_MODES):
+        print("Usage: merge_knowledge.py <target-project-path> [--storage=MODE]", file=sys.stderr)
         print("", file=sys.stderr)
         print("Merges delta knowledge with existing knowledge base for incremental updates.", file=sys.stderr)
+        print("", file=sys.stderr)
+        print("Options:", file=sys.stderr)
+        print(f"  --storage=MODE  Write the merged KB as {'|'.join(STORAGE_MODES)} (default: keep current)", file=sys.stderr)
         sys.exit(1)
 
     # Get target project path
-    target_path = Path(sys.argv[1]).resolve()
+    target_path = Path(args[0]).resolve()
 
     if not target_path.exists():
         print(f"❌ Error: Target project path does not exist: {target_path}", file=sys.stderr)
@@ -453,7 +502,7 @@ def main():
 
     # Perform merge
     try:
-        stats = merge_knowledge_bases(kb_dir, changed_files)
+        stats = merge_knowledge_bases(kb_dir, changed_files, storage)
         print_merge_statistics(stats)
         print(f"📁 Knowledge base location: {kb_dir}")
         print()
@@ -465,4 +514,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if os.environ.get('FELLOW_PROFILE'):
+        sys.path.insert(0, str(SCRIPT_DIR.parent))
+        from fellow.profiling import run_profiled
+        project_args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+        run_profiled('merge_knowledge', main, start_dir=project_args[0] if project_args else None)
+    else:
+        main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Precompile the plugin's Python bytecode.
+
+The enrichment hook runs on every prompt with `python3 -I -S`. Compiling the
+hooks, the tools and the fellow package once at install time means no prompt
+pays for compiling a module, and a read-only plugin directory still gets
+cached bytecode.
+
+Usage:
+    python3 precompile.py [--quiet]
+"""
+
+import compileall
+import sys
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+
+# Directories holding modules imported by the hooks
+SOURCE_DIRS = ("hooks", "tools", "fellow")
+
+
+def precompile(plugin_dir: Path = PLUGIN_DIR, quiet: bool = False) -> bool:
+    """
+    Compile the hook and tool modules of the plugin.
+
+    Args:
+        plugin_dir: Plugin root directory
+        quiet: Only report errors
+
+    Returns:
+        True if every module compiled
+    """
+    ok = True
+    for name in SOURCE_DIRS:
+        source_dir = plugin_dir / name
+        if not source_dir.is_dir():
+            continue
+        if not compileall.compile_dir(str(source_dir), quiet=2 if quiet else 1):
+            ok = False
+        elif not quiet:
+            print(f"✓ Compiled {source_dir}")
+    return ok
+
+
+def main():
+    """Main entry point for the precompile tool."""
+    quiet = "--quiet" in sys.argv[1:]
+    if not precompile(quiet=quiet):
+        print("❌ Error: Some modules failed to compile", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
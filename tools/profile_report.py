@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Aggregate the profiles captured with FELLOW_PROFILE.
+
+Reads the runs in .fellow-data/profiles/ (see fellow/profiling.py) and,
+for each profiled script, prints its wall times, the functions that took
+the most time over all runs (pstats, combined), and, for runs captured
+with tracemalloc, the peak memory and the allocation sites that held the
+most memory on average.
+
+Usage:
+    python3 profile_report.py [SCRIPT ...] [--profiles-dir DIR] [--sort KEY] [--top N] [--clear]
+
+Sort keys: cumulative (default), tottime, calls
+"""
+
+import json
+import os
+import pstats
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PLUGIN_DIR = SCRIPT_DIR.parent
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+from fellow.profiling import PSTATS_SUFFIX, SUMMARY_SUFFIX, find_profiles_dir
+
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+DEFAULT_TOP = 20
+
+
+def list_runs(profiles_dir: Path) -> Dict[str, List[Path]]:
+    """
+    List the profiled runs of each script.
+
+    Returns:
+        Dictionary mapping script names to their runs' .pstats files, oldest first
+    """
+    runs = {}
+    if not profiles_dir.is_dir():
+        return runs
+    for pstats_file in sorted(profiles_dir.glob(f'*{PSTATS_SUFFIX}')):
+        summary = load_summary(pstats_file)
+        script = summary.get('script') or pstats_file.name.rsplit('-', 4)[0]
+        runs.setdefault(script, []).append(pstats_file)
+    return runs
+
+
+def load_summary(pstats_file: Path) -> Dict[str, Any]:
+    """Load the summary written next to a run's .pstats file (empty if missing)."""
+    summary_file = pstats_file.with_name(pstats_file.name[:-len(PSTATS_SUFFIX)] + SUMMARY_SUFFIX)
+    try:
+        with open(summary_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def aggregate_allocations(summaries: List[Dict[str, Any]], top: int) -> List[Dict[str, Any]]:
+    """
+    Combine the allocation sites of the runs captured with tracemalloc.
+
+    Returns:
+        Sites with their average size per run (over the runs listing them),
+        number of runs listing them and average block count, largest first
+    """
+    sites = {}
+    for summary in summaries:
+        for allocation in summary.get('allocations', []):
+            site = sites.setdefault(allocation['location'], {'size': 0, 'count': 0, 'runs': 0})
+            site['size'] += allocation['size']
+            site['count'] += allocation['count']
+            site['runs'] += 1
+    report = [{
+        'location': location,
+        'avg_size': site['size'] // site['runs'],
+        'avg_count': site['count'] // site['runs'],
+        'runs': site['runs'],
+    } for location, site in sites.items()]
+    report.sort(key=lambda site: site['avg_size'], reverse=True)
+    return report[:top]
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for display."""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def print_script_report(script: str, pstats_files: List[Path], sort: str, top: int):
+    """Print the aggregated profile of one script."""
+    summaries = [load_summary(pstats_file) for pstats_file in pstats_files]
+    wall_times = sorted(summary['wall_ms'] for summary in summaries if 'wall_ms' in summary)
+
+    print(f"\n🔬 {script}: {len(pstats_files)} run(s)")
+    if wall_times:
+        print(f"   Wall time: median {wall_times[len(wall_times) // 2]:.1f} ms, "
+              f"max {wall_times[-1]:.1f} ms")
+
+    stats = None
+    for pstats_file in pstats_files:
+        try:
+            if stats is None:
+                stats = pstats.Stats(str(pstats_file), stream=sys.stdout)
+            else:
+                stats.add(str(pstats_file))
+        except (OSError, EOFError, ValueError, TypeError):
+            print(f"   ⚠️  Skipping unreadable profile: {pstats_file.name}")
+    if stats is not None:
+        stats.sort_stats(sort).print_stats(top)
+
+    peaks = sorted(summary['peak_bytes'] for summary in summaries if 'peak_bytes' in summary)
+    if peaks:
+        print(f"   Peak traced memory ({len(peaks)} run(s)): median {format_bytes(peaks[len(peaks) // 2])}, "
+              f"max {format_bytes(peaks[-1])}")
+        print(f"   {'Avg size':>10} {'Avg blocks':>10} {'Runs':>5}  Allocation site")
+        for site in aggregate_allocations(summaries, top):
+            print(f"   {format_bytes(site['avg_size']):>10} {site['avg_count']:>10} {site['runs']:>5}  "
+                  f"{site['location']}")
+
+
+def main():
+    """Main entry point for the profile report tool."""
+    args = sys.argv[1:]
+    options = {'--profiles-dir': None, '--sort': 'cumulative', '--top': str(DEFAULT_TOP)}
+    scripts = []
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if arg in options:
+            if index + 1 >= len(args):
+                print(f"❌ Error: {arg} needs a value", file=sys.stderr)
+                sys.exit(1)
+            options[arg] = args[index + 1]
+            index += 2
+            continue
+        if arg != '--clear':
+            scripts.append(arg)
+        index += 1
+
+    if options['--sort'] not in SORT_KEYS:
+        print(f"❌ Error: Unknown sort key: {options['--sort']} (available: {', '.join(SORT_KEYS)})",
+              file=sys.stderr)
+        sys.exit(1)
+    try:
+        top = int(options['--top'])
+    except ValueError:
+        print(f"❌ Error: --top needs a number: {options['--top']}", file=sys.stderr)
+        sys.exit(1)
+
+    profiles_dir = Path(options['--profiles-dir'] or find_profiles_dir())
+    runs = list_runs(profiles_dir)
+
+    if '--clear' in args:
+        cleared = 0
+        for script, pstats_files in runs.items():
+            if scripts and script not in scripts:
+                continue
+            for pstats_file in pstats_files:
+                summary_file = pstats_file.with_name(pstats_file.name[:-len(PSTATS_SUFFIX)] + SUMMARY_SUFFIX)
+                for path in (pstats_file, summary_file):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                cleared += 1
+        print(f"✓ Deleted {cleared} profile(s) from {profiles_dir}")
+        return
+
+    unknown = [script for script in scripts if script not in runs]
+    if unknown:
+        print(f"❌ Error: No profiles of {', '.join(unknown)} in {profiles_dir}", file=sys.stderr)
+        sys.exit(1)
+    if not runs:
+        print(f"No profiles in {profiles_dir}")
+        print("   Run with FELLOW_PROFILE=cpu (or mem, to also trace allocations) to capture some.")
+        return
+
+    print(f"📁 Profiles: {profiles_dir}")
+    try:
+        for script in scripts or sorted(runs):
+            print_script_report(script, runs[script], options['--sort'], top)
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
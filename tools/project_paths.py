@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Cached resolution of the project root and Fellow data directory.
+
+Hooks run once per prompt from the user's working directory and need the
+nearest .fellow-data/ directory (logs, caches, metrics), the nearest
+.fellow-data/semantic/ knowledge base (which may sit further up, when a
+subdirectory has a .fellow-data/ of its own without a knowledge base) and
+the project root (nearest parent with .git/). Walking up to ten parent
+directories with several stat calls per level is slow on network file
+systems, so results are cached per working directory, in memory and in a
+small cache file shared across processes (marshal format, like the hook's
+config cache):
+
+    ~/.cache/fellow/project_paths.cache
+    {
+      "/home/dev/shop/src": (
+        "/home/dev/shop",                          # project root
+        "/home/dev/shop/src/.fellow-data",         # nearest .fellow-data/
+        "/home/dev/shop/.fellow-data/semantic",    # knowledge base
+        {"/home/dev/shop/src": 1767612345000000000,
+         "/home/dev/shop/src/.fellow-data": 1767612345000000000,
+         "/home/dev/shop": 1767612300000000000,
+         "/home/dev/shop/.fellow-data": 1767612300000000000},
+      )
+    }
+
+An entry stays valid while the directories the walk looked at keep their
+mtimes: every directory from the working directory up to where the walk
+stopped (creating .fellow-data/ or .git/ in any of them changes it) and
+every .fellow-data/ directory found on the way (creating or removing
+semantic/ in it changes it). A hit costs one stat call per level walked,
+where the walk itself costs up to four.
+
+The metrics recorded at the end of every hook run resolve through here too,
+so like fellow.config this module only uses modules the interpreter has
+already loaded under `python3 -I -S`: resolve_dirs() works on strings, and
+pathlib is only imported by the Path-returning functions.
+"""
+
+import marshal
+import os
+
+FELLOW_DATA_DIR = ".fellow-data"
+KB_SUBDIR = "semantic"
+
+# Number of parent directories searched
+MAX_SEARCH_DEPTH = 10
+
+# Working directories remembered in the cache file
+MAX_CACHE_ENTRIES = 64
+
+CACHE_ENV_VAR = "FELLOW_PATHS_CACHE"
+CACHE_FILE = "project_paths.cache"
+
+
+class ProjectPaths:
+    """Resolved locations for a working directory (pathlib.Path values)."""
+
+    __slots__ = ('project_root', 'fellow_data', 'kb_dir')
+
+    def __init__(self, project_root, fellow_data=None, kb_dir=None):
+        self.project_root = project_root
+        self.fellow_data = fellow_data
+        self.kb_dir = kb_dir
+
+    @property
+    def has_kb(self) -> bool:
+        """Whether a knowledge base directory (.fellow-data/semantic/) was found."""
+        return self.kb_dir is not None
+
+    def __repr__(self) -> str:
+        return (f"ProjectPaths(project_root={self.project_root!r}, "
+                f"fellow_data={self.fellow_data!r}, kb_dir={self.kb_dir!r})")
+
+
+# Per-process results, keyed by working directory:
+# (project_root, fellow_data or None, kb_dir or None)
+_resolved = {}
+
+
+def cache_file_path() -> str:
+    """Get the location of the shared resolver cache file."""
+    override = os.environ.get(CACHE_ENV_VAR)
+    if override:
+        return override
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "fellow", CACHE_FILE)
+
+
+def _mtime_ns(path: str):
+    """Get a directory's mtime, or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _walk(start_dir: str) -> tuple:
+    """
+    Search upward for the nearest .fellow-data/, .fellow-data/semantic/ and .git/ directories.
+
+    Returns:
+        Tuple of ((project_root, fellow_data, kb_dir), directories whose
+        mtimes change when the result goes stale)
+    """
+    fellow_data = None
+    kb_dir = None
+    project_root = None
+    checked = []
+
+    current = start_dir
+    for _ in range(MAX_SEARCH_DEPTH):
+        checked.append(current)
+        candidate = os.path.join(current, FELLOW_DATA_DIR)
+        if kb_dir is None and os.path.isdir(candidate):
+            checked.append(candidate)
+            if fellow_data is None:
+                fellow_data = candidate
+            # A .fellow-data/ without a knowledge base (logs or metrics
+            # only) doesn't hide one further up
+            if os.path.isdir(os.path.join(candidate, KB_SUBDIR)):
+                kb_dir = os.path.join(candidate, KB_SUBDIR)
+        if project_root is None and os.path.exists(os.path.join(current, ".git")):
+            project_root = current
+        if kb_dir is not None and project_root is not None:
+            break
+        parent = os.path.dirname(current)
+        if parent == current:  # Reached root
+            break
+        current = parent
+
+    # No .git found, use the start directory
+    return (project_root or start_dir, fellow_data, kb_dir), checked
+
+
+def _load_cache(cache_path: str) -> dict:
+    """Load the resolver cache file (empty if missing or unreadable)."""
+    try:
+        with open(cache_path, "rb") as f:
+            cache = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(cache_path: str, cache: dict):
+    """Write the resolver cache file atomically, keeping the newest entries."""
+    if len(cache) > MAX_CACHE_ENTRIES:
+        cache = dict(list(cache.items())[-MAX_CACHE_ENTRIES:])
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        pass  # The cache is an optimization only
+
+
+def resolve_dirs(start_dir=None) -> tuple:
+    """
+    Resolve the project root and Fellow data directories for a directory, as strings.
+
+    Args:
+        start_dir: Directory to resolve from (defaults to the working directory)
+
+    Returns:
+        (project_root, nearest .fellow-data/ or None, .fellow-data/semantic/ or None)
+    """
+    key = os.path.abspath(str(start_dir)) if start_dir is not None else os.getcwd()
+
+    resolved = _resolved.get(key)
+    if resolved is not None:
+        return resolved
+
+    cache_path = cache_file_path()
+    cache = _load_cache(cache_path)
+    entry = cache.get(key)
+    if isinstance(entry, tuple) and len(entry) == 4 and isinstance(entry[3], dict) and entry[3]:
+        if all(_mtime_ns(path) == mtime_ns for path, mtime_ns in entry[3].items()):
+            resolved = _resolved[key] = entry[:3]
+            return resolved
+
+    resolved, checked_dirs = _walk(key)
+    _resolved[key] = resolved
+
+    checked = {path: _mtime_ns(path) for path in checked_dirs}
+    if None not in checked.values():
+        cache.pop(key, None)
+        cache[key] = resolved + (checked,)
+        _save_cache(cache_path, cache)
+
+    return resolved
+
+
+def resolve_project(start_dir=None) -> ProjectPaths:
+    """
+    Resolve the project root and Fellow data directories for a directory.
+
+    Args:
+        start_dir: Directory to resolve from (defaults to the working directory)
+
+    Returns:
+        Resolved project paths
+    """
+    from pathlib import Path
+
+    project_root, fellow_data, kb_dir = resolve_dirs(start_dir)
+    return ProjectPaths(
+        Path(project_root),
+        Path(fellow_data) if fellow_data else None,
+        Path(kb_dir) if kb_dir else None,
+    )
+
+
+def find_fellow_data(start_dir=None):
+    """Find the nearest .fellow-data/ directory at or above start_dir (a Path, or None)."""
+    return resolve_project(start_dir).fellow_data
+
+
+def find_knowledge_base(start_dir=None):
+    """Find the nearest knowledge base directory (.fellow-data/semantic/) at or above start_dir."""
+    return resolve_project(start_dir).kb_dir
+
+
+def get_project_root(start_dir=None):
+    """Get the project root: the nearest parent with .git/, else start_dir itself."""
+    return resolve_project(start_dir).project_root
+
+
+def invalidate(start_dir=None):
+    """Forget the cached resolution for a directory (e.g. after creating .fellow-data/)."""
+    key = os.path.abspath(str(start_dir)) if start_dir is not None else os.getcwd()
+    _resolved.pop(key, None)
+
+    cache_path = cache_file_path()
+    cache = _load_cache(cache_path)
+    if cache.pop(key, None) is not None:
+        _save_cache(cache_path, cache)
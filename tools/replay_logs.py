@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Replay logged prompts through the enrichment pipeline.
+
+Reads the prompts the hook logged (.fellow-data/logs/enrichment_*.jsonl,
+including rotated segments and gzip archives), runs each distinct prompt
+through the Enricher against a chosen knowledge base snapshot, and records
+per prompt: latency by stage, the detected intent, and which entities,
+workflows and constraints were selected. Runs are saved as JSON so a later
+run (after a change to scoring, indexing or the detector) can be compared
+with a baseline: how many selections stayed identical, the overlap of each
+kind of knowledge, intent and enrichment flips, the prompts that drifted
+most, and the latency change.
+
+Prompts are replayed in a process pool; every worker loads the knowledge
+base once, so latencies exclude loading. Workers share the CPU, so use
+--workers 1 for latencies comparable with the hook's. The deadline is off
+unless --deadline is given, so selections don't depend on machine load.
+Prompts longer than the logger keeps (4096 characters) are replayed
+truncated.
+
+Usage:
+    python3 replay_logs.py run [--kb DIR] [--log-dir DIR] [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+                               [--limit N] [--workers N] [--deadline] [--baseline FILE]
+                               [--output FILE] [--json]
+    python3 replay_logs.py compare BASELINE CANDIDATE [--top N] [--json]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+# manage_logs puts hooks/ and the plugin directory on sys.path
+from manage_logs import default_log_dir, list_log_files, read_records
+
+from fellow.config import load_settings
+from kb_render import kb_version_stamp
+from project_paths import find_knowledge_base
+
+REPLAYS_DIR = 'replays'
+KINDS = ('entities', 'workflows', 'constraints')
+PERCENTILES = (50, 95, 99)
+PREVIEW_CHARS = 120
+DEFAULT_TOP = 10
+# Added and removed items printed per kind of knowledge
+PRINTED_KEYS = 3
+
+# Enricher of each worker process (see _init_worker)
+_enricher = None
+
+
+def collect_prompts(log_dir: Path, since: Optional[str] = None, until: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Collect the distinct prompts of the enrichment logs, oldest first.
+
+    Args:
+        log_dir: Log directory (.fellow-data/logs/)
+        since: First day to include (YYYY-MM-DD)
+        until: Last day to include (YYYY-MM-DD)
+        limit: Keep the most recent `limit` distinct prompts
+
+    Returns:
+        List of {'id', 'prompt', 'truncated', 'occurrences', 'first_seen',
+        'last_seen', 'logged'} dictionaries; 'logged' holds the intent and
+        counts of the last logged run
+    """
+    prompts: Dict[str, Dict[str, Any]] = {}
+    for log_file in list_log_files(log_dir):
+        if log_file.kind != 'enrichment' or '.jsonl' not in log_file.path.name:
+            continue
+        if (since and log_file.day < since) or (until and log_file.day > until):
+            continue
+        try:
+            records = list(read_records(log_file.path, expand=False))
+        except (OSError, EOFError) as e:
+            print(f"⚠️  Warning: Could not read {log_file.path.name}: {e}", file=sys.stderr)
+            continue
+        for record in records:
+            prompt = record.get('original_prompt')
+            if not prompt:
+                continue
+            # Truncated prompts are logged with a hash of the full text
+            digest = record.get('original_prompt_sha1') or hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+            prompt_id = digest[:16]
+            entry = prompts.get(prompt_id)
+            if entry is None:
+                entry = prompts[prompt_id] = {
+                    'id': prompt_id,
+                    'prompt': prompt,
+                    'truncated': 'original_prompt_sha1' in record,
+                    'occurrences': 0,
+                    'first_seen': record.get('timestamp'),
+                }
+            else:
+                # Move repeated prompts to the end, in order of last use
+                del prompts[prompt_id]
+                prompts[prompt_id] = entry
+            detection = record.get('detection') or {}
+            enrichment = record.get('enrichment') or {}
+            entry['occurrences'] += 1
+            entry['last_seen'] = record.get('timestamp')
+            entry['logged'] = {
+                'intent': detection.get('intent'),
+                'is_coding': bool(detection.get('is_coding_request')),
+                **{kind: enrichment.get(f'{kind}_count', 0) for kind in KINDS},
+            }
+
+    collected = list(prompts.values())
+    if limit is not None:
+        collected = collected[-limit:] if limit else []
+    return collected
+
+
+def _init_worker(kb_dir: str, deadline: bool):
+    """Build the worker's Enricher and load the knowledge base."""
+    global _enricher
+    from fellow.enrich import Enricher
+
+    settings = load_settings()
+    if not deadline:
+        settings.deadline_ms = 0
+    _enricher = Enricher(Path(kb_dir), settings)
+    _enricher.load()
+
+
+def _selection_key(kind: str, item: Dict[str, Any]) -> str:
+    """Identify a selected item: entity and workflow names, constraint text."""
+    if kind == 'constraints':
+        return item.get('constraint') or item.get('description') or json.dumps(item, sort_keys=True)
+    return item.get('name') or json.dumps(item, sort_keys=True)
+
+
+def replay_prompt(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replay one prompt in a worker.
+
+    Returns:
+        Replay result: id, intent, selections, context statistics and stage
+        timings (ms)
+    """
+    result = _enricher.enrich(entry['prompt'])
+    replayed = {
+        'id': entry['id'],
+        'is_coding': result.is_coding_request,
+        'intent': result.intent,
+        'confidence': round(result.confidence, 3),
+        'enriched': result.enriched,
+        'context_tokens': result.context_stats.get('context_tokens', 0),
+        'deadline_hit': result.deadline_hit,
+        'timings': {stage: round(ms, 3) for stage, ms in result.timings.items()},
+    }
+    for kind in KINDS:
+        replayed[kind] = [_selection_key(kind, item) for item in getattr(result, kind)]
+    return replayed
+
+
+def replay(prompts: List[Dict[str, Any]], kb_dir: Path, workers: int, deadline: bool) -> List[Dict[str, Any]]:
+    """
+    Replay prompts against a knowledge base, in a process pool when workers > 1.
+
+    Returns:
+        Replay results, in prompt order
+    """
+    if workers <= 1 or len(prompts) < 2:
+        _init_worker(str(kb_dir), deadline)
+        return [replay_prompt(entry) for entry in prompts]
+    # Enough chunks to balance slow prompts across workers, few enough to amortize pickling
+    chunksize = max(1, min(200, len(prompts) // (workers * 8)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(kb_dir), deadline)) as pool:
+        return list(pool.map(replay_prompt, prompts, chunksize=chunksize))
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))
+    return round(sorted_values[index], 3)
+
+
+def latency_summary(results: List[Dict[str, Any]], stage: str = 'total') -> Dict[str, Any]:
+    """Count, mean and percentiles (ms) of one stage over replay results."""
+    values = sorted(r['timings'][stage] for r in results if stage in r['timings'])
+    summary = {'count': len(values), 'mean': round(sum(values) / len(values), 3) if values else None}
+    summary.update({f'p{q}': _percentile(values, q) for q in PERCENTILES})
+    return summary
+
+
+def summarize_run(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize a replay run: enrichment rate, selected counts and latency by stage."""
+    coding = [r for r in results if r['is_coding']]
+    enriched = [r for r in results if r['enriched']]
+    stages = []
+    for r in results:
+        stages.extend(stage for stage in r['timings'] if stage not in stages)
+    summary = {
+        'prompts': len(results),
+        'coding': len(coding),
+        'enriched': len(enriched),
+        'deadline_hits': sum(r['deadline_hit'] for r in results),
+        'mean_selected': {
+            kind: round(sum(len(r[kind]) for r in coding) / len(coding), 2) if coding else None
+            for kind in KINDS
+        },
+        'latency_ms': {stage: latency_summary(results, stage) for stage in stages},
+    }
+    return summary
+
+
+def _overlap(before: List[str], after: List[str]) -> float:
+    """Jaccard overlap of two selections (1.0 when both are empty)."""
+    before, after = set(before), set(after)
+    if not before and not after:
+        return 1.0
+    return len(before & after) / len(before | after)
+
+
+def compare_runs(baseline: Dict[str, Any], candidate: Dict[str, Any], top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """
+    Compare a replay run with a baseline run, prompt by prompt.
+
+    Args:
+        baseline: Saved baseline run
+        candidate: Saved candidate run
+        top: Number of most drifted prompts to list
+
+    Returns:
+        Drift report: prompts compared, identical selections, mean overlap
+        per kind, intent/coding/enrichment flips, latency change and the
+        most drifted prompts
+    """
+    before = {r['id']: r for r in baseline['results']}
+    after = {r['id']: r for r in candidate['results']}
+    previews = {p['id']: p['preview'] for p in candidate.get('prompts', []) + baseline.get('prompts', [])}
+    shared = [prompt_id for prompt_id in after if prompt_id in before]
+
+    overlaps = {kind: [] for kind in KINDS}
+    drifted = []
+    identical = 0
+    flips = {'intent': 0, 'coding': 0, 'enrichment': 0}
+    for prompt_id in shared:
+        old, new = before[prompt_id], after[prompt_id]
+        flips['intent'] += old['intent'] != new['intent']
+        flips['coding'] += old['is_coding'] != new['is_coding']
+        flips['enrichment'] += old['enriched'] != new['enriched']
+        if all(old[kind] == new[kind] for kind in KINDS):
+            identical += 1
+            for kind in KINDS:
+                overlaps[kind].append(1.0)
+            continue
+        prompt_overlap = {}
+        for kind in KINDS:
+            prompt_overlap[kind] = _overlap(old[kind], new[kind])
+            overlaps[kind].append(prompt_overlap[kind])
+        drifted.append({
+            'id': prompt_id,
+            'preview': previews.get(prompt_id, ''),
+            'overlap': {kind: round(value, 3) for kind, value in prompt_overlap.items()},
+            'added': {kind: list(dict.fromkeys(key for key in new[kind] if key not in old[kind])) for kind in KINDS},
+            'removed': {kind: list(dict.fromkeys(key for key in old[kind] if key not in new[kind])) for kind in KINDS},
+        })
+    drifted.sort(key=lambda d: (sum(d['overlap'].values()), d['id']))
+
+    old_latency = latency_summary([before[prompt_id] for prompt_id in shared])
+    new_latency = latency_summary([after[prompt_id] for prompt_id in shared])
+    latency = {'baseline': old_latency, 'candidate': new_latency}
+    for key in ('p50', 'p95'):
+        if old_latency[key] and new_latency[key] is not None:
+            latency[f'{key}_ratio'] = round(new_latency[key] / old_latency[key], 3)
+
+    return {
+        'prompts': {
+            'compared': len(shared),
+            'only_baseline': len(before) - len(shared),
+            'only_candidate': len(after) - len(shared),
+        },
+        'identical': identical,
+        'identical_rate': round(100.0 * identical / len(shared), 1) if shared else None,
+        'mean_overlap': {
+            kind: round(sum(values) / len(values), 4) if values else None for kind, values in overlaps.items()
+        },
+        'flips': flips,
+        'latency_ms': latency,
+        'most_drifted': drifted[:top],
+    }
+
+
+def load_run(path: Path) -> Dict[str, Any]:
+    """Load a saved replay run, exiting with an error if it can't be read."""
+    try:
+        run = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Could not read replay run {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not isinstance(run, dict) or not isinstance(run.get('results'), list):
+        print(f"❌ Error: Not a replay run: {path}", file=sys.stderr)
+        sys.exit(1)
+    return run
+
+
+def print_summary(run: Dict[str, Any], path: Path):
+    """Print a replay run's summary."""
+    summary, replay_info = run['summary'], run['replay']
+    print(f"\n🔁 Replayed {summary['prompts']} prompt(s) from {replay_info['log_dir']}")
+    print(f"   Knowledge base: {replay_info['kb_dir']}")
+    print(f"   Workers: {replay_info['workers']}, wall time {replay_info['wall_seconds']} s "
+          f"({replay_info['prompts_per_second']} prompts/s)")
+    print(f"   Coding: {summary['coding']}, enriched: {summary['enriched']}, "
+          f"deadline hits: {summary['deadline_hits']}")
+    selected = ', '.join(f"{kind}={value}" for kind, value in summary['mean_selected'].items())
+    print(f"   Mean selected (coding prompts): {selected}")
+    print("\n⏱️  Latency (ms)")
+    for stage, stats in summary['latency_ms'].items():
+        details = ', '.join(f"{key}={value}" for key, value in stats.items())
+        print(f"   {stage:<12} {details}")
+    print(f"\n✓ Run saved to {path}")
+
+
+def print_drift(drift: Dict[str, Any]):
+    """Print a drift report."""
+    prompts = drift['prompts']
+    print(f"\n📊 Drift against baseline ({prompts['compared']} prompt(s) compared, "
+          f"{prompts['only_baseline']} only in baseline, {prompts['only_candidate']} only in this run)")
+    print(f"   Identical selections: {drift['identical']} ({drift['identical_rate']}%)")
+    overlap = ', '.join(f"{kind}={value}" for kind, value in drift['mean_overlap'].items())
+    print(f"   Mean overlap: {overlap}")
+    print("   Flips: " + ', '.join(f"{kind}={count}" for kind, count in drift['flips'].items()))
+    latency = drift['latency_ms']
+    print(f"   Latency p50: {latency['baseline']['p50']} → {latency['candidate']['p50']} ms, "
+          f"p95: {latency['baseline']['p95']} → {latency['candidate']['p95']} ms")
+    if drift['most_drifted']:
+        print("\n🔀 Most drifted prompts")
+        for entry in drift['most_drifted']:
+            overlap = ', '.join(f"{kind}={value}" for kind, value in entry['overlap'].items())
+            print(f"   • [{entry['id']}] {entry['preview'][:70]}")
+            print(f"     overlap {overlap}")
+            for kind in KINDS:
+                for sign, keys in (('+', entry['added'][kind]), ('-', entry['removed'][kind])):
+                    if keys:
+                        more = f" (+{len(keys) - PRINTED_KEYS} more)" if len(keys) > PRINTED_KEYS else ''
+                        print(f"     {sign} {kind}: {', '.join(keys[:PRINTED_KEYS])}{more}")
+
+
+def resolve_kb_dir(path: Optional[str]) -> Optional[Path]:
+    """Resolve --kb: a knowledge base directory or a project containing one."""
+    if path is None:
+        return find_knowledge_base()
+    kb_dir = Path(path).resolve()
+    if (kb_dir / '.fellow-data' / 'semantic').is_dir():
+        kb_dir = kb_dir / '.fellow-data' / 'semantic'
+    return kb_dir if kb_dir.is_dir() else None
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    """Remove `name VALUE` from the arguments and return VALUE."""
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f"❌ Error: {name} needs a value", file=sys.stderr)
+        sys.exit(1)
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+
+def _int_option(args: List[str], name: str, default: Optional[int]) -> Optional[int]:
+    value = _option(args, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        print(f"❌ Error: {name} must be a non-negative number: {value}", file=sys.stderr)
+        sys.exit(1)
+    return number
+
+
+def run_command(args: List[str], as_json: bool, deadline: bool):
+    """Replay the logged prompts and save the run."""
+    log_dir = Path(_option(args, '--log-dir') or default_log_dir())
+    kb_option = _option(args, '--kb')
+    since, until = _option(args, '--since'), _option(args, '--until')
+    limit = _int_option(args, '--limit', None)
+    workers = _int_option(args, '--workers', os.cpu_count() or 1) or 1
+    baseline_path = _option(args, '--baseline')
+    output = _option(args, '--output')
+
+    kb_dir = resolve_kb_dir(kb_option)
+    if kb_dir is None:
+        print(f"❌ Error: No knowledge base found{f' at {kb_option}' if kb_option else ''}", file=sys.stderr)
+        sys.exit(1)
+    baseline = load_run(Path(baseline_path)) if baseline_path else None
+
+    prompts = collect_prompts(log_dir, since, until, limit)
+    if not prompts:
+        print(f"❌ Error: No logged prompts found in {log_dir}", file=sys.stderr)
+        sys.exit(1)
+    print(f"🔁 Replaying {len(prompts)} distinct prompt(s) with {min(workers, len(prompts))} worker(s)...",
+          file=sys.stderr)
+
+    started = time.perf_counter()
+    results = replay(prompts, kb_dir, workers, deadline)
+    wall_seconds = time.perf_counter() - started
+
+    run = {
+        'replay': {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'log_dir': str(log_dir),
+            'kb_dir': str(kb_dir),
+            'kb_stamp': kb_version_stamp(kb_dir),
+            'since': since,
+            'until': until,
+            'workers': min(workers, len(prompts)),
+            'deadline_ms': load_settings().deadline_ms if deadline else 0,
+            'wall_seconds': round(wall_seconds, 2),
+            'prompts_per_second': round(len(prompts) / wall_seconds, 1) if wall_seconds else None,
+        },
+        'summary': summarize_run(results),
+        'prompts': [{
+            'id': entry['id'],
+            'preview': entry['prompt'][:PREVIEW_CHARS],
+            'truncated': entry['truncated'],
+            'occurrences': entry['occurrences'],
+            'first_seen': entry['first_seen'],
+            'last_seen': entry['last_seen'],
+            'logged': entry['logged'],
+        } for entry in prompts],
+        'results': results,
+    }
+    if baseline is not None:
+        run['drift'] = compare_runs(baseline, run)
+
+    if output:
+        path = Path(output)
+    else:
+        path = log_dir.parent / REPLAYS_DIR / f"replay-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=1) + '\n', encoding='utf-8')
+
+    if as_json:
+        print(json.dumps({key: run[key] for key in ('replay', 'summary', 'drift') if key in run}, indent=2))
+        return
+    print_summary(run, path)
+    if baseline is not None:
+        print_drift(run['drift'])
+
+
+def compare_command(args: List[str], as_json: bool):
+    """Compare two saved runs."""
+    top = _int_option(args, '--top', DEFAULT_TOP)
+    if len(args) != 2:
+        print("Usage: replay_logs.py compare BASELINE CANDIDATE [--top N] [--json]", file=sys.stderr)
+        sys.exit(1)
+    drift = compare_runs(load_run(Path(args[0])), load_run(Path(args[1])), top)
+    if as_json:
+        print(json.dumps(drift, indent=2))
+    else:
+        print_drift(drift)
+
+
+def main():
+    """Main entry point for the log replay tool."""
+    args = sys.argv[1:]
+    as_json = '--json' in args
+    deadline = '--deadline' in args
+    args = [arg for arg in args if arg not in ('--json', '--deadline')]
+
+    command = args[0] if args else None
+    if command not in ('run', 'compare'):
+        print("Usage: replay_logs.py run [--kb DIR] [--log-dir DIR] [--since DAY] [--until DAY] [--limit N]",
+              file=sys.stderr)
+        print("                          [--workers N] [--deadline] [--baseline FILE] [--output FILE] [--json]",
+              file=sys.stderr)
+        print("       replay_logs.py compare BASELINE CANDIDATE [--top N] [--json]", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if command == 'run':
+            run_command(args[1:], as_json, deadline)
+        else:
+            compare_command(args[1:], as_json)
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
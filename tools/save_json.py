@@ -6,11 +6,13 @@ This utility safely saves JSON data to files, handling directory creation
 and proper error handling. Used by extraction agents to save knowledge base files.
 
 Usage:
-    python3 save_json.py <output_path> '<json_data>'
+    python3 save_json.py <output_path> '<json_data>' [--storage=MODE]
 
     Or import in Python:
     from save_json import save_json
     save_json(data, output_path)
+
+Storage modes (json, compact, gzip, lzma) are described in kb_format.py.
 """
 
 import json
@@ -18,15 +20,25 @@ import os
 import sys
 from pathlib import Path
 
+# Add the tools directory to Python path to ensure imports work
+SCRIPT_DIR = Path(__file__).parent.resolve()
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from kb_format import STORAGE_MODES, load_kb_file, write_kb_file
 
-def save_json(data, output_path, indent=2):
+
+def save_json(data, output_path, indent=2, storage=None):
     """
     Save JSON data to a file with proper error handling.
 
     Args:
         data: Python dict/list to save as JSON
         output_path: Absolute path where to save the file
-        indent: JSON indentation (default: 2)
+        indent: JSON indentation in json mode (default: 2). Use None for
+            compact output.
+        storage: Storage mode (json, compact, gzip, lzma). Defaults to
+            FELLOW_KB_STORAGE, then the mode of the existing file.
 
     Returns:
         bool: True if successful, False otherwise
@@ -35,14 +47,13 @@ def save_json(data, output_path, indent=2):
         # Convert to Path object for easier manipulation
         output_path = Path(output_path).resolve()
 
-        # Create parent directories if they don't exist
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if storage is None and indent is None:
+            storage = "compact"
 
-        # Write JSON file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent, ensure_ascii=False)
+        # Write JSON file (creates parent directories, replaces atomically)
+        mode = write_kb_file(output_path, data, storage, indent)
 
-        print(f"✓ Saved JSON to: {output_path}")
+        print(f"✓ Saved JSON to: {output_path}" + (f" ({mode})" if mode != "json" else ""))
         return True
 
     except Exception as e:
@@ -67,8 +78,7 @@ def load_and_update_json(output_path, update_func):
 
         # Load existing data if file exists
         if output_path.exists():
-            with open(output_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_kb_file(output_path)
         else:
             data = {}
 
@@ -85,20 +95,25 @@ def load_and_update_json(output_path, update_func):
 
 def main():
     """CLI interface for saving JSON."""
-    if len(sys.argv) < 3:
-        print("Usage: python3 save_json.py <output_path> '<json_data>'")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--storage=")]
+    storage_args = [arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--storage=")]
+    storage = storage_args[-1] if storage_args else None
+
+    if len(args) < 2 or (storage and storage not in STORAGE_MODES):
+        print("Usage: python3 save_json.py <output_path> '<json_data>' [--storage=MODE]")
         print("Example: python3 save_json.py /path/to/output.json '{\"key\": \"value\"}'")
+        print(f"Storage modes: {', '.join(STORAGE_MODES)}")
         sys.exit(1)
 
-    output_path = sys.argv[1]
-    json_data = sys.argv[2]
+    output_path = args[0]
+    json_data = args[1]
 
     try:
         # Parse JSON string
         data = json.loads(json_data)
 
         # Save to file
-        if save_json(data, output_path):
+        if save_json(data, output_path, storage=storage):
             sys.exit(0)
         else:
             sys.exit(1)